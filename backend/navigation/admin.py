@@ -1,6 +1,6 @@
 # navigation/admin.py
 from django.contrib import admin
-from .models import Node, Edge
+from .models import Closure, Node, Edge
 
 @admin.register(Node)
 class NodeAdmin(admin.ModelAdmin):
@@ -10,6 +10,14 @@ class NodeAdmin(admin.ModelAdmin):
 
 @admin.register(Edge)
 class EdgeAdmin(admin.ModelAdmin):
-    list_display = ('start_node', 'end_node', 'weight')
+    list_display = ('start_node', 'end_node', 'weight', 'staff_only')
+    list_filter = ('staff_only',)
     # 노드가 많아질 경우 드롭다운 대신 검색으로 찾을 수 있게 해주는 설정
-    raw_id_fields = ('start_node', 'end_node')
\ No newline at end of file
+    raw_id_fields = ('start_node', 'end_node')
+
+@admin.register(Closure)
+class ClosureAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'penalty', 'reason', 'expires_at', 'created_at')
+    list_filter = ('expires_at',)
+    search_fields = ('reason', 'node__qr_id', 'node__name')
+    raw_id_fields = ('node', 'edge')
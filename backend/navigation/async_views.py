@@ -0,0 +1,107 @@
+# navigation/async_views.py
+# ASGI(uvicorn/daphne 등)용 비동기 뷰
+# 동기 뷰는 ASGI에서 하나의 스레드를 나눠 쓰기 때문에, 오래 걸리는 경로 탐색이 QR 조회를 막을 수 있습니다.
+# 여기서는 탐색을 search_pool의 제한된 워커 풀에서 실행하고, 한도를 넘으면 503, 시간 예산을 넘으면 504를 바로 반환합니다.
+# 요청 검증/응답 형식은 동기 뷰(views.py)와 같습니다.
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from .conditional import agraph_conditional, request_closures_version, request_graph_version
+from .graph_cache import peek_versioned
+from .models import GraphVersion
+from .search_pool import SearchRejected, SearchTimeout, get_search_pool, nearest_task, pathfind_task, tour_task
+from .views import (
+    PROFILE_FORBIDDEN, InvalidRequest, NodeByQrIdView, error_response, lookup_qr, nearest_params, pathfind_params,
+    pathfind_response, profile_forbidden, tour_params,
+)
+
+# 503 응답의 Retry-After (초)
+RETRY_AFTER_SECONDS = 1
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(data), content_type="application/json", status=status_code)
+
+
+# DRF APIView와 같이 CSRF 검사 없이 JSON POST를 받음
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncSearchView(View):
+    # POST JSON 본문 검증 -> 워커 풀에서 task 실행 -> 응답
+    http_method_names = ['post', 'options']
+    parse_params = None
+    task = None
+
+    async def post(self, request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return error_response("요청 본문은 JSON 객체여야 합니다.", status.HTTP_400_BAD_REQUEST)
+        try:
+            # 객체가 아닌 본문은 검증 함수가 InvalidRequest로 거름
+            params = type(self).parse_params(data)
+        except InvalidRequest as exc:
+            return error_response(str(exc), status.HTTP_400_BAD_REQUEST)
+        if profile_forbidden(params, await request.auser()):
+            return error_response(PROFILE_FORBIDDEN, status.HTTP_403_FORBIDDEN)
+
+        versions = await GraphVersion.aversions()
+        started = time.perf_counter()
+        try:
+            result = await get_search_pool().run(type(self).task, versions, **params)
+        except SearchRejected:
+            return error_response("요청이 많아 경로 탐색을 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.",
+                                  status.HTTP_503_SERVICE_UNAVAILABLE, **{"Retry-After": str(RETRY_AFTER_SECONDS)})
+        except SearchTimeout as exc:
+            return error_response(f"경로 탐색 시간이 초과되었습니다. (제한 {exc.args[0]}초)", status.HTTP_504_GATEWAY_TIMEOUT)
+        return self.respond(result, params, (time.perf_counter() - started) * 1000)
+
+    def respond(self, result, params, elapsed_ms):
+        if result.get("error"):
+            return error_response(result["error"], status.HTTP_404_NOT_FOUND)
+        return json_response(result)
+
+
+class AsyncPathfindView(AsyncSearchView):
+    parse_params = pathfind_params
+    task = pathfind_task
+
+    def respond(self, outcome, params, elapsed_ms):
+        # 풀 대기 + 프로세스 간 전달 시간을 wait_ms로 기록
+        wait_ms = max(elapsed_ms - sum(outcome.timings.values()), 0.0)
+        return pathfind_response(outcome, params, timings={"wait_ms": wait_ms})
+
+
+class AsyncNearestView(AsyncSearchView):
+    parse_params = nearest_params
+    task = nearest_task
+
+
+class AsyncTourView(AsyncSearchView):
+    parse_params = tour_params
+    task = tour_task
+
+
+# QR 조회는 탐색이 아니므로 풀을 거치지 않음. 조회표가 이미 있으면 이벤트 루프에서 바로 응답
+@method_decorator(agraph_conditional, name='get')
+class AsyncNodeByQrIdView(View):
+    async def get(self, request, qr_id):
+        version = request_graph_version(request)  # agraph_conditional이 미리 조회해 둠
+        bundle = request.GET.get('bundle') in ('1', 'true')
+        table = peek_versioned('qr_lookup', version)
+        if table is not None and not bundle:
+            payload = table.get(qr_id)
+        else:
+            payload = await sync_to_async(lookup_qr)(version, qr_id, bundle=bundle,
+                                                     closures_version=request_closures_version(request))
+        if payload is None:
+            return HttpResponse(NodeByQrIdView.NOT_FOUND, content_type="application/json",
+                                status=status.HTTP_404_NOT_FOUND)
+        return HttpResponse(payload, content_type="application/json")
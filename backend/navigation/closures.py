@@ -0,0 +1,115 @@
+# navigation/closures.py
+# 임시 통제(Closure) 오버레이
+# 컴파일된 그래프는 그대로 두고, 가중치 배열만 복사해서 통제된 엣지는 inf, 벌점이 있는 엣지는 +penalty로 바꾼 그래프를 만듭니다.
+#   - 노드 통제: 그 노드로 들어가고 나오는 모든 엣지에 적용 (벌점은 들어갈 때 한 번)
+#   - 엣지 통제: 양방향 모두 적용
+# 통제가 바뀌면(GraphVersion.closures_version) 또는 가장 빠른 만료 시각이 지나면 오버레이만 다시 만듭니다. (수 ms)
+#
+# 가중치는 늘어나기만 하므로, 통제된 노드/엣지를 지나지 않는 기존 최단 경로는 여전히 최단 경로입니다.
+# 그래서 경로 캐시(route_cache)는 affects()로 영향을 받는 경로만 다시 계산하고 나머지는 그대로 씁니다.
+import hashlib
+import math
+import threading
+from array import array
+
+from django.utils import timezone
+
+from .models import Closure
+from .profiles import DEFAULT_PROFILE
+
+
+class ClosureOverlay:
+    def __init__(self, graph, closures, valid_until=None):
+        # closures: (노드 qr_id, 엣지 시작 qr_id, 엣지 끝 qr_id, penalty) 목록. penalty가 None이면 완전 통제
+        self.base = graph
+        self.valid_until = valid_until  # 이 시각이 지나면 만료되는 통제가 있음 (다시 만들어야 함)
+        self.node_penalties = {}        # 노드 번호 -> 추가 가중치 (inf: 통제)
+        self.edge_penalties = {}        # (u, v) -> 추가 가중치, 양방향으로 저장
+        index = graph.index
+        for node_qr, start_qr, end_qr, penalty in closures:
+            penalty = math.inf if penalty is None else penalty
+            if node_qr is not None:
+                u = index.get(node_qr)
+                if u is not None:
+                    self.node_penalties[u] = self.node_penalties.get(u, 0.0) + penalty
+            else:
+                u, v = index.get(start_qr), index.get(end_qr)
+                if u is not None and v is not None:
+                    for pair in ((u, v), (v, u)):
+                        self.edge_penalties[pair] = self.edge_penalties.get(pair, 0.0) + penalty
+
+        # 경로 캐시 키에 넣을 통제 상태 요약 (같은 통제 조합이면 프로세스가 달라도 같은 값)
+        state = repr((sorted(self.node_penalties.items()), sorted(self.edge_penalties.items())))
+        self.signature = hashlib.sha1(state.encode()).hexdigest()[:12]
+
+        if not self:
+            self.graph = graph
+            return
+        # 가중치 배열 복사 후 영향받는 엣지만 수정
+        weights = array("d", graph.weights)
+        offsets, targets = graph.offsets, graph.targets
+        for v, penalty in self.node_penalties.items():
+            for pos in range(offsets[v], offsets[v + 1]):
+                graph.add_edge_weight(weights, targets[pos], v, penalty)  # v로 들어가는 엣지
+                if penalty == math.inf:
+                    weights[pos] = math.inf                                # 통제된 노드에서 나가는 엣지
+        for (u, v), penalty in self.edge_penalties.items():
+            graph.add_edge_weight(weights, u, v, penalty)
+        self.graph = graph.with_weights(weights)
+
+    def __bool__(self):
+        return bool(self.node_penalties or self.edge_penalties)
+
+    def affects(self, result: dict) -> bool:
+        # 원래 그래프에서 구한 경로가 통제된 노드/엣지를 지나는지
+        index = self.base.index
+        nodes = [index.get(point["id"]) for point in result["path"]]
+        if any(u in self.node_penalties for u in nodes):
+            return True
+        return any((u, v) in self.edge_penalties for u, v in zip(nodes, nodes[1:]))
+
+    @classmethod
+    def build(cls, graph, now=None) -> "ClosureOverlay":
+        now = now or timezone.now()
+        rows = Closure.objects.active(now).values_list(
+            'node__qr_id', 'edge__start_node__qr_id', 'edge__end_node__qr_id', 'penalty', 'expires_at')
+        closures, valid_until = [], None
+        for node_qr, start_qr, end_qr, penalty, expires_at in rows:
+            closures.append((node_qr, start_qr, end_qr, penalty))
+            if expires_at is not None and (valid_until is None or expires_at < valid_until):
+                valid_until = expires_at
+        return cls(graph, closures, valid_until)
+
+
+_overlays = {}  # 라우팅 프로필 이름 -> (프로필 그래프, 통제 버전, ClosureOverlay)
+_lock = threading.Lock()
+
+
+def _is_current(cached, graph, closures_version: int, now) -> bool:
+    if cached is None or cached[0] is not graph or cached[1] != closures_version:
+        return False
+    valid_until = cached[2].valid_until
+    return valid_until is None or now < valid_until
+
+
+def get_overlay(graph, closures_version: int, profile: str = DEFAULT_PROFILE, now=None):
+    # graph(라우팅 프로필 그래프, profiles.py) 위에 현재 적용 중인 통제 오버레이. 통제가 없으면 None
+    now = now or timezone.now()
+    cached = _overlays.get(profile)
+    if not _is_current(cached, graph, closures_version, now):
+        with _lock:
+            cached = _overlays.get(profile)
+            if not _is_current(cached, graph, closures_version, now):
+                cached = _overlays[profile] = (graph, closures_version, ClosureOverlay.build(graph, now))
+    return cached[2] or None
+
+
+def routing_graph(graph, closures_version: int, profile: str = DEFAULT_PROFILE):
+    # 탐색에 쓸 그래프 (통제가 있으면 오버레이를 적용한 그래프)
+    overlay = get_overlay(graph, closures_version, profile)
+    return overlay.graph if overlay else graph
+
+
+def clear_overlay() -> None:
+    with _lock:
+        _overlays.clear()
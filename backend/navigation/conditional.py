@@ -0,0 +1,77 @@
+# navigation/conditional.py
+# 그래프 버전 기반 조건부 GET (ETag / Last-Modified / Cache-Control)
+# 노드 데이터는 그래프 버전이 바뀌어야만 달라지므로, 버전과 요청 경로만으로 ETag를 만들 수 있습니다.
+# (QR 번들의 가까운 POI는 임시 통제도 반영하므로 통제 버전도 ETag에 넣음)
+# 통제가 바뀌거나 만료되면 GraphVersion.state()가 통제 버전과 Last-Modified를 함께 올립니다.
+# If-None-Match가 일치하면 노드 조회와 직렬화 없이 304를 반환합니다.
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import GraphVersion
+
+
+def request_graph_state(request):
+    # 한 요청 안에서는 GraphVersion을 한 번만 조회
+    state = getattr(request, '_graph_state', None)
+    if state is None:
+        state = request._graph_state = GraphVersion.state()
+    return state
+
+
+async def arequest_graph_state(request):
+    # 비동기 뷰용. 결과를 요청에 저장해 두므로 이후 request_graph_state()는 DB를 조회하지 않음
+    state = getattr(request, '_graph_state', None)
+    if state is None:
+        state = request._graph_state = await GraphVersion.astate()
+    return state
+
+
+def request_graph_version(request) -> int:
+    return request_graph_state(request)[0]
+
+
+def request_closures_version(request) -> int:
+    return request_graph_state(request)[2]
+
+
+def graph_etag(request, *args, **kwargs) -> str:
+    version, _, closures_version = request_graph_state(request)
+    digest = hashlib.sha1(request.get_full_path().encode()).hexdigest()[:16]
+    return f"g{version}.{closures_version}-{digest}"
+
+
+def graph_last_modified(request, *args, **kwargs):
+    return request_graph_state(request)[1]
+
+
+def graph_conditional(view_func):
+    # condition()이 304 처리와 ETag/Last-Modified 헤더를 맡고, 여기서는 Cache-Control만 추가
+    conditional_view = condition(etag_func=graph_etag, last_modified_func=graph_last_modified)(view_func)
+
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        return add_cache_control(response)
+
+    return wrapper
+
+
+def agraph_conditional(view_func):
+    # 비동기 뷰용 graph_conditional
+    # condition()은 etag/last_modified 함수를 동기로 부르므로, 그래프 버전을 먼저 비동기로 조회해 둠
+    conditional_view = condition(etag_func=graph_etag, last_modified_func=graph_last_modified)(view_func)
+
+    async def wrapper(request, *args, **kwargs):
+        await arequest_graph_state(request)
+        response = await conditional_view(request, *args, **kwargs)
+        return add_cache_control(response)
+
+    return wrapper
+
+
+def add_cache_control(response):
+    if response.status_code in (200, 304):
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'NAVIGATION_CACHE_MAX_AGE', 60))
+    return response
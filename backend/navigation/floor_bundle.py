@@ -0,0 +1,101 @@
+# navigation/floor_bundle.py
+# 층 번들: 한 층을 그리는 데 필요한 노드 + 같은 층 안의 엣지를 한 번에 담은 응답 (floors/<building>/<floor>/bundle/)
+# 그래프 버전마다 한 번 모든 층의 JSON을 만들고 gzip(brotli가 설치되어 있으면 brotli도)으로 미리 압축해 둡니다.
+# 요청 때는 Accept-Encoding에 맞는 바이트를 그대로 돌려주기만 합니다.
+#
+# {
+#   "building": "본관", "floor": "1F", "floors": ["B1", "1F", "2F"], "image": "images/본관_1F.png",
+#   "node_fields": ["id", "qr_id", "name", "pixel_x", "pixel_y", "node_type", "description"],
+#   "nodes": [[1, "QR_A", "정문", 120, 340, "QR", null], ...],
+#   "edges": [[0, 1, 35.0], ...]     # [nodes 안의 시작 위치, 끝 위치, 가중치]
+# }
+import gzip
+import json
+
+from django.db.models import F
+
+from .models import Edge, Node
+from .qr_lookup import floor_image, group_floors
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성. 없으면 gzip만 제공
+    brotli = None
+
+NODE_FIELDS = ('id', 'qr_id', 'name', 'pixel_x', 'pixel_y', 'node_type', 'description')
+GZIP_LEVEL = 9     # 버전마다 한 번만 압축하므로 최고 압축률
+BROTLI_QUALITY = 11
+
+
+class FloorBundle:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.encoded = {"gzip": gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(content, quality=BROTLI_QUALITY)
+
+    def negotiate(self, accept_encoding: str):
+        # (본문, Content-Encoding). 클라이언트가 받을 수 있는 가장 작은 형식을 고름 (q=0은 제외)
+        accepted = set()
+        for part in accept_encoding.split(','):
+            coding, *params = (param.strip() for param in part.split(';'))
+            quality = 1.0
+            for param in params:
+                name, _, value = param.partition('=')
+                if name.strip() == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if quality > 0:
+                accepted.add(coding.lower())
+        for coding in ("br", "gzip"):
+            if coding in self.encoded and (coding in accepted or '*' in accepted):
+                return self.encoded[coding], coding
+        return self.content, None
+
+
+class FloorBundleTable:
+    def __init__(self, version: int, bundles: dict):
+        self.version = version
+        self.bundles = bundles  # (건물, 층) -> FloorBundle
+
+    @classmethod
+    def build(cls, version: int) -> "FloorBundleTable":
+        # (building, floor) 인덱스 순서로 읽음. 건물이 없는 노드는 URL로 지정할 수 없으므로 제외
+        rows = Node.objects.exclude(building__isnull=True).order_by('building', 'floor', 'id').values_list(
+            'building', 'floor', *NODE_FIELDS)
+        floors = {}      # (건물, 층) -> 노드 행 목록
+        positions = {}   # 노드 pk -> 번들 안의 위치
+        for building, floor, *node in rows:
+            nodes = floors.setdefault((building, floor), [])
+            positions[node[0]] = len(nodes)
+            nodes.append(node)
+
+        edges = {}
+        # 직원 전용 통로는 공개 번들에 넣지 않음
+        same_floor = Edge.objects.filter(
+            start_node__building=F('end_node__building'), start_node__floor=F('end_node__floor'),
+            start_node__building__isnull=False, staff_only=False,
+        ).order_by('id').values_list('start_node__building', 'start_node__floor', 'start_node_id', 'end_node_id',
+                                     'weight')
+        for building, floor, start_id, end_id, weight in same_floor:
+            edges.setdefault((building, floor), []).append([positions[start_id], positions[end_id], weight])
+
+        floor_names = group_floors(floors)
+        bundles = {}
+        for (building, floor), nodes in floors.items():
+            content = json.dumps({
+                "building": building,
+                "floor": floor,
+                "floors": floor_names[building],
+                "image": floor_image(building, floor),
+                "node_fields": NODE_FIELDS,
+                "nodes": nodes,
+                "edges": edges.get((building, floor), []),
+            }, ensure_ascii=False, separators=(',', ':')).encode()
+            bundles[(building, floor)] = FloorBundle(content)
+        return cls(version, bundles)
+
+    def get(self, building: str, floor: str):
+        return self.bundles.get((building, floor))
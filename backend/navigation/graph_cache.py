@@ -0,0 +1,107 @@
+# navigation/graph_cache.py
+# 프로세스(워커)마다 한 번만 그래프를 만들어 두고, GraphVersion이 바뀐 경우에만 다시 만듭니다.
+import logging
+import os
+import threading
+
+from django.conf import settings
+
+from .models import Edge, GraphVersion, Node
+from .pathfinding import CompiledGraph
+from .snapshot import load_snapshot_file
+
+logger = logging.getLogger(__name__)
+
+
+class GraphSnapshot:
+    def __init__(self, version: int, graph: CompiledGraph, source: str = 'db'):
+        self.version = version
+        self.graph = graph
+        self.source = source  # 'file': compile_graph 스냅샷(mmap), 'db': DB에서 직접 생성
+
+
+_snapshot = None
+_lock = threading.RLock()
+_derived = {}  # 이름 -> (그래프 버전, 값)
+# 파생 데이터마다 따로 잠금. 검색 인덱스를 다시 만드는 동안 QR 조회 테이블 같은 다른 데이터는 기다리지 않음
+_derived_locks = {}  # 이름 -> RLock
+_derived_locks_guard = threading.Lock()
+
+
+def build_graph_from_db() -> CompiledGraph:
+    node_rows = Node.objects.exclude(qr_id__isnull=True).values_list(
+        'qr_id', 'pixel_x', 'pixel_y', 'floor', 'building', 'node_type')
+    edge_rows = Edge.objects.values_list('start_node__qr_id', 'end_node__qr_id', 'weight')
+    return CompiledGraph.from_rows(node_rows.iterator(), edge_rows.iterator())
+
+
+def load_snapshot(version: int) -> GraphSnapshot:
+    # compile_graph로 만든 스냅샷 파일이 현재 버전과 같으면 mmap으로 열고, 없거나 오래됐으면 DB에서 생성
+    path = getattr(settings, 'NAVIGATION_GRAPH_SNAPSHOT', None)
+    # compile_graph를 실행하지 않은 환경(개발, 테스트)에서는 파일이 없는 것이 정상이므로 조용히 DB에서 생성
+    if path and os.path.exists(path):
+        # 버전 번호뿐 아니라 이 DB의 지문도 같아야 사용 (다른 DB에서 만든 같은 버전의 스냅샷은 무시)
+        current, fingerprint = GraphVersion.fingerprint()
+        graph = None
+        try:
+            if fingerprint is not None and current == version:
+                graph = load_snapshot_file(path, expected_version=version, expected_fingerprint=fingerprint)
+        except (OSError, ValueError) as exc:
+            logger.warning("graph snapshot %s could not be loaded: %s", path, exc)
+            graph = None
+        if graph is not None:
+            return GraphSnapshot(version, graph, source='file')
+        logger.info("graph snapshot %s is stale or from another database (v%s), building from database", path, version)
+    return GraphSnapshot(version, build_graph_from_db())
+
+
+def get_graph(version: int = None) -> GraphSnapshot:
+    global _snapshot
+    if version is None:
+        version = GraphVersion.current()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _lock:
+        # 다른 스레드가 이미 새로 만들었을 수 있으므로 한 번 더 확인
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = load_snapshot(version)
+        return _snapshot
+
+
+def get_versioned(name: str, builder, version: int = None):
+    # 그래프 버전에 묶인 파생 데이터(검색 인덱스 등)를 프로세스에 캐시합니다.
+    # builder(version)는 버전이 바뀌었을 때만 다시 호출됩니다.
+    if version is None:
+        version = GraphVersion.current()
+    cached = _derived.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _derived_lock(name):
+        cached = _derived.get(name)
+        if cached is None or cached[0] != version:
+            cached = _derived[name] = (version, builder(version))
+        return cached[1]
+
+
+def _derived_lock(name: str):
+    lock = _derived_locks.get(name)
+    if lock is None:
+        with _derived_locks_guard:
+            lock = _derived_locks.setdefault(name, threading.RLock())
+    return lock
+
+
+def peek_versioned(name: str, version: int):
+    # 이미 만들어진 파생 데이터만 반환 (없으면 None). DB를 건드리지 않으므로 비동기 뷰에서 바로 호출 가능
+    cached = _derived.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    return None
+
+
+def clear_graph_cache() -> None:
+    global _snapshot
+    with _lock:
+        _snapshot = None
+        _derived.clear()
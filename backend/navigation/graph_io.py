@@ -0,0 +1,318 @@
+# navigation/graph_io.py
+# 그래프(Node/Edge) 일괄 가져오기/내보내기 (manage.py import_graph / export_graph)
+#
+# 지원 형식
+#   json    : {"nodes": [...], "edges": [...]}
+#   jsonl   : 한 줄에 하나씩 {"type": "node", ...} / {"type": "edge", ...} (스트리밍)
+#   csv     : 노드 파일 + 엣지 파일 두 개 (스트리밍)
+#   geojson : 노드는 Point, 엣지는 LineString Feature (좌표 = [pixel_x, pixel_y])
+#
+# 엣지의 start/end는 노드의 qr_id로 찾고, 없으면 이름(name)으로 찾습니다.
+# weight가 비어 있으면 픽셀 거리 + 층/건물 패널티로 자동 계산합니다.
+# staff_only(직원 전용 통로)가 비어 있으면 기존 엣지는 그대로 두고, 새 엣지는 false로 만듭니다.
+import csv
+import json
+import math
+
+from django.db import transaction
+
+from .models import Edge, Node
+from .pathfinding import BUILDING_WEIGHT, FLOOR_WEIGHT, floor_number
+
+FORMATS = ('json', 'jsonl', 'csv', 'geojson')
+NODE_FIELDS = ('qr_id', 'building', 'name', 'floor', 'pixel_x', 'pixel_y', 'node_type', 'description')
+EDGE_FIELDS = ('start', 'end', 'weight', 'staff_only')
+NODE_TYPES = {choice for choice, _ in Node.NODE_TYPE_CHOICES}
+# Node.pixel_x/pixel_y(IntegerField)에 저장할 수 있는 최댓값
+MAX_PIXEL = 2 ** 31 - 1
+# bulk_update는 CASE WHEN 문을 만들기 때문에 배치가 크면 오히려 느려짐
+UPDATE_BATCH_SIZE = 500
+
+
+class GraphImportError(Exception):
+    pass
+
+
+def parse_flag(value):
+    # CSV에서는 문자열로 들어오므로 "1"/"true"/"yes"도 참으로 인정. 비어 있으면 None
+    if value in (None, ''):
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def parse_non_negative(value) -> float:
+    # 유한한 0 이상의 수만 허용 (음수 가중치/좌표는 탐색 알고리즘의 가정을 깨고, nan/inf는 DB 제약이나 int 변환에서 실패함)
+    number = float(value)
+    if not math.isfinite(number) or number < 0:
+        raise ValueError(f"{value!r} is not a finite non-negative number")
+    return number
+
+
+def estimate_weight(a, b) -> float:
+    # a, b: (pixel_x, pixel_y, floor, building)
+    # A* 휴리스틱(sqrt(d^2 + (50*층차)^2) + 건물 패널티)보다 항상 크거나 같으므로 휴리스틱이 과대평가되지 않습니다.
+    floor_diff = floor_number(a[2]) - floor_number(b[2])
+    if floor_diff != floor_diff:
+        floor_diff = 0
+    building_penalty = BUILDING_WEIGHT if a[3] != b[3] else 0
+    return math.hypot(a[0] - b[0], a[1] - b[1]) + FLOOR_WEIGHT * abs(floor_diff) + building_penalty
+
+
+# --- 읽기: ("node", dict) / ("edge", dict) 레코드를 차례로 내보내는 제너레이터 ---
+
+def read_json(fp):
+    data = json.load(fp)
+    for node in data.get('nodes', []):
+        yield 'node', node
+    for edge in data.get('edges', []):
+        yield 'edge', edge
+
+
+def read_jsonl(fp):
+    for line_no, line in enumerate(fp, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise GraphImportError(f"{line_no}번째 줄: 올바른 JSON이 아닙니다 ({exc})")
+        kind = record.pop('type', None)
+        if kind not in ('node', 'edge'):
+            raise GraphImportError(f"{line_no}번째 줄: type은 'node' 또는 'edge'여야 합니다.")
+        yield kind, record
+
+
+def read_csv(nodes_fp, edges_fp=None):
+    for row in csv.DictReader(nodes_fp):
+        yield 'node', row
+    if edges_fp is not None:
+        for row in csv.DictReader(edges_fp):
+            yield 'edge', row
+
+
+def read_geojson(fp):
+    data = json.load(fp)
+    for feature in data.get('features', []):
+        geometry = feature.get('geometry') or {}
+        properties = dict(feature.get('properties') or {})
+        if geometry.get('type') == 'Point':
+            properties['pixel_x'], properties['pixel_y'] = geometry['coordinates'][:2]
+            yield 'node', properties
+        elif geometry.get('type') == 'LineString':
+            yield 'edge', properties
+
+
+def _clean_node(data: dict, position: int) -> dict:
+    node = {field: data.get(field) for field in NODE_FIELDS}
+    for field in ('qr_id', 'building', 'description'):
+        if node[field] in ('', None):
+            node[field] = None
+    node['node_type'] = node['node_type'] or 'ETC'
+    if not node['name'] or not node['floor']:
+        raise GraphImportError(f"{position}번째 노드: name과 floor는 필수입니다.")
+    if node['node_type'] not in NODE_TYPES:
+        raise GraphImportError(f"{position}번째 노드: 알 수 없는 node_type '{node['node_type']}'")
+    try:
+        node['pixel_x'] = int(parse_non_negative(node['pixel_x']))
+        node['pixel_y'] = int(parse_non_negative(node['pixel_y']))
+        if max(node['pixel_x'], node['pixel_y']) > MAX_PIXEL:
+            raise OverflowError("pixel coordinate out of range")
+    except (TypeError, ValueError, OverflowError):
+        raise GraphImportError(f"{position}번째 노드 '{node['name']}': pixel_x/pixel_y는 0 이상의 유한한 숫자여야 합니다.")
+    return node
+
+
+# --- 가져오기 ---
+
+class GraphImporter:
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.counts = {'nodes_created': 0, 'nodes_updated': 0, 'edges_created': 0, 'edges_updated': 0}
+        # 기존 노드: qr_id -> pk, (building, floor, name) -> pk (qr_id 없는 노드), pk -> 필드 값 (변경 여부 비교용)
+        self.by_qr, self.by_place, self.current = {}, {}, {}
+        for row in Node.objects.values_list('id', *NODE_FIELDS).iterator():
+            pk, values = row[0], dict(zip(NODE_FIELDS, row[1:]))
+            self.current[pk] = values
+            if values['qr_id'] is not None:
+                self.by_qr[values['qr_id']] = pk
+            else:
+                self.by_place[(values['building'], values['floor'], values['name'])] = pk
+
+    def flush_nodes(self, batch: list) -> None:
+        to_create, to_update = [], []
+        for node in batch:
+            if node['qr_id'] is not None:
+                pk = self.by_qr.get(node['qr_id'])
+            else:
+                pk = self.by_place.get((node['building'], node['floor'], node['name']))
+            if not pk:
+                to_create.append(Node(**node))
+            elif self.current.get(pk) != node:
+                to_update.append(Node(id=pk, **node))  # 값이 바뀐 노드만 갱신
+        Node.objects.bulk_create(to_create, batch_size=self.batch_size)
+        Node.objects.bulk_update(to_update, [f for f in NODE_FIELDS if f != 'qr_id'], batch_size=UPDATE_BATCH_SIZE)
+        for obj in to_create:
+            if obj.pk is None:
+                continue  # pk를 돌려주지 않는 DB는 아래 resolve 단계에서 다시 읽음
+            if obj.qr_id is not None:
+                self.by_qr[obj.qr_id] = obj.pk
+            else:
+                self.by_place[(obj.building, obj.floor, obj.name)] = obj.pk
+        self.counts['nodes_created'] += len(to_create)
+        self.counts['nodes_updated'] += len(to_update)
+
+    def import_records(self, records, replace: bool = False) -> dict:
+        batch, edges = [], []
+        seen_qr = set()
+        position = 0
+        with transaction.atomic():
+            if replace:
+                # 기존 그래프를 모두 지우고 새로 채움 (같은 트랜잭션이라 실패하면 원래대로 돌아감)
+                Edge.objects.all().delete()
+                Node.objects.all().delete()
+                self.by_qr.clear()
+                self.by_place.clear()
+                self.current.clear()
+            for kind, data in records:
+                if kind == 'node':
+                    position += 1
+                    node = _clean_node(data, position)
+                    if node['qr_id'] is not None:
+                        if node['qr_id'] in seen_qr:
+                            raise GraphImportError(f"qr_id '{node['qr_id']}'가 중복되었습니다.")
+                        seen_qr.add(node['qr_id'])
+                    batch.append(node)
+                    if len(batch) >= self.batch_size:
+                        self.flush_nodes(batch)
+                        batch = []
+                else:
+                    # 엣지는 모든 노드를 저장한 뒤에 연결
+                    edges.append((data.get('start'), data.get('end'), data.get('weight'),
+                                  parse_flag(data.get('staff_only'))))
+            if batch:
+                self.flush_nodes(batch)
+            if edges:
+                self.import_edges(edges)
+        return self.counts
+
+    def import_edges(self, edges: list) -> None:
+        # 노드 참조 해석용 표: qr_id/이름 -> pk, pk -> (x, y, floor, building)
+        places, by_qr, by_name = {}, {}, {}
+        for pk, qr_id, name, x, y, floor, building in Node.objects.values_list(
+                'id', 'qr_id', 'name', 'pixel_x', 'pixel_y', 'floor', 'building').iterator():
+            places[pk] = (x, y, floor, building)
+            if qr_id:
+                by_qr[qr_id] = pk
+            by_name.setdefault(name, []).append(pk)
+
+        def resolve(ref, position):
+            ref = str(ref or '').strip()
+            if ref in by_qr:
+                return by_qr[ref]
+            matches = by_name.get(ref, [])
+            if len(matches) == 1:
+                return matches[0]
+            if not matches:
+                raise GraphImportError(f"{position}번째 엣지: 노드 '{ref}'를 찾을 수 없습니다.")
+            raise GraphImportError(f"{position}번째 엣지: 이름이 '{ref}'인 노드가 여러 개입니다. qr_id를 사용하세요.")
+
+        # 기존 엣지 (방향 없음): (작은 pk, 큰 pk) -> (edge pk, 가중치, 직원 전용 여부)
+        existing = {
+            (min(s, e), max(s, e)): (pk, w, staff)
+            for pk, s, e, w, staff in Edge.objects.values_list(
+                'id', 'start_node_id', 'end_node_id', 'weight', 'staff_only').iterator()
+        }
+        to_create, to_update, added = [], [], set()
+        for position, (start, end, weight, staff_only) in enumerate(edges, 1):
+            s, e = resolve(start, position), resolve(end, position)
+            if weight in (None, ''):
+                weight = estimate_weight(places[s], places[e])
+            else:
+                try:
+                    weight = parse_non_negative(weight)
+                except (TypeError, ValueError, OverflowError):
+                    raise GraphImportError(f"{position}번째 엣지: weight는 0 이상의 유한한 숫자여야 합니다.")
+            key = (min(s, e), max(s, e))
+            if key in added:
+                continue  # 같은 파일 안의 중복 엣지는 처음 것만 사용
+            added.add(key)
+            pk, current_weight, current_staff = existing.get(key, (None, None, False))
+            if staff_only is None:
+                staff_only = current_staff
+            if not pk:
+                to_create.append(Edge(start_node_id=s, end_node_id=e, weight=weight, staff_only=staff_only))
+            elif current_weight != weight or current_staff != staff_only:
+                to_update.append(Edge(id=pk, weight=weight, staff_only=staff_only))  # 바뀐 엣지만 갱신
+            if len(to_create) >= self.batch_size:
+                Edge.objects.bulk_create(to_create, batch_size=self.batch_size)
+                self.counts['edges_created'] += len(to_create)
+                to_create = []
+        Edge.objects.bulk_create(to_create, batch_size=self.batch_size)
+        Edge.objects.bulk_update(to_update, ['weight', 'staff_only'], batch_size=UPDATE_BATCH_SIZE)
+        self.counts['edges_created'] += len(to_create)
+        self.counts['edges_updated'] += len(to_update)
+
+
+# --- 내보내기 ---
+
+def iter_nodes():
+    return Node.objects.order_by('id').values(*NODE_FIELDS).iterator()
+
+
+def iter_edges():
+    # 엣지 끝점은 qr_id로, qr_id가 없으면 이름으로 표기
+    rows = Edge.objects.order_by('id').values_list(
+        'start_node__qr_id', 'start_node__name', 'end_node__qr_id', 'end_node__name', 'weight', 'staff_only').iterator()
+    for start_qr, start_name, end_qr, end_name, weight, staff_only in rows:
+        yield {'start': start_qr or start_name, 'end': end_qr or end_name, 'weight': weight, 'staff_only': staff_only}
+
+
+def write_json(fp) -> None:
+    # 전체를 메모리에 올리지 않도록 노드/엣지를 한 줄씩 기록
+    fp.write('{"nodes": [\n')
+    for i, node in enumerate(iter_nodes()):
+        fp.write((',\n' if i else '') + json.dumps(node, ensure_ascii=False))
+    fp.write('\n], "edges": [\n')
+    for i, edge in enumerate(iter_edges()):
+        fp.write((',\n' if i else '') + json.dumps(edge, ensure_ascii=False))
+    fp.write('\n]}\n')
+
+
+def write_jsonl(fp) -> None:
+    for node in iter_nodes():
+        fp.write(json.dumps({'type': 'node', **node}, ensure_ascii=False) + '\n')
+    for edge in iter_edges():
+        fp.write(json.dumps({'type': 'edge', **edge}, ensure_ascii=False) + '\n')
+
+
+def write_csv(nodes_fp, edges_fp=None) -> None:
+    writer = csv.DictWriter(nodes_fp, fieldnames=NODE_FIELDS)
+    writer.writeheader()
+    writer.writerows(iter_nodes())
+    if edges_fp is not None:
+        writer = csv.DictWriter(edges_fp, fieldnames=EDGE_FIELDS)
+        writer.writeheader()
+        writer.writerows(iter_edges())
+
+
+def write_geojson(fp) -> None:
+    fp.write('{"type": "FeatureCollection", "features": [\n')
+    first = True
+    for node in iter_nodes():
+        x, y = node.pop('pixel_x'), node.pop('pixel_y')
+        feature = {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [x, y]}, 'properties': node}
+        fp.write(('' if first else ',\n') + json.dumps(feature, ensure_ascii=False))
+        first = False
+    coords = {
+        qr_id or name: [x, y]
+        for qr_id, name, x, y in Node.objects.values_list('qr_id', 'name', 'pixel_x', 'pixel_y').iterator()
+    }
+    for edge in iter_edges():
+        geometry = {'type': 'LineString', 'coordinates': [coords.get(edge['start']), coords.get(edge['end'])]}
+        feature = {'type': 'Feature', 'geometry': geometry, 'properties': edge}
+        fp.write(('' if first else ',\n') + json.dumps(feature, ensure_ascii=False))
+        first = False
+    fp.write('\n]}\n')
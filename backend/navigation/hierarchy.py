@@ -0,0 +1,133 @@
+# navigation/hierarchy.py
+# 건물/층 단위 계층 탐색
+# 각 (건물, 층) 셀마다 포털 노드(엘리베이터/계단, 다른 셀로 이어지는 노드) 사이의 거리표를 미리 계산해 두고
+# 출발층 로컬 탐색 -> 포털 거리표(오버레이 그래프) 탐색 -> 도착층 로컬 탐색 순서로 경로를 찾습니다.
+# DB의 Edge는 방향이 없으므로 그래프가 양방향(대칭)이라고 가정합니다.
+import heapq
+import math
+
+from .pathfinding import PORTAL_NODE_TYPES, CompiledGraph, unwind
+
+
+class FloorHierarchy:
+    def __init__(self, graph: CompiledGraph):
+        self.graph = graph
+        n_floors = len(graph.floor_names)
+        # 노드 번호 -> 셀 번호 ((건물, 층) 조합)
+        self.cells = [graph.building_ids[i] * n_floors + graph.floor_ids[i] for i in range(len(graph))]
+
+        portal_types = {t for t, name in enumerate(graph.type_names) if name in PORTAL_NODE_TYPES}
+        offsets, targets, cells = graph.offsets, graph.targets, self.cells
+        self.portals = {}  # 셀 번호 -> 포털 노드 번호 리스트
+        for u in range(len(graph)):
+            crosses = any(cells[targets[pos]] != cells[u] for pos in range(offsets[u], offsets[u + 1]))
+            if crosses or graph.type_ids[u] in portal_types:
+                self.portals.setdefault(cells[u], []).append(u)
+
+        # 오버레이 그래프: 포털 -> [(포털, 거리)]
+        # 같은 셀 안의 포털끼리는 거리표 값, 다른 셀의 포털과는 원래 엣지를 그대로 사용
+        self.overlay = {}
+        for cell, portals in self.portals.items():
+            for p in portals:
+                dist, _ = self.local_search(p, portals)
+                links = self.overlay.setdefault(p, [])
+                for q in portals:
+                    if q != p and q in dist:
+                        links.append((q, dist[q]))
+                for pos in range(offsets[p], offsets[p + 1]):
+                    v = targets[pos]
+                    if cells[v] != cell:
+                        links.append((v, graph.weights[pos]))
+
+    def local_search(self, source: int, goals=None):
+        # source가 속한 셀 안에서만 움직이는 다익스트라. goals를 모두 확정하면 조기 종료합니다.
+        graph, cells = self.graph, self.cells
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        cell = cells[source]
+        remaining = set(goals or ())
+        remaining.discard(source)
+        dist = {source: 0.0}
+        prev = {source: -1}
+        heap = [(0.0, source)]
+        while heap and (goals is None or remaining):
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            remaining.discard(u)
+            for pos in range(offsets[u], offsets[u + 1]):
+                v = targets[pos]
+                if cells[v] != cell:
+                    continue
+                nd = d + weights[pos]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+        return dist, prev
+
+    def route(self, start: str, end: str, stats: dict = None) -> dict:
+        graph = self.graph
+        s = graph.index.get(start)
+        if s is None:
+            return {"path": [], "distance": None, "error": f"Start node '{start}' not in graph."}
+        t = graph.index.get(end)
+        if t is None:
+            return {"path": [], "distance": None, "error": f"End node '{end}' not in graph."}
+
+        start_portals = self.portals.get(self.cells[s], [])
+        end_portals = self.portals.get(self.cells[t], [])
+        head_dist, head_prev = self.local_search(s, start_portals)
+        tail_dist, tail_prev = self.local_search(t, end_portals)
+
+        visited = len(head_dist) + len(tail_dist)
+        best, best_portal = math.inf, None
+        # 같은 셀이면 셀 밖으로 나가지 않는 경로도 후보
+        if self.cells[s] == self.cells[t]:
+            direct_dist, direct_prev = self.local_search(s, (t,))
+            visited += len(direct_dist)
+            if t in direct_dist:
+                best = direct_dist[t]
+
+        # 출발층 포털들에서 시작하는 오버레이 다익스트라
+        dist, prev = {}, {}
+        heap = []
+        for p in start_portals:
+            if p in head_dist:
+                dist[p] = head_dist[p]
+                prev[p] = -1
+                heap.append((head_dist[p], p))
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d >= best:
+                break
+            if d > dist[u]:
+                continue
+            visited += 1
+            if u in tail_dist and d + tail_dist[u] < best:
+                best, best_portal = d + tail_dist[u], u
+            for v, w in self.overlay.get(u, ()):
+                nd = d + w
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+
+        if stats is not None:
+            stats["expanded"] = visited
+        if best == math.inf:
+            return {"path": [], "distance": None, "error": "경로를 탐색할 수 없습니다."}
+        if best_portal is None:
+            return graph.path_result(unwind(direct_prev, t), best)
+
+        # 포털 경로를 실제 노드 경로로 펼치기
+        portals = unwind(prev, best_portal)
+        path = unwind(head_prev, portals[0])
+        for a, b in zip(portals, portals[1:]):
+            if self.cells[a] == self.cells[b]:
+                _, seg_prev = self.local_search(a, (b,))
+                path.extend(unwind(seg_prev, b)[1:])
+            else:
+                path.append(b)
+        path.extend(reversed(unwind(tail_prev, best_portal)[:-1]))
+        return graph.path_result(path, best)
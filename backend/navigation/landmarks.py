@@ -0,0 +1,49 @@
+# navigation/landmarks.py
+# ALT (A*, Landmarks, Triangle inequality) 휴리스틱
+# 몇 개의 랜드마크 L에서 모든 노드까지의 거리를 미리 구해 두면, 삼각 부등식에 의해
+#   dist(v, t) >= |d(L, t) - d(L, v)|
+# 가 성립하므로 이 값들의 최댓값을 허용 가능한(admissible) 하한으로 쓸 수 있습니다.
+# 그래프가 양방향(대칭)이라는 가정이 필요합니다.
+import math
+
+from .pathfinding import CompiledGraph
+
+LANDMARK_COUNT = 8
+
+
+class Landmarks:
+    def __init__(self, graph: CompiledGraph, count: int = LANDMARK_COUNT):
+        self.graph = graph
+        self.nodes = []       # 랜드마크 노드 번호
+        self.distances = []   # 랜드마크별 전체 노드까지의 거리 배열 (array('d'))
+        n = len(graph)
+        if not n:
+            return
+
+        # farthest 선택: 이미 고른 랜드마크들에서 가장 먼 노드를 다음 랜드마크로 선택
+        # (다른 연결 요소에 있는 노드는 거리가 inf이므로 먼저 선택되어 각 요소마다 랜드마크가 생김)
+        closest = [math.inf] * n
+        candidate = max(range(n), key=graph.shortest_distances(0).__getitem__)
+        for _ in range(min(count, n)):
+            dist = graph.shortest_distances(candidate)
+            self.nodes.append(candidate)
+            self.distances.append(dist)
+            for i in range(n):
+                if dist[i] < closest[i]:
+                    closest[i] = dist[i]
+            candidate = max(range(n), key=closest.__getitem__)
+            if closest[candidate] == 0:
+                break  # 모든 노드가 랜드마크
+
+    def heuristic(self, u: int, goal: int) -> float:
+        best = 0.0
+        for dist in self.distances:
+            du, dg = dist[u], dist[goal]
+            if du == math.inf or dg == math.inf:
+                if du != dg:
+                    return math.inf  # u와 goal이 서로 다른 연결 요소
+                continue
+            bound = dg - du if dg > du else du - dg
+            if bound > best:
+                best = bound
+        return best
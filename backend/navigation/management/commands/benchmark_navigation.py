@@ -0,0 +1,219 @@
+# navigation/management/commands/benchmark_navigation.py
+# 가상 캠퍼스를 만들어 탐색 엔진과 API 뷰의 성능을 측정합니다.
+# 데이터는 테스트 러너처럼 따로 만든 임시 테스트 DB에 넣고 끝나면 지우므로 실제 DB는 읽지도 잠그지도 않습니다.
+# (실제 DB 안에서 트랜잭션을 롤백하는 방식은 측정 내내 쓰기 잠금을 잡아서 실행 중인 서버의 쓰기를 막음)
+import json
+import platform
+import random
+import statistics
+import time
+
+import django
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_databases, teardown_databases
+from django.utils import timezone
+
+from navigation.graph_cache import clear_graph_cache, get_graph
+from navigation.graph_io import GraphImporter
+from navigation.models import Edge, Node
+from navigation.pathfinding import ENGINES, find_shortest_path
+from navigation.route_cache import ROUTE_CACHE_ALIAS
+from navigation.synthetic import generate_campus
+
+# 비교 시 회귀로 볼 지표
+COMPARED_KEYS = ('p50_ms', 'p90_ms', 'p99_ms')
+
+
+def summarize(latencies: list, **extra) -> dict:
+    # 지연 시간(ms) 목록의 백분위수 요약 (nearest-rank)
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    summary = {
+        'count': len(ordered),
+        'mean_ms': statistics.fmean(ordered),
+        'p50_ms': percentile(50),
+        'p90_ms': percentile(90),
+        'p99_ms': percentile(99),
+        'max_ms': ordered[-1],
+    }
+    summary.update(extra)
+    return summary
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+class Command(BaseCommand):
+    help = "가상 캠퍼스로 경로 탐색/API 성능을 측정하고 결과를 JSON으로 저장합니다. (--baseline 으로 이전 결과와 비교)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buildings', type=int, default=3)
+        parser.add_argument('--floors', type=int, default=5)
+        parser.add_argument('--width', type=int, default=10)
+        parser.add_argument('--height', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--queries', type=int, default=200, help="엔진별 탐색 횟수")
+        parser.add_argument('--view-queries', type=int, default=50, help="API 뷰별 요청 횟수")
+        parser.add_argument('--legacy-queries', type=int, default=3,
+                            help="find_shortest_path(매번 DB에서 그래프 생성) 측정 횟수")
+        parser.add_argument('--output', help="결과 JSON 파일")
+        parser.add_argument('--baseline', help="비교할 이전 결과 JSON 파일")
+        parser.add_argument('--threshold', type=float, default=0.2, help="회귀로 볼 느려짐 비율 (기본 0.2 = 20%%)")
+        parser.add_argument('--fail-on-regression', action='store_true', help="회귀가 있으면 오류로 종료")
+
+    def handle(self, *args, **options):
+        # 스냅샷 파일/공유 캐시를 건드리지 않도록 벤치마크 동안만 설정을 바꿈
+        overrides = override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            NAVIGATION_GRAPH_SNAPSHOT=None,
+            NAVIGATION_ROUTE_WARMUP=False,
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench-default'},
+                ROUTE_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench-routes'},
+            },
+        )
+        verbosity = max(0, options['verbosity'] - 1)
+        old_config = setup_databases(verbosity, interactive=False, aliases={'default'}, serialized_aliases=set())
+        try:
+            with overrides:
+                report = self.run_benchmark(options)
+        finally:
+            clear_graph_cache()
+            teardown_databases(old_config, verbosity)
+
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fp:
+                fp.write(text + '\n')
+        else:
+            self.stdout.write(text)
+
+        if options['baseline']:
+            regressions = self.compare(report, options['baseline'], options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"성능 회귀 {len(regressions)}건")
+
+    def run_benchmark(self, options) -> dict:
+        rng = random.Random(options['seed'])
+        results = {}
+
+        records = generate_campus(options['buildings'], options['floors'], options['width'], options['height'],
+                                  seed=options['seed'])
+        _, results['import_ms'] = timed(GraphImporter(batch_size=5000).import_records, records)
+
+        clear_graph_cache()
+        snapshot, results['graph_load_ms'] = timed(get_graph)
+        graph = snapshot.graph
+        _, results['hierarchy_build_ms'] = timed(lambda: graph.hierarchy)
+        _, results['landmarks_build_ms'] = timed(lambda: graph.landmarks)
+
+        qr_ids = [graph.ids[i] for i in range(len(graph)) if graph.node_type(i) == 'QR']
+        poi_ids = [graph.ids[i] for i in range(len(graph)) if graph.node_type(i) == 'POI']
+        if not qr_ids or not poi_ids:
+            raise CommandError("QR/POI 노드가 없습니다. 격자 크기를 키우세요.")
+        pairs = [(rng.choice(qr_ids), rng.choice(poi_ids)) for _ in range(options['queries'])]
+
+        # 1) 탐색 엔진 (그래프는 메모리에 올라온 상태)
+        for engine in ENGINES:
+            latencies, expanded, pushes = [], [], []
+            for start, end in pairs:
+                stats = {}
+                _, elapsed = timed(graph.find_path, start, end, engine=engine, stats=stats)
+                latencies.append(elapsed)
+                expanded.append(stats.get('expanded', 0))
+                pushes.append(stats.get('pushes', 0))
+            results[f'search_{engine}'] = summarize(
+                latencies, expanded_mean=statistics.fmean(expanded), pushes_mean=statistics.fmean(pushes))
+
+        # 2) 예전 방식: 요청마다 DB에서 그래프를 다시 만드는 find_shortest_path
+        latencies, query_counts = [], []
+        for start, end in pairs[:options['legacy_queries']]:
+            with CaptureQueriesContext(connection) as queries:
+                _, elapsed = timed(find_shortest_path, start, end, Node.objects.all(),
+                                   Edge.objects.select_related('start_node', 'end_node'))
+            latencies.append(elapsed)
+            query_counts.append(len(queries))
+        if latencies:
+            results['find_shortest_path'] = summarize(latencies, db_queries_mean=statistics.fmean(query_counts))
+
+        # 3) API 뷰 (Django 테스트 클라이언트로 미들웨어까지 포함한 전체 요청)
+        client = Client()
+        caches[ROUTE_CACHE_ALIAS].clear()
+        view_pairs = pairs[:options['view_queries']]
+        requests = {
+            'view_pathfind_cold': [
+                ('post', '/api/navigation/pathfind/', {'start_node_id': s, 'end_node_id': e}) for s, e in view_pairs],
+            'view_pathfind_cached': [
+                ('post', '/api/navigation/pathfind/', {'start_node_id': s, 'end_node_id': e}) for s, e in view_pairs],
+            'view_node_by_qr': [('get', f'/api/navigation/nodes/qr/{s}/', None) for s, _ in view_pairs],
+            'view_node_search': [
+                ('get', '/api/navigation/nodes/', {'query': f'{rng.randrange(10)}F POI', 'limit': 20}) for _ in view_pairs],
+            'view_nearest': [
+                ('post', '/api/navigation/pathfind/nearest/', {'start_node_id': s, 'node_type': 'ELEVATOR', 'k': 3})
+                for s, _ in view_pairs],
+        }
+        for name, calls in requests.items():
+            latencies, query_counts = [], []
+            for method, url, data in calls:
+                with CaptureQueriesContext(connection) as queries:
+                    if method == 'post':
+                        response, elapsed = timed(client.post, url, data, content_type='application/json')
+                    else:
+                        response, elapsed = timed(client.get, url, data)
+                if response.status_code != 200:
+                    raise CommandError(f"{url} -> {response.status_code}")
+                latencies.append(elapsed)
+                query_counts.append(len(queries))
+            results[name] = summarize(latencies, db_queries_mean=statistics.fmean(query_counts),
+                                      db_queries_max=max(query_counts))
+
+        return {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'params': {key: options[key] for key in (
+                    'buildings', 'floors', 'width', 'height', 'seed', 'queries', 'view_queries', 'legacy_queries')},
+                'nodes': len(graph),
+                'edges': len(graph.targets) // 2,
+            },
+            'results': results,
+        }
+
+    def compare(self, report: dict, baseline_path: str, threshold: float) -> list:
+        try:
+            with open(baseline_path, encoding='utf-8') as fp:
+                baseline = json.load(fp)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"기준 결과를 읽을 수 없습니다: {exc}")
+        if baseline.get('meta', {}).get('params') != report['meta']['params']:
+            self.stderr.write(self.style.WARNING("기준 결과와 벤치마크 파라미터가 다릅니다."))
+
+        regressions = []
+        for name, current in report['results'].items():
+            previous = baseline.get('results', {}).get(name)
+            if not isinstance(current, dict) or not isinstance(previous, dict):
+                continue
+            for key in COMPARED_KEYS:
+                if not previous.get(key):
+                    continue
+                ratio = current[key] / previous[key]
+                line = f"{name}.{key}: {previous[key]:.3f}ms -> {current[key]:.3f}ms (x{ratio:.2f})"
+                if ratio > 1 + threshold:
+                    regressions.append(line)
+                    self.stderr.write(self.style.ERROR(f"REGRESSION {line}"))
+                elif ratio < 1 - threshold:
+                    self.stdout.write(self.style.SUCCESS(f"improved   {line}"))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("회귀 없음"))
+        return regressions
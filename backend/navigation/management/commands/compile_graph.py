@@ -0,0 +1,35 @@
+# navigation/management/commands/compile_graph.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from navigation.graph_cache import build_graph_from_db
+from navigation.models import GraphVersion
+from navigation.snapshot import write_snapshot
+
+
+class Command(BaseCommand):
+    help = "현재 그래프를 바이너리 스냅샷 파일로 컴파일합니다. 워커는 이 파일을 mmap으로 공유해서 바로 시작합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="저장할 파일 (기본: settings.NAVIGATION_GRAPH_SNAPSHOT)")
+
+    def handle(self, *args, **options):
+        path = options['output'] or getattr(settings, 'NAVIGATION_GRAPH_SNAPSHOT', None)
+        if not path:
+            raise CommandError("--output 또는 settings.NAVIGATION_GRAPH_SNAPSHOT을 지정해야 합니다.")
+
+        # 버전을 먼저 읽어 둠: 컴파일 도중 그래프가 바뀌면 파일 버전이 뒤처져서 워커가 DB에서 다시 만듦
+        version, fingerprint = GraphVersion.fingerprint()
+        if fingerprint is None:
+            raise CommandError("그래프 버전 정보가 없습니다. 노드/엣지를 먼저 가져오세요.")
+        started = time.perf_counter()
+        graph = build_graph_from_db()
+        try:
+            size = write_snapshot(graph, version, path, fingerprint)
+        except OSError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"그래프 v{version}: 노드 {len(graph)}개, 엣지 {len(graph.targets) // 2}개 -> {path} "
+            f"({size / 1024:.1f} KiB, {time.perf_counter() - started:.2f}s)"))
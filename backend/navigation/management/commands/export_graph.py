@@ -0,0 +1,36 @@
+# navigation/management/commands/export_graph.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from navigation.graph_io import FORMATS, write_csv, write_geojson, write_json, write_jsonl
+
+
+class Command(BaseCommand):
+    help = "노드와 엣지를 JSON/JSONL/CSV/GeoJSON 파일로 내보냅니다. (import_graph로 다시 가져올 수 있는 형식)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="저장할 파일 (기본: 표준 출력, CSV는 노드 파일)")
+        parser.add_argument('--format', choices=FORMATS, default='json', help="파일 형식 (기본: json)")
+        parser.add_argument('--edges', help="CSV 형식일 때 엣지를 저장할 파일")
+
+    def handle(self, *args, **options):
+        fmt, path = options['format'], options['path']
+        if fmt == 'csv' and path != '-' and not options['edges']:
+            self.stderr.write(self.style.WARNING("--edges를 지정하지 않아 노드만 내보냅니다."))
+        try:
+            fp = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+            try:
+                if fmt == 'csv':
+                    if options['edges']:
+                        with open(options['edges'], 'w', encoding='utf-8', newline='') as edges_fp:
+                            write_csv(fp, edges_fp)
+                    else:
+                        write_csv(fp)
+                else:
+                    {'json': write_json, 'jsonl': write_jsonl, 'geojson': write_geojson}[fmt](fp)
+            finally:
+                if fp is not sys.stdout:
+                    fp.close()
+        except OSError as exc:
+            raise CommandError(str(exc))
@@ -0,0 +1,30 @@
+# navigation/management/commands/generate_campus.py
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from navigation.synthetic import generate_campus
+
+
+class Command(BaseCommand):
+    help = "벤치마크용 가상 캠퍼스 그래프를 JSONL로 만듭니다. (manage.py import_graph 로 가져올 수 있음)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="저장할 파일 (기본: 표준 출력)")
+        parser.add_argument('--buildings', type=int, default=3)
+        parser.add_argument('--floors', type=int, default=5)
+        parser.add_argument('--width', type=int, default=10, help="층별 복도 격자 가로 노드 수")
+        parser.add_argument('--height', type=int, default=10, help="층별 복도 격자 세로 노드 수")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        records = generate_campus(options['buildings'], options['floors'], options['width'], options['height'],
+                                  seed=options['seed'])
+        fp = sys.stdout if options['path'] == '-' else open(options['path'], 'w', encoding='utf-8')
+        try:
+            for kind, data in records:
+                fp.write(json.dumps({'type': kind, **data}, ensure_ascii=False) + '\n')
+        finally:
+            if fp is not sys.stdout:
+                fp.close()
@@ -0,0 +1,43 @@
+# navigation/management/commands/import_graph.py
+from django.core.management.base import BaseCommand, CommandError
+
+from navigation.graph_io import FORMATS, GraphImporter, GraphImportError, read_csv, read_geojson, read_json, read_jsonl
+
+
+def guess_format(path: str) -> str:
+    suffix = path.rsplit('.', 1)[-1].lower()
+    return suffix if suffix in FORMATS else 'json'
+
+
+class Command(BaseCommand):
+    help = "JSON/JSONL/CSV/GeoJSON 파일에서 노드와 엣지를 한 트랜잭션으로 일괄 가져옵니다. (qr_id 기준으로 갱신)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="가져올 파일 (CSV는 노드 파일)")
+        parser.add_argument('--format', choices=FORMATS, help="파일 형식 (기본: 확장자로 판단)")
+        parser.add_argument('--edges', help="CSV 형식일 때 엣지 파일 (start,end,weight)")
+        parser.add_argument('--batch-size', type=int, default=1000, help="bulk_create/bulk_update 배치 크기")
+        parser.add_argument('--replace', action='store_true', help="가져오기 전에 기존 노드/엣지를 모두 삭제")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or guess_format(options['path'])
+        edges_fp = None
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as fp:
+                if fmt == 'csv':
+                    if options['edges']:
+                        edges_fp = open(options['edges'], encoding='utf-8-sig', newline='')
+                    records = read_csv(fp, edges_fp)
+                else:
+                    records = {'json': read_json, 'jsonl': read_jsonl, 'geojson': read_geojson}[fmt](fp)
+                counts = GraphImporter(batch_size=options['batch_size']).import_records(records, replace=options['replace'])
+        except (GraphImportError, ValueError, KeyError) as exc:
+            raise CommandError(f"가져오기 실패 (변경 사항 없음): {exc}")
+        except OSError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if edges_fp is not None:
+                edges_fp.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            "노드 {nodes_created}개 추가, {nodes_updated}개 갱신 / 엣지 {edges_created}개 추가, {edges_updated}개 갱신".format(**counts)))
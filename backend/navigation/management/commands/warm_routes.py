@@ -0,0 +1,32 @@
+# navigation/management/commands/warm_routes.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from navigation.graph_cache import get_graph
+from navigation.pathfinding import ENGINES
+from navigation.route_cache import ROUTE_CACHE_ALIAS, warm_route_cache
+
+
+class Command(BaseCommand):
+    help = "모든 QR 노드에서 모든 POI 노드까지의 경로를 미리 계산해 경로 캐시(CACHES['routes'])에 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engine', action='append', dest='engines', choices=ENGINES,
+                            help="캐시 키로 사용할 탐색 엔진 (여러 번 지정 가능, 기본: astar)")
+        parser.add_argument('--source-type', default='QR', help="출발 노드 유형 (기본: QR)")
+        parser.add_argument('--target-type', default='POI', help="도착 노드 유형 (기본: POI)")
+
+    def handle(self, *args, **options):
+        backend = settings.CACHES.get(ROUTE_CACHE_ALIAS, {}).get('BACKEND', '')
+        if backend.endswith('LocMemCache'):
+            # LocMemCache는 프로세스 안에서만 유효하므로 서버 워커에는 반영되지 않음
+            self.stderr.write(self.style.WARNING(
+                "CACHES['routes']가 LocMemCache입니다. 서버 워커와 공유되지 않으므로 "
+                "NAVIGATION_ROUTE_WARMUP = True 설정을 사용하세요."))
+
+        snapshot = get_graph()
+        if not len(snapshot.graph):
+            raise CommandError("그래프에 노드가 없습니다.")
+        stored = warm_route_cache(snapshot, engines=tuple(options['engines'] or ('astar',)),
+                                  source_type=options['source_type'], target_type=options['target_type'])
+        self.stdout.write(self.style.SUCCESS(f"그래프 v{snapshot.version}: 경로 {stored}개를 캐시에 저장했습니다."))
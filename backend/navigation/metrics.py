@@ -0,0 +1,89 @@
+# navigation/metrics.py
+# 경로 탐색 계측 (워커 프로세스별 카운터 + 지연 시간 히스토그램)
+# GET /api/navigation/metrics/ (JSON) 또는 /api/navigation/metrics/prometheus/ (Prometheus 텍스트) 로 조회합니다.
+import threading
+from bisect import bisect_left
+
+# 지연 시간 히스토그램 구간 상한 (ms)
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self) -> dict:
+        # Prometheus처럼 누적(cumulative) 개수로 표현
+        cumulative, total = {}, 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            cumulative[bound] = total
+        return {"count": self.count, "sum": self.sum, "buckets": cumulative}
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {name: h.as_dict() for name, h in self.histograms.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def prometheus(self, prefix: str = "navigation") -> str:
+        data = self.snapshot()
+        lines = []
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            lines.append(f"{prefix}_{name} {value}")
+        for name, h in sorted(data["histograms"].items()):
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for bound, count in h["buckets"].items():
+                lines.append(f'{prefix}_{name}_bucket{{le="{bound}"}} {count}')
+            lines.append(f"{prefix}_{name}_sum {h['sum']}")
+            lines.append(f"{prefix}_{name}_count {h['count']}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def record_pathfind(timings: dict, stats: dict, path_length: int, ok: bool) -> None:
+    # timings: load_ms / search_ms / serialize_ms, stats: CompiledGraph.find_path가 채운 값
+    metrics.incr("pathfind_requests_total")
+    metrics.incr("pathfind_success_total" if ok else "pathfind_failure_total")
+    if "cache" in stats:
+        metrics.incr(f"pathfind_cache_{stats['cache']}_total")
+    metrics.incr("pathfind_nodes_expanded_total", stats.get("expanded", 0))
+    metrics.incr("pathfind_heap_pushes_total", stats.get("pushes", 0))
+    metrics.incr("pathfind_path_nodes_total", path_length)
+    for name, value in timings.items():
+        metrics.observe(f"pathfind_{name}", value)
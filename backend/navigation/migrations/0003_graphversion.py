@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('navigation', '0002_node_building'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GraphVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, help_text='그래프 데이터 버전')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, help_text='마지막 변경 시각')),
+            ],
+        ),
+    ]
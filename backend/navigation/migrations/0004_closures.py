@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('navigation', '0003_graphversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graphversion',
+            name='closures_version',
+            field=models.PositiveBigIntegerField(default=0, help_text='임시 통제 버전'),
+        ),
+        migrations.CreateModel(
+            name='Closure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('penalty', models.FloatField(blank=True, help_text='추가 가중치. 비워 두면 완전히 통제 (통행 불가)', null=True)),
+                ('reason', models.CharField(blank=True, help_text='통제 사유 (예: 엘리베이터 정기 점검)', max_length=200)),
+                ('expires_at', models.DateTimeField(blank=True, help_text='자동 해제 시각 (비워 두면 직접 해제할 때까지)', null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('edge', models.ForeignKey(blank=True, help_text='통제할 엣지 (양방향)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='closures', to='navigation.edge')),
+                ('node', models.ForeignKey(blank=True, help_text='통제할 노드 (이 노드를 지나는 모든 경로에 적용)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='closures', to='navigation.node')),
+            ],
+            options={
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('edge__isnull', True), ('node__isnull', False)), models.Q(('edge__isnull', False), ('node__isnull', True)), _connector='OR'), name='closure_node_xor_edge'), models.CheckConstraint(condition=models.Q(('penalty__isnull', True), ('penalty__gte', 0), _connector='OR'), name='closure_penalty_non_negative')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('navigation', '0004_closures'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='node',
+            index=models.Index(fields=['building', 'floor'], name='node_building_floor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='node',
+            index=models.Index(fields=['building', 'floor', 'node_type'], name='node_building_floor_type_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('navigation', '0005_node_floor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='edge',
+            name='staff_only',
+            field=models.BooleanField(default=False, help_text='직원 전용 통로 (staff 라우팅 프로필에서만 지나갈 수 있음)'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:03
+
+import navigation.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('navigation', '0006_edge_staff_only'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graphversion',
+            name='token',
+            field=models.CharField(default=navigation.models.new_graph_token, editable=False, help_text='그래프 DB 식별값', max_length=32),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:08
+
+from django.db import migrations, models
+from django.db.models import Min
+from django.utils import timezone
+
+
+def set_next_expiry(apps, schema_editor):
+    # 이미 적용 중인 통제의 만료 시각도 조건부 GET에 반영되도록 다음 만료 시각을 채움
+    GraphVersion = apps.get_model('navigation', 'GraphVersion')
+    Closure = apps.get_model('navigation', 'Closure')
+    next_expiry = Closure.objects.filter(expires_at__gt=timezone.now()).aggregate(value=Min('expires_at'))['value']
+    GraphVersion.objects.filter(pk=1).update(closures_valid_until=next_expiry)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('navigation', '0007_graphversion_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graphversion',
+            name='closures_updated_at',
+            field=models.DateTimeField(blank=True, help_text='임시 통제가 마지막으로 바뀐 시각 (만료 포함)', null=True),
+        ),
+        migrations.AddField(
+            model_name='graphversion',
+            name='closures_valid_until',
+            field=models.DateTimeField(blank=True, help_text='다음 통제 만료 시각', null=True),
+        ),
+        migrations.RunPython(set_next_expiry, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,160 @@
-from django.db import models
+import secrets
+
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
+from django.db.models import F, Min
+from django.utils import timezone
+
+
+def new_graph_token() -> str:
+    return secrets.token_hex(16)
+
+
+class GraphVersion(models.Model):
+    # 경로 그래프(Node/Edge)가 바뀔 때마다 증가하는 전역 버전 (항상 pk=1 한 행만 사용)
+    # 모든 워커 프로세스가 이 값을 보고 자신이 들고 있는 그래프를 다시 만들지 결정합니다.
+    version = models.PositiveBigIntegerField(default=0, help_text="그래프 데이터 버전")
+    updated_at = models.DateTimeField(default=timezone.now, help_text="마지막 변경 시각")
+    # 임시 통제(Closure)가 바뀔 때마다 증가. 그래프는 다시 만들지 않고 통제 오버레이만 다시 만듭니다.
+    closures_version = models.PositiveBigIntegerField(default=0, help_text="임시 통제 버전")
+    closures_updated_at = models.DateTimeField(null=True, blank=True, help_text="임시 통제가 마지막으로 바뀐 시각 (만료 포함)")
+    # 적용 중인 통제 중 가장 먼저 만료되는 시각. 이 시각이 지나면 통제 버전을 올려서 ETag/Last-Modified가 바뀌게 함
+    closures_valid_until = models.DateTimeField(null=True, blank=True, help_text="다음 통제 만료 시각")
+    # 이 행을 만들 때 정하는 임의 값. 다른 DB(테스트 DB, 복원한 DB 등)에서 만든 그래프 스냅샷을 구별하는 데 사용
+    token = models.CharField(max_length=32, default=new_graph_token, editable=False, help_text="그래프 DB 식별값")
+
+    @classmethod
+    def current(cls) -> int:
+        version = cls.objects.filter(pk=1).values_list('version', flat=True).first()
+        return version or 0
+
+    STATE_FIELDS = ('version', 'updated_at', 'closures_version', 'closures_updated_at', 'closures_valid_until')
+
+    @classmethod
+    def state(cls):
+        # (버전, 마지막 변경 시각, 통제 버전). 아직 한 번도 바뀐 적이 없으면 (0, None, 0)
+        # 마지막 변경 시각은 임시 통제 변경(만료 포함)도 반영 (조건부 GET의 Last-Modified)
+        row = cls.objects.filter(pk=1).values_list(*cls.STATE_FIELDS).first()
+        if cls._closure_expired(row):
+            cls.expire_closures(row[4])
+            row = cls.objects.filter(pk=1).values_list(*cls.STATE_FIELDS).first()
+        return cls._state(row)
+
+    @staticmethod
+    def _closure_expired(row) -> bool:
+        return row is not None and row[4] is not None and row[4] <= timezone.now()
+
+    @staticmethod
+    def _state(row):
+        if row is None:
+            return 0, None, 0
+        version, updated_at, closures_version, closures_updated_at, _ = row
+        if closures_updated_at is not None and closures_updated_at > updated_at:
+            updated_at = closures_updated_at
+        return version, updated_at, closures_version
+
+    @classmethod
+    def expire_closures(cls, valid_until) -> None:
+        # 가장 먼저 만료되는 통제가 만료됨: 통제 버전을 올리고 다음 만료 시각을 기록
+        # 여러 워커가 동시에 호출해도 만료 시각이 같은 행만 갱신하므로 한 번만 올라감
+        cls.objects.filter(pk=1, closures_valid_until=valid_until).update(
+            closures_version=F('closures_version') + 1, closures_updated_at=valid_until,
+            closures_valid_until=Closure.objects.next_expiry())
+
+    @classmethod
+    def fingerprint(cls):
+        # (버전, 지문). 스냅샷 파일(snapshot.py)이 이 DB의 이 버전에서 만들어졌는지 확인하는 값
+        # 버전 번호만 비교하면 다른 DB에서 같은 버전까지 올라간 스냅샷도 통과하므로 DB 식별값과 변경 시각을 함께 씀
+        row = cls.objects.filter(pk=1).values_list('version', 'updated_at', 'token').first()
+        if row is None:
+            return 0, None
+        version, updated_at, token = row
+        return version, f"{token}:{version}:{updated_at.isoformat()}"
+
+    @classmethod
+    def versions(cls):
+        # (그래프 버전, 통제 버전). 경로 탐색 요청마다 한 번 조회
+        row = cls.objects.filter(pk=1).values_list('version', 'closures_version').first()
+        return row or (0, 0)
+
+    # 비동기 뷰용 (이벤트 루프에서 동기 ORM을 호출하면 SynchronousOnlyOperation)
+    @classmethod
+    async def acurrent(cls) -> int:
+        version = await cls.objects.filter(pk=1).values_list('version', flat=True).afirst()
+        return version or 0
+
+    @classmethod
+    async def aversions(cls):
+        row = await cls.objects.filter(pk=1).values_list('version', 'closures_version').afirst()
+        return row or (0, 0)
+
+    @classmethod
+    async def astate(cls):
+        row = await cls.objects.filter(pk=1).values_list(*cls.STATE_FIELDS).afirst()
+        if cls._closure_expired(row):
+            await sync_to_async(cls.expire_closures)(row[4])
+            row = await cls.objects.filter(pk=1).values_list(*cls.STATE_FIELDS).afirst()
+        return cls._state(row)
+
+    @classmethod
+    def bump(cls) -> None:
+        updated = cls.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+        if not updated:
+            obj, created = cls.objects.get_or_create(pk=1, defaults={'version': 1})
+            if not created:
+                cls.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+
+    @classmethod
+    def bump_closures(cls) -> None:
+        # 노드 데이터는 그대로이므로 updated_at(그래프 스냅샷 지문)은 바꾸지 않고 통제 변경 시각만 기록
+        now = timezone.now()
+        changes = {'closures_updated_at': now, 'closures_valid_until': Closure.objects.next_expiry(now)}
+        updated = cls.objects.filter(pk=1).update(closures_version=F('closures_version') + 1, **changes)
+        if not updated:
+            obj, created = cls.objects.get_or_create(pk=1, defaults={'closures_version': 1, **changes})
+            if not created:
+                cls.objects.filter(pk=1).update(closures_version=F('closures_version') + 1, **changes)
+
+    @classmethod
+    def bump_on_commit(cls, using=None) -> None:
+        # 커밋 이후에 버전을 올림. 한 트랜잭션 안에서 여러 번 바뀌어도 (일괄 삭제 등) 한 번만 올립니다.
+        cls._once_on_commit(cls.bump, using)
+
+    @classmethod
+    def bump_closures_on_commit(cls, using=None) -> None:
+        cls._once_on_commit(cls.bump_closures, using)
+
+    @staticmethod
+    def _once_on_commit(func, using=None) -> None:
+        connection = transaction.get_connection(using)
+        if connection.in_atomic_block and any(entry[1] == func for entry in connection.run_on_commit):
+            return
+        transaction.on_commit(func, using=using)
+
+    def __str__(self):
+        return f"graph v{self.version} ({self.updated_at:%Y-%m-%d %H:%M:%S})"
+
+
+class GraphQuerySet(models.QuerySet):
+    # update()/bulk_create()/bulk_update()는 post_save 시그널을 보내지 않으므로 여기서 직접 버전을 올립니다.
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            GraphVersion.bump_on_commit(using=self.db)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        if created:
+            GraphVersion.bump_on_commit(using=self.db)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        if rows:
+            GraphVersion.bump_on_commit(using=self.db)
+        return rows
+
 
 class Node(models.Model):
     NODE_TYPE_CHOICES = [
@@ -21,6 +177,15 @@ class Node(models.Model):
     node_type = models.CharField(max_length=20, choices=NODE_TYPE_CHOICES, default='ETC', help_text="노드 유형")
     description = models.TextField(blank=True, null=True, help_text="노드에 대한 추가 설명")
 
+    objects = GraphQuerySet.as_manager()
+
+    class Meta:
+        # 층 화면/층 번들/검색 필터가 (건물, 층[, 유형])으로 조회
+        indexes = [
+            models.Index(fields=['building', 'floor'], name='node_building_floor_idx'),
+            models.Index(fields=['building', 'floor', 'node_type'], name='node_building_floor_type_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.floor} - QR: {self.qr_id or 'N/A'})"
     
@@ -28,6 +193,64 @@ class Edge(models.Model):
     start_node = models.ForeignKey(Node, related_name='starting_edges', on_delete=models.CASCADE, help_text="시작 노드")
     end_node = models.ForeignKey(Node, related_name='ending_edges', on_delete=models.CASCADE, help_text="도착 노드")
     weight = models.FloatField(default=1.0, help_text="가중치 (보통 노드 간의 픽셀 거리를 저장)")
+    staff_only = models.BooleanField(default=False, help_text="직원 전용 통로 (staff 라우팅 프로필에서만 지나갈 수 있음)")
+
+    objects = GraphQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.start_node.name} -> {self.end_node.name} (가중치: {self.weight})"
+
+
+class ClosureQuerySet(models.QuerySet):
+    def active(self, now=None):
+        # 만료되지 않은 통제
+        now = now or timezone.now()
+        return self.filter(models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=now))
+
+    def next_expiry(self, now=None):
+        # 아직 만료되지 않은 통제 중 가장 빠른 만료 시각 (없으면 None)
+        now = now or timezone.now()
+        return self.filter(expires_at__gt=now).aggregate(next_expiry=Min('expires_at'))['next_expiry']
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            GraphVersion.bump_closures_on_commit(using=self.db)
+        return rows
+
+
+class Closure(models.Model):
+    # 운영 중 임시 통제 (엘리베이터 점검, 행사로 복도 폐쇄 등)
+    # Edge를 고치면 그래프 전체를 다시 만들어야 하므로, 대신 탐색할 때 컴파일된 그래프의 가중치 위에 덧씌웁니다. (closures.py)
+    node = models.ForeignKey(Node, related_name='closures', on_delete=models.CASCADE, null=True, blank=True,
+                             help_text="통제할 노드 (이 노드를 지나는 모든 경로에 적용)")
+    edge = models.ForeignKey(Edge, related_name='closures', on_delete=models.CASCADE, null=True, blank=True,
+                             help_text="통제할 엣지 (양방향)")
+    penalty = models.FloatField(null=True, blank=True,
+                                help_text="추가 가중치. 비워 두면 완전히 통제 (통행 불가)")
+    reason = models.CharField(max_length=200, blank=True, help_text="통제 사유 (예: 엘리베이터 정기 점검)")
+    expires_at = models.DateTimeField(null=True, blank=True, help_text="자동 해제 시각 (비워 두면 직접 해제할 때까지)")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = ClosureQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(node__isnull=False, edge__isnull=True) | models.Q(node__isnull=True, edge__isnull=False),
+                name='closure_node_xor_edge',
+            ),
+            models.CheckConstraint(
+                condition=models.Q(penalty__isnull=True) | models.Q(penalty__gte=0),
+                name='closure_penalty_non_negative',
+            ),
+        ]
+
+    @property
+    def closed(self) -> bool:
+        return self.penalty is None
 
     def __str__(self):
-        return f"{self.start_node.name} -> {self.end_node.name} (가중치: {self.weight})"
\ No newline at end of file
+        target = self.node if self.node_id else self.edge
+        effect = "통제" if self.closed else f"+{self.penalty}"
+        return f"{target} {effect}" + (f" (~{self.expires_at:%Y-%m-%d %H:%M})" if self.expires_at else "")
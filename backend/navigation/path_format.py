@@ -0,0 +1,122 @@
+# navigation/path_format.py
+# 경로 응답의 compact 형식 (pathfind 요청에 "format": "compact")
+# 기본 형식은 경로의 모든 노드마다 {"id", "x", "y", "floor", "building"}를 반복하지만,
+# compact 형식은 (건물, 층)별 구간으로 나누고 일직선 위의 점을 Douglas-Peucker로 줄인 뒤 좌표를 평평한 배열로 보냅니다.
+#
+# {
+#   "format": "compact", "distance": 123.4, "start": "QR_A", "end": "QR_B", "points": 58,
+#   "segments": [
+#     {"building": "본관", "floor": "1F", "start": "QR_A", "end": "EV_1F", "coords": [x0, y0, x1, y1, ...]},
+#     {"building": "본관", "floor": "3F", "start": "EV_3F", "end": "QR_B", "coords": [...]}
+#   ],
+#   "transitions": [
+#     {"type": "ELEVATOR", "from_segment": 0, "to_segment": 1, "exit": "EV_1F", "entry": "EV_3F", "floors": 2}
+#   ]
+# }
+# transitions[].type은 갈아타는 노드의 종류(ELEVATOR/STAIRS)이고, 그 외 건물 간 이동은 "PASSAGE"입니다. (floors 없음)
+# 엘리베이터/계단으로 여러 층을 지나가는 경우 중간 층은 구간을 만들지 않고 floors(이동한 층 수)로만 표시합니다.
+from .pathfinding import PORTAL_NODE_TYPES
+
+PATH_FORMATS = ('full', 'compact')
+# Douglas-Peucker 허용 오차 (픽셀). 0이면 정확히 일직선 위에 있는 점만 제거
+DEFAULT_TOLERANCE = 1.0
+
+
+def simplify(xs, ys, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    # Douglas-Peucker. 남길 점의 번호 목록(처음/끝 포함, 오름차순)을 반환
+    n = len(xs)
+    if n <= 2:
+        return list(range(n))
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        length_sq = dx * dx + dy * dy
+        farthest, max_dist_sq = -1, -1.0
+        for i in range(first + 1, last):
+            px, py = xs[i] - ax, ys[i] - ay
+            if length_sq:
+                # 선분까지의 거리 (투영점이 선분 밖이면 끝점까지의 거리)
+                t = min(max((px * dx + py * dy) / length_sq, 0.0), 1.0)
+                px -= t * dx
+                py -= t * dy
+            dist_sq = px * px + py * py
+            if dist_sq > max_dist_sq:
+                farthest, max_dist_sq = i, dist_sq
+        if farthest >= 0 and max_dist_sq > tolerance * tolerance:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [i for i in range(n) if keep[i]]
+
+
+def transition_type(graph, exit_node: int, entry_node: int) -> str:
+    for i in (exit_node, entry_node):
+        node_type = graph.node_type(i)
+        if node_type in PORTAL_NODE_TYPES:
+            return node_type
+    return "PASSAGE"
+
+
+def compact_path(graph, result: dict, tolerance: float = DEFAULT_TOLERANCE) -> dict:
+    # CompiledGraph.path_result() 형식의 결과를 compact 형식으로 변환 (result는 수정하지 않음)
+    nodes = [graph.index[point["id"]] for point in result["path"]]
+    compact = {
+        "format": "compact",
+        "distance": result["distance"],
+        "start": result["path"][0]["id"] if nodes else None,
+        "end": result["path"][-1]["id"] if nodes else None,
+        "points": len(nodes),
+        "segments": [],
+        "transitions": [],
+    }
+
+    # (건물, 층)이 바뀌는 곳에서 자름
+    runs = []
+    for i in nodes:
+        cell = (graph.building_ids[i], graph.floor_ids[i])
+        if runs and runs[-1][0] == cell:
+            runs[-1][1].append(i)
+        else:
+            runs.append((cell, [i]))
+
+    segments, transitions = compact["segments"], compact["transitions"]
+    pending = None  # 아직 도착 구간이 정해지지 않은 환승
+    for position, (cell, run) in enumerate(runs):
+        if pending is not None:
+            # 엘리베이터/계단의 중간 층: 한 점짜리 구간이고 같은 종류로 계속 이동하면 구간을 만들지 않음
+            is_last = position == len(runs) - 1
+            if len(run) == 1 and not is_last and pending["type"] != "PASSAGE" \
+                    and transition_type(graph, run[0], runs[position + 1][1][0]) == pending["type"]:
+                pending["floors"] += 1
+                continue
+            pending["entry"] = graph.ids[run[0]]
+            pending["to_segment"] = len(segments)
+            transitions.append(pending)
+
+        xs = [graph.xs[i] for i in run]
+        ys = [graph.ys[i] for i in run]
+        coords = []
+        for k in simplify(xs, ys, tolerance):
+            location = graph.location(run[k])
+            coords.append(location["x"])
+            coords.append(location["y"])
+        segments.append({
+            "building": graph.building_names[cell[0]],
+            "floor": graph.floor_names[cell[1]],
+            "start": graph.ids[run[0]],
+            "end": graph.ids[run[-1]],
+            "coords": coords,
+        })
+        if position < len(runs) - 1:
+            pending = {
+                "type": transition_type(graph, run[-1], runs[position + 1][1][0]),
+                "from_segment": len(segments) - 1,
+                "exit": graph.ids[run[-1]],
+            }
+            if pending["type"] != "PASSAGE":
+                pending["floors"] = 1
+    return compact
@@ -1,90 +1,331 @@
+import copy
 import heapq
-import json
+import logging
 import math
+from array import array
+from functools import cached_property
+
+logger = logging.getLogger(__name__)
+
+FLOOR_WEIGHT = 50
+BUILDING_WEIGHT = 100
+
+# 층/건물을 오가는 연결 지점으로 쓰이는 노드 유형
+PORTAL_NODE_TYPES = ('ELEVATOR', 'STAIRS')
+
+# PathfindView에서 선택할 수 있는 탐색 엔진
+ENGINES = ('astar', 'hierarchical', 'alt')
+
+
+def floor_number(floor) -> float:
+    # '1F' -> 1, 'B1' -> -1 (지하층), 숫자가 없으면 nan
+    text = str(floor or "").strip().upper()
+    digits = "".join(filter(str.isdigit, text))
+    if not digits:
+        return math.nan
+    number = float(digits)
+    return -number if text.startswith("B") else number
+
+
+def unwind(prev: dict, node: int) -> list:
+    # prev(이전 노드) 사슬을 따라가서 출발지 -> node 순서의 경로를 만듭니다. 출발지의 prev는 -1
+    path = []
+    while node != -1:
+        path.append(node)
+        node = prev[node]
+    path.reverse()
+    return path
+
+
+class CompiledGraph:
+    # 노드를 0..N-1 정수로 번호 매기고, 인접 리스트를 CSR(offsets/targets/weights) 배열로 저장한 그래프
+    # 좌표/층/건물도 노드 번호와 같은 순서의 병렬 배열로 저장합니다.
+    def __init__(self, ids, xs, ys, floor_ids, floor_names, building_ids, building_names, type_ids, type_names,
+                 offsets, targets, weights):
+        self.ids = ids                        # 노드 번호 -> qr_id
+        self.index = {qr_id: i for i, qr_id in enumerate(ids)}
+        self.xs = xs
+        self.ys = ys
+        self.floor_ids = floor_ids            # 노드 번호 -> floor_names 인덱스
+        self.floor_names = floor_names
+        self.floor_nums = array("d", (floor_number(name) for name in floor_names))
+        self.building_ids = building_ids      # 노드 번호 -> building_names 인덱스
+        self.building_names = building_names
+        self.type_ids = type_ids              # 노드 번호 -> type_names 인덱스 (node_type)
+        self.type_names = type_names
+        self.offsets = offsets                # 노드 i의 이웃은 targets[offsets[i]:offsets[i + 1]]
+        self.targets = targets
+        self.weights = weights
+        self.base = None                      # with_weights()로 만든 그래프면 원래 그래프
+        # 그래프 버전마다 한 번 만드는 그래프(원래 그래프, 라우팅 프로필)인지. 이런 그래프는 자기 포털 거리표를 만들고,
+        # 임시 통제 오버레이처럼 자주 바뀌는 그래프는 ALT로 탐색
+        self.precompiled = True
+
+    @classmethod
+    def from_rows(cls, node_rows, edge_rows, bidirectional: bool = True) -> "CompiledGraph":
+        # node_rows: (qr_id, pixel_x, pixel_y, floor, building, node_type) / edge_rows: (start qr_id, end qr_id, weight)
+        # bidirectional=True 이면 엣지 하나를 양방향으로 등록합니다. (DB의 Edge는 방향이 없음)
+        ids, xs, ys = [], array("d"), array("d")
+        floor_ids, building_ids, type_ids = array("l"), array("l"), array("l")
+        floor_lookup, building_lookup, type_lookup = {}, {}, {}
+        index = {}
+        for qr_id, x, y, floor, building, node_type in node_rows:
+            if not qr_id or qr_id in index:
+                continue
+            index[qr_id] = len(ids)
+            ids.append(qr_id)
+            xs.append(x)
+            ys.append(y)
+            floor_ids.append(floor_lookup.setdefault(floor, len(floor_lookup)))
+            building_ids.append(building_lookup.setdefault(building, len(building_lookup)))
+            type_ids.append(type_lookup.setdefault(node_type, len(type_lookup)))
+
+        # 엣지를 (출발, 도착, 가중치) 배열로 모은 뒤 출발 노드 기준으로 CSR 구성
+        sources, dests, costs = array("l"), array("l"), array("d")
+        for start_qr, end_qr, weight in edge_rows:
+            u = index.get(start_qr)
+            v = index.get(end_qr)
+            if u is None or v is None:
+                continue
+            sources.append(u); dests.append(v); costs.append(weight)
+            if bidirectional:
+                sources.append(v); dests.append(u); costs.append(weight)
+
+        n = len(ids)
+        offsets = array("l", bytes(array("l").itemsize * (n + 1)))
+        for u in sources:
+            offsets[u + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        cursor = array("l", offsets[:n])
+        targets = array("l", bytes(array("l").itemsize * len(sources)))
+        weights = array("d", bytes(array("d").itemsize * len(sources)))
+        for u, v, w in zip(sources, dests, costs):
+            pos = cursor[u]
+            targets[pos] = v
+            weights[pos] = w
+            cursor[u] = pos + 1
+
+        return cls(ids, xs, ys, floor_ids, list(floor_lookup), building_ids, list(building_lookup),
+                   type_ids, list(type_lookup), offsets, targets, weights)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def location(self, i: int) -> dict:
+        x, y = self.xs[i], self.ys[i]
+        return {
+            "x": int(x) if x.is_integer() else x,
+            "y": int(y) if y.is_integer() else y,
+            "floor": self.floor_names[self.floor_ids[i]],
+            "building": self.building_names[self.building_ids[i]],
+        }
+
+    def node_type(self, i: int):
+        return self.type_names[self.type_ids[i]]
+
+    def heuristic(self, u: int, goal: int) -> float:
+        xs, ys = self.xs, self.ys
+        floor_diff = self.floor_nums[self.floor_ids[u]] - self.floor_nums[self.floor_ids[goal]]
+        if floor_diff != floor_diff:  # nan: 층 번호를 알 수 없으면 층 차이 없다고 가정
+            floor_diff = 0
+        building_penalty = BUILDING_WEIGHT if self.building_ids[u] != self.building_ids[goal] else 0
+        dx = xs[u] - xs[goal]
+        dy = ys[u] - ys[goal]
+        return math.sqrt(dx * dx + dy * dy + (FLOOR_WEIGHT * floor_diff) ** 2) + building_penalty
+
+    def path_result(self, nodes, distance: float) -> dict:
+        return {"path": [{"id": self.ids[i], **self.location(i)} for i in nodes], "distance": distance}
+
+    def astar(self, start: str, end: str, heuristic=None, stats: dict = None) -> dict:
+        # heuristic(u, goal)을 바꿔 끼우면 다른 하한(예: ALT 랜드마크)으로 같은 A*를 돌릴 수 있습니다.
+        # stats에 dict를 넘기면 확장한 노드 수(expanded)와 힙 push 횟수(pushes)를 기록합니다.
+        s = self.index.get(start)
+        if s is None:
+            return {"path": [], "distance": None, "error": f"Start node '{start}' not in graph."}
+        e = self.index.get(end)
+        if e is None:
+            return {"path": [], "distance": None, "error": f"End node '{end}' not in graph."}
+
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        heuristic = heuristic or self.heuristic
+        # 방문한 노드만 딕셔너리에 기록 (전체 노드 초기화 없음)
+        g_score = {s: 0.0}
+        came_from = {s: -1}
+        open_set = [(heuristic(s, e), 0.0, s)]
+        expanded = pushes = 0
+        result = None
+        while open_set:
+            _, g, current = heapq.heappop(open_set)
+            if g > g_score[current]:
+                continue  # 더 짧은 경로로 이미 갱신된 오래된 항목
+            expanded += 1
+            if current == e:
+                result = self.path_result(unwind(came_from, current), g)
+                break
+            for pos in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[pos]
+                tentative_g = g + weights[pos]
+                if tentative_g < g_score.get(neighbor, math.inf):
+                    h = heuristic(neighbor, e)
+                    if h == math.inf:
+                        continue  # 목적지에 도달할 수 없는 노드
+                    g_score[neighbor] = tentative_g
+                    came_from[neighbor] = current
+                    heapq.heappush(open_set, (tentative_g + h, tentative_g, neighbor))
+                    pushes += 1
+
+        if stats is not None:
+            stats["expanded"] = expanded
+            stats["pushes"] = pushes
+        return result or {"path": [], "distance": None, "error": "경로를 탐색할 수 없습니다."}
+
+    def dijkstra(self, source: int, targets=None, stop=None):
+        # source에서 시작하는 다익스트라. targets(노드 번호 집합)를 모두 확정하면 조기 종료합니다.
+        # stop(노드 번호, 거리)을 넘기면 노드를 확정할 때마다 호출하고, True를 돌려주면 그 자리에서 멈춥니다.
+        # (dist, prev) 딕셔너리를 돌려주며, 경로는 unwind(prev, node)로 복원합니다.
+        # 조기 종료한 경우 확정한 노드(targets에 포함된 노드 등)의 거리만 확정값입니다.
+        offsets, targets_, weights = self.offsets, self.targets, self.weights
+        remaining = set(targets) if targets is not None else None
+        dist = {source: 0.0}
+        prev = {source: -1}
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if stop is not None and stop(u, d):
+                break
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining:
+                    break
+            for pos in range(offsets[u], offsets[u + 1]):
+                v = targets_[pos]
+                nd = d + weights[pos]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+        return dist, prev
+
+    def nearest(self, start: str, match, k: int = 5, with_paths: int = 0) -> dict:
+        # start에서 다익스트라 한 번으로 match(노드 번호)가 True인 노드 중 가까운 k개를 찾습니다.
+        # 앞에서부터 with_paths개의 결과에는 전체 경로도 포함합니다.
+        s = self.index.get(start)
+        if s is None:
+            return {"results": [], "error": f"Start node '{start}' not in graph."}
+
+        found = []
+
+        def visit(u, d):
+            if match(u):
+                found.append((u, d))
+            return len(found) >= k
+
+        if k > 0:
+            _, prev = self.dijkstra(s, stop=visit)
+
+        results = []
+        for rank, (u, d) in enumerate(found):
+            item = {"id": self.ids[u], **self.location(u), "node_type": self.node_type(u), "distance": d}
+            if rank < with_paths:
+                item["path"] = self.path_result(unwind(prev, u), d)["path"]
+            results.append(item)
+        return {"results": results}
+
+    def shortest_distances(self, source: int) -> array:
+        # source에서 모든 노드까지의 최단 거리 (도달할 수 없으면 inf)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        dist = array("d", [math.inf]) * len(self)
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for pos in range(offsets[u], offsets[u + 1]):
+                v = targets[pos]
+                nd = d + weights[pos]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return dist
+
+    def add_edge_weight(self, weights, u: int, v: int, amount: float) -> None:
+        # weights(이 그래프와 같은 구조의 가중치 배열)에서 u -> v 엣지에 amount를 더함 (inf면 통행 불가)
+        # DB의 엣지는 양방향으로 컴파일되므로 v로 들어오는 엣지는 이웃 u의 인접 리스트에서 찾음
+        # (임시 통제 오버레이 closures.py, 라우팅 프로필 profiles.py)
+        offsets, targets = self.offsets, self.targets
+        for pos in range(offsets[u], offsets[u + 1]):
+            if targets[pos] == v:
+                weights[pos] += amount
+
+    def with_weights(self, weights, precompiled: bool = False) -> "CompiledGraph":
+        # 노드/엣지 구조는 공유하고 가중치 배열만 바꾼 그래프 (임시 통제 오버레이 closures.py, 라우팅 프로필 profiles.py)
+        # 가중치가 늘어나기만 하면 원래 그래프의 랜드마크 거리는 여전히 허용 가능한 하한입니다.
+        graph = copy.copy(self)
+        graph.__dict__.pop("hierarchy", None)
+        graph.__dict__.pop("landmarks", None)
+        graph.weights = weights
+        graph.base = self.base or self
+        graph.precompiled = precompiled
+        return graph
+
+    @cached_property
+    def hierarchy(self):
+        # 층별 포털 거리표는 처음 필요할 때 한 번만 계산 (그래프 버전이 바뀌면 그래프와 함께 버려짐)
+        from .hierarchy import FloorHierarchy
+        return FloorHierarchy(self)
+
+    @cached_property
+    def landmarks(self):
+        # ALT 랜드마크 거리 배열도 그래프 버전마다 한 번만 계산
+        if self.base is not None:
+            return self.base.landmarks
+        from .landmarks import Landmarks
+        return Landmarks(self)
+
+    def find_path(self, start: str, end: str, engine: str = "astar", stats: dict = None) -> dict:
+        if engine == "hierarchical":
+            if self.precompiled:
+                return self.hierarchy.route(start, end, stats=stats)
+            # 가중치를 바꾼 그래프는 포털 거리표를 다시 만들지 않고 ALT로 탐색
+            engine = "alt"
+            if stats is not None:
+                stats["engine"] = engine
+        if engine == "alt":
+            return self.astar(start, end, heuristic=self.landmarks.heuristic, stats=stats)
+        return self.astar(start, end, stats=stats)
+
 
 class PathFinder:
+    # 기존 dict 형식(graph/locations) 호환용 래퍼. 내부적으로 CompiledGraph로 변환해서 탐색합니다.
     def __init__(self, graph: dict, locations: dict):
         self.graph = graph
         self.locations = locations
+        self.compiled = CompiledGraph.from_rows(
+            ((qr_id, loc["x"], loc["y"], loc["floor"], loc.get("building"), loc.get("node_type"))
+             for qr_id, loc in locations.items()),
+            ((u, v, w) for u, neighbors in graph.items() for v, w in neighbors),
+            bidirectional=False,
+        )
 
     def heuristic(self, node: str, goal: str) -> float:
-        loc1 = self.locations.get(node)
-        loc2 = self.locations.get(goal)
-        if not loc1 or not loc2: return float("inf")
-        x1, y1, floor1 = loc1["x"], loc1["y"], loc1["floor"]
-        x2, y2, floor2 = loc2["x"], loc2["y"], loc2["floor"]
-        try:
-            # floor 값이 '1F' 같은 문자열일 경우를 대비해 숫자만 추출 시도
-            floor_num1 = float("".join(filter(str.isdigit, str(floor1))))
-            floor_num2 = float("".join(filter(str.isdigit, str(floor2))))
-            floor_diff = floor_num1 - floor_num2
-        except (ValueError, TypeError):
-            floor_diff = 0 # 숫자 변환 실패 시 층 차이 없다고 가정
-            
-        floor_weight = 50 
-        building_weight = 100
-        building_penalty = 0
-        if loc1.get("building") != loc2.get("building"): building_penalty = building_weight
-        return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2 + (floor_weight * floor_diff) ** 2) + building_penalty
+        u = self.compiled.index.get(node)
+        v = self.compiled.index.get(goal)
+        if u is None or v is None: return float("inf")
+        return self.compiled.heuristic(u, v)
 
     def astar(self, start: str, end: str) -> dict:
-        print(f"\n[DEBUG] A* Algorithm Started. From '{start}' To '{end}'")
-        if start not in self.graph:
-            print(f"[DEBUG] ERROR: Start node '{start}' is not in the graph keys.")
-            return {"path": [], "distance": None, "error": f"Start node '{start}' not in graph."}
-        if end not in self.graph:
-            print(f"[DEBUG] ERROR: End node '{end}' is not in the graph keys.")
-            return {"path": [], "distance": None, "error": f"End node '{end}' not in graph."}
+        return self.compiled.astar(start, end)
 
-        open_set = [(0, start)]
-        came_from = {}
-        g_score = {node: float("inf") for node in self.graph}
-        g_score[start] = 0
-        f_score = {node: float("inf") for node in self.graph}
-        f_score[start] = self.heuristic(start, end)
 
-        while open_set:
-            _, current = heapq.heappop(open_set)
-            print(f"[DEBUG] Current node being processed: {current}")
-
-            if current == end:
-                print("[DEBUG] SUCCESS: Goal reached!")
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start)
-                path.reverse()
-                return {"path": [{"id": n, **self.locations[n]} for n in path], "distance": g_score[end]}
-            
-            for neighbor, weight in self.graph.get(current, []):
-                tentative_g = g_score[current] + weight
-                if tentative_g < g_score.get(neighbor, float("inf")):
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f_score[neighbor] = tentative_g + self.heuristic(neighbor, end)
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-                    
-        print("[DEBUG] FAILURE: Open set is empty but goal was not reached.")
-        return {"path": [], "distance": None, "error": "경로를 탐색할 수 없습니다."}
-
-
-def find_shortest_path(start_node_id: str, end_node_id: str, nodes_qs, edges_qs) -> dict:
-    locations = {
-        node.qr_id: {"x": node.pixel_x, "y": node.pixel_y, "floor": node.floor, "building": node.building}
-        for node in nodes_qs if node.qr_id
-    }
-    graph = {node.qr_id: [] for node in nodes_qs if node.qr_id}
-    for edge in edges_qs:
-        if edge.start_node and edge.start_node.qr_id and edge.end_node and edge.end_node.qr_id:
-            graph[edge.start_node.qr_id].append((edge.end_node.qr_id, edge.weight))
-            graph[edge.end_node.qr_id].append((edge.start_node.qr_id, edge.weight))
-
-    print("\n--- [DEBUG] Data being passed to PathFinder ---")
-    print("Locations:", json.dumps(locations, indent=2))
-    print("Graph:", json.dumps(graph, indent=2))
-    print("---------------------------------------------")
-
-    finder = PathFinder(graph=graph, locations=locations)
-    result = finder.astar(start=start_node_id, end=end_node_id)
-    return result
+def find_shortest_path(start_node_id: str, end_node_id: str, nodes_qs, edges_qs, stats: dict = None) -> dict:
+    graph = CompiledGraph.from_rows(
+        ((node.qr_id, node.pixel_x, node.pixel_y, node.floor, node.building, node.node_type) for node in nodes_qs),
+        ((edge.start_node.qr_id, edge.end_node.qr_id, edge.weight) for edge in edges_qs
+         if edge.start_node and edge.end_node),
+    )
+    logger.debug("find_shortest_path: %d nodes, %d directed edges", len(graph), len(graph.targets))
+    return graph.astar(start=start_node_id, end=end_node_id, stats=stats)
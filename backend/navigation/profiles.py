@@ -0,0 +1,111 @@
+# navigation/profiles.py
+# 라우팅 프로필 (pathfind 요청의 "profile")
+# 요청마다 엣지를 거르면 모든 탐색이 느려지고 경로 캐시도 나눠야 하므로, 프로필마다 가중치만 바꾼 그래프를
+# 그래프 버전마다 한 번 만들어 둡니다. (구조는 원래 그래프와 공유, CompiledGraph.with_weights)
+#
+#   default       : 방문객. 직원 전용 통로(Edge.staff_only)는 지나가지 않음
+#   step_free     : 휠체어/유모차. default + 계단(STAIRS) 노드를 지나가지 않음
+#   staff         : 직원 전용 통로도 사용 (관리자 계정만 선택 가능)
+#   shortest_time : default + 엘리베이터에 탈 때 대기 시간, 계단으로 층을 오를 때 느린 걸음을 거리로 환산해서 더함
+#
+# 모든 프로필은 원래 그래프(직원 통로 포함)보다 가중치를 늘리기만 합니다. (통행 불가는 inf)
+# 그래서 A*의 좌표 휴리스틱과 원래 그래프에서 만든 ALT 랜드마크가 프로필 그래프에서도 과대평가되지 않습니다.
+# 계층 탐색(hierarchy.py)은 그래프가 대칭이라고 가정하므로 모든 규칙을 양방향에 똑같이 적용합니다.
+# (엘리베이터 대기 시간은 탈 때와 내릴 때 절반씩)
+# 응답의 distance는 프로필 기준 비용입니다. (shortest_time은 대기 시간을 포함한 거리 환산 값)
+import math
+from array import array
+
+from .graph_cache import get_graph, get_versioned
+from .models import Edge
+
+DEFAULT_PROFILE = 'default'
+# 엘리베이터 대기 시간을 걸어서 갈 수 있는 거리(픽셀)로 환산한 값
+ELEVATOR_WAIT_PENALTY = 150.0
+# 계단으로 층을 오갈 때 같은 거리를 평지에서 걷는 것보다 걸리는 시간 배율
+STAIRS_FLOOR_FACTOR = 2.0
+
+
+class RoutingProfile:
+    def __init__(self, name: str, label: str, staff: bool = False, excluded_node_types=(), entry_penalties=None,
+                 floor_change_factors=None, requires_staff: bool = False):
+        self.name = name
+        self.label = label
+        self.staff = staff                                    # 직원 전용 통로를 지나갈 수 있는지
+        self.excluded_node_types = tuple(excluded_node_types)  # 지나갈 수 없는 노드 유형
+        # 노드 유형 -> 다른 유형의 노드에서 그 유형으로 들어가서 나올 때까지 더하는 값 (엘리베이터 대기 등)
+        self.entry_penalties = dict(entry_penalties or {})
+        # 노드 유형 -> 같은 유형끼리 층을 오가는 엣지의 가중치 배율 (계단 오르기 등)
+        self.floor_change_factors = dict(floor_change_factors or {})
+        self.requires_staff = requires_staff                  # 관리자 계정만 요청할 수 있는 프로필
+        # 가중치를 줄이면 휴리스틱/랜드마크가 과대평가될 수 있음
+        if any(penalty < 0 for penalty in self.entry_penalties.values()):
+            raise ValueError(f"routing profile {name}: entry penalties must not be negative")
+        if any(factor < 1 for factor in self.floor_change_factors.values()):
+            raise ValueError(f"routing profile {name}: floor change factors must be at least 1")
+
+    def weights(self, graph, staff_edges):
+        # graph(원래 그래프)의 가중치 배열을 복사해서 이 프로필의 규칙을 적용. 바꿀 것이 없으면 None
+        # staff_edges: 직원 전용 엣지 (노드 번호, 노드 번호) 목록
+        offsets, targets, type_ids = graph.offsets, graph.targets, graph.type_ids
+        type_of = {name: t for t, name in enumerate(graph.type_names)}
+        excluded = {type_of[name] for name in self.excluded_node_types if name in type_of}
+        penalties = {type_of[name]: value for name, value in self.entry_penalties.items() if name in type_of}
+        factors = {type_of[name]: value for name, value in self.floor_change_factors.items() if name in type_of}
+        blocked_edges = [] if self.staff else staff_edges
+        if not (excluded or penalties or factors or blocked_edges):
+            return None
+
+        weights = array("d", graph.weights)
+        for u, v in blocked_edges:
+            graph.add_edge_weight(weights, u, v, math.inf)
+            graph.add_edge_weight(weights, v, u, math.inf)
+        for v in range(len(graph)):
+            t = type_ids[v]
+            if t in factors:
+                for pos in range(offsets[v], offsets[v + 1]):
+                    u = targets[pos]
+                    if type_ids[u] == t and graph.floor_ids[u] != graph.floor_ids[v]:
+                        weights[pos] *= factors[t]
+            if t in excluded or t in penalties:
+                # 들어가는 엣지(u -> v)와 나오는 엣지(v -> u)에 각각 절반씩
+                half = math.inf if t in excluded else penalties[t] / 2
+                for pos in range(offsets[v], offsets[v + 1]):
+                    u = targets[pos]
+                    if type_ids[u] != t or t in excluded:
+                        weights[pos] += half
+                        graph.add_edge_weight(weights, u, v, half)
+        return weights
+
+
+PROFILES = {profile.name: profile for profile in (
+    RoutingProfile(DEFAULT_PROFILE, "기본"),
+    RoutingProfile('step_free', "계단 없는 경로", excluded_node_types=('STAIRS',)),
+    RoutingProfile('staff', "직원용 (직원 전용 통로 포함)", staff=True, requires_staff=True),
+    RoutingProfile('shortest_time', "최단 시간", entry_penalties={'ELEVATOR': ELEVATOR_WAIT_PENALTY},
+                   floor_change_factors={'STAIRS': STAIRS_FLOOR_FACTOR}),
+)}
+
+
+class ProfileGraphs:
+    def __init__(self, graph, staff_edges=()):
+        # 프로필 이름 -> 그래프. 원래 그래프와 가중치가 같은 프로필은 원래 그래프를 그대로 씀
+        self.graphs = {}
+        for name, profile in PROFILES.items():
+            weights = profile.weights(graph, staff_edges)
+            self.graphs[name] = graph if weights is None else graph.with_weights(weights, precompiled=True)
+
+    @classmethod
+    def build(cls, version: int) -> "ProfileGraphs":
+        graph = get_graph(version).graph
+        index = graph.index
+        staff_edges = []
+        for start, end in Edge.objects.filter(staff_only=True).values_list('start_node__qr_id', 'end_node__qr_id'):
+            if start in index and end in index:
+                staff_edges.append((index[start], index[end]))
+        return cls(graph, staff_edges)
+
+
+def profile_graph(version: int, profile: str = DEFAULT_PROFILE):
+    # 프로필의 그래프 (그래프 버전마다 한 번 생성)
+    return get_versioned('profile_graphs', ProfileGraphs.build, version=version).graphs[profile]
@@ -0,0 +1,83 @@
+# navigation/qr_lookup.py
+# QR 스캔 조회용 사전 직렬화 테이블 (qr_id -> JSON bytes). 그래프 버전이 바뀔 때만 다시 생성합니다.
+# bundle 모드는 노드 + 해당 층 정보 + 가까운 POI를 한 번에 돌려줘서 첫 화면을 요청 한 번으로 그릴 수 있게 합니다.
+import threading
+
+from rest_framework.renderers import JSONRenderer
+
+from .closures import routing_graph
+from .models import Node
+from .pathfinding import floor_number
+from .profiles import DEFAULT_PROFILE, profile_graph
+from .serializers import NodeSerializer
+
+NEARBY_POI_COUNT = 5
+
+
+def floor_sort_key(name):
+    # B2, B1, 1F, 2F ... 순서. 층 번호를 알 수 없는 값은 뒤로
+    number = floor_number(name)
+    return (number != number, 0 if number != number else number, str(name))
+
+
+def group_floors(floor_pairs) -> dict:
+    # (건물, 층) 목록 -> 건물별 층 목록 (B1, 1F, 2F ... 순)
+    floors = {}
+    for building, floor in floor_pairs:
+        floors.setdefault(building, set()).add(floor)
+    return {building: sorted(names, key=floor_sort_key) for building, names in floors.items()}
+
+
+def floor_image(building, floor) -> str:
+    # 프론트엔드(floor.js)의 지도 이미지 경로 규칙
+    return f"images/{building}_{floor}.png"
+
+
+class QrLookupTable:
+    def __init__(self, version: int, docs: dict, floor_pairs):
+        self.version = version
+        self.docs = docs  # qr_id -> 직렬화된 노드 dict
+        render = JSONRenderer().render
+        self.payloads = {qr_id: render(doc) for qr_id, doc in docs.items()}
+        self.floors = group_floors(floor_pairs)
+        self._bundles = {}
+        self._bundle_graph = None  # _bundles를 만들 때 쓴 탐색 그래프 (통제가 바뀌면 다시 만듦)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, version: int) -> "QrLookupTable":
+        # NodeSerializer와 같은 필드를 values()로 바로 읽음 (노드마다 DRF 직렬화를 거치지 않음)
+        nodes = Node.objects.exclude(qr_id__isnull=True).exclude(qr_id='').order_by('id')
+        docs = {data["qr_id"]: data for data in nodes.values(*NodeSerializer.Meta.fields)}
+        return cls(version, docs, Node.objects.values_list('building', 'floor').distinct())
+
+    def get(self, qr_id: str):
+        return self.payloads.get(qr_id)
+
+    def bundle(self, qr_id: str, closures_version: int = 0):
+        # 가까운 POI는 방문객 경로(기본 프로필 + 임시 통제) 기준. 직원 전용 통로로만 가까운 POI는 나오지 않음
+        graph = routing_graph(profile_graph(self.version, DEFAULT_PROFILE), closures_version)
+        if graph is not self._bundle_graph:
+            with self._lock:
+                if graph is not self._bundle_graph:
+                    self._bundles, self._bundle_graph = {}, graph
+        bundles = self._bundles
+        payload = bundles.get(qr_id)
+        if payload is not None or qr_id not in self.docs:
+            return payload
+        doc = self.docs[qr_id]
+        poi_type = graph.type_names.index('POI') if 'POI' in graph.type_names else -1
+        nearby = graph.nearest(qr_id, lambda i: graph.type_ids[i] == poi_type, k=NEARBY_POI_COUNT)
+        payload = JSONRenderer().render({
+            "node": doc,
+            "floor": {
+                "building": doc["building"],
+                "floor": doc["floor"],
+                "floors": self.floors.get(doc["building"], []),
+                "image": floor_image(doc["building"], doc["floor"]),
+            },
+            "nearby_pois": nearby.get("results", []) if poi_type >= 0 else [],
+        })
+        with self._lock:
+            bundles[qr_id] = payload
+        return payload
@@ -0,0 +1,147 @@
+# navigation/route_cache.py
+# 경로 탐색 결과 캐시
+# settings.CACHES['routes'] (기본: 프로세스별 LocMemCache, LRU + TIMEOUT) 에 저장합니다.
+# 키에 그래프 버전이 들어가므로 노드/엣지가 바뀌면 이전 결과는 더 이상 조회되지 않고 LRU/TTL로 밀려납니다.
+# Redis/Memcached 같은 공유 캐시로 바꾸면 모든 워커가 같은 캐시(와 warm_routes 결과)를 공유합니다.
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+from .pathfinding import unwind
+from .profiles import DEFAULT_PROFILE, profile_graph
+
+logger = logging.getLogger(__name__)
+
+ROUTE_CACHE_ALIAS = 'routes'
+
+_counters = {"hits": 0, "misses": 0, "stores": 0}
+_counters_lock = threading.Lock()
+_warmed_version = None
+_warming_version = None  # 백그라운드 워밍업이 진행 중인 버전
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _counters_lock:
+        _counters[name] += amount
+
+
+def get_route_cache():
+    return caches[ROUTE_CACHE_ALIAS]
+
+
+def route_key(version: int, start: str, end: str, engine: str, overlay: str = None,
+              profile: str = DEFAULT_PROFILE) -> str:
+    # qr_id에 공백 등 memcached 키로 쓸 수 없는 문자가 있을 수 있으므로 해시 사용
+    # overlay: 임시 통제 때문에 경로가 달라진 경우의 통제 상태 (ClosureOverlay.signature)
+    # profile: 기본 프로필이 아니면 라우팅 프로필 이름 (profiles.py)
+    digest = hashlib.sha1(f"{start}\0{end}".encode()).hexdigest()
+    parts = [f"route:{version}"]
+    if profile != DEFAULT_PROFILE:
+        parts.append(f"profile={profile}")
+    if overlay:
+        parts.append(overlay)
+    return ":".join(parts + [engine, digest])
+
+
+def cache_stats() -> dict:
+    with _counters_lock:
+        stats = dict(_counters)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else None
+    stats["warmed_version"] = _warmed_version
+    return stats
+
+
+def reset_cache_stats() -> None:
+    with _counters_lock:
+        for name in _counters:
+            _counters[name] = 0
+
+
+def cached_find_path(snapshot, start: str, end: str, engine: str = "astar", stats: dict = None,
+                     overlay=None, profile: str = DEFAULT_PROFILE) -> dict:
+    # 캐시된 결과 dict는 공유되므로 호출하는 쪽에서 수정하면 안 됩니다.
+    # 라우팅 프로필마다 그래프와 캐시 키가 따로입니다.
+    # overlay(프로필 그래프 위의 ClosureOverlay)가 있으면: 통제와 상관없는 경로는 기존 캐시를 그대로 쓰고,
+    # 통제된 노드/엣지를 지나는 경로만 통제 상태별 키로 다시 계산해서 캐시합니다.
+    if getattr(settings, 'NAVIGATION_ROUTE_WARMUP', False) and _warmed_version != snapshot.version:
+        start_warmup(snapshot)
+
+    cache = get_route_cache()
+    key = route_key(snapshot.version, start, end, engine, profile=profile)
+    result = cache.get(key)
+    graph = profile_graph(snapshot.version, profile)
+    if overlay and (result is None or overlay.affects(result)):
+        key = route_key(snapshot.version, start, end, engine, overlay=overlay.signature, profile=profile)
+        result = cache.get(key)
+        graph = overlay.graph
+        if stats is not None:
+            stats["closures"] = overlay.signature
+    if result is not None:
+        _count("hits")
+        if stats is not None:
+            stats["cache"] = "hit"
+        return result
+
+    _count("misses")
+    if stats is not None:
+        stats["cache"] = "miss"
+    result = graph.find_path(start, end, engine=engine, stats=stats)
+    # 존재하지 않는 노드 ID 같은 오류 결과는 캐시하지 않음
+    if not result.get("error"):
+        cache.set(key, result)
+        _count("stores")
+    return result
+
+
+def warm_route_cache(snapshot, engines=("astar",), source_type="QR", target_type="POI") -> int:
+    # 모든 source_type 노드에서 모든 target_type 노드까지의 경로를 미리 계산해서 캐시에 넣습니다.
+    # 출발지마다 다익스트라 한 번으로 모든 목적지까지의 최단 경로를 구합니다.
+    global _warmed_version
+    graph = profile_graph(snapshot.version, DEFAULT_PROFILE)
+    sources = [i for i in range(len(graph)) if graph.node_type(i) == source_type]
+    targets = {i for i in range(len(graph)) if graph.node_type(i) == target_type}
+    cache = get_route_cache()
+    stored = 0
+    for s in sources:
+        dist, prev = graph.dijkstra(s, targets - {s})
+        entries = {}
+        for t in targets:
+            if t == s or t not in dist:
+                continue
+            result = graph.path_result(unwind(prev, t), dist[t])
+            for engine in engines:
+                entries[route_key(snapshot.version, graph.ids[s], graph.ids[t], engine)] = result
+        cache.set_many(entries)
+        stored += len(entries)
+    _count("stores", stored)
+    _warmed_version = snapshot.version
+    return stored
+
+
+def start_warmup(snapshot) -> None:
+    # 요청을 막지 않도록 백그라운드 스레드에서 워밍업 (버전마다 한 번)
+    global _warming_version
+    with _counters_lock:
+        if snapshot.version in (_warmed_version, _warming_version):
+            return
+        _warming_version = snapshot.version
+    threading.Thread(target=_warmup_thread, args=(snapshot,), daemon=True).start()
+
+
+def _warmup_thread(snapshot) -> None:
+    # 성공한 경우에만 _warmed_version이 바뀌므로(warm_route_cache), 실패하면 다음 요청에서 다시 시도
+    global _warming_version
+    try:
+        warm_route_cache(snapshot)
+    except Exception:
+        logger.exception("route cache warm-up for graph v%s failed", snapshot.version)
+    finally:
+        with _counters_lock:
+            _warming_version = None
+        # 프로필 그래프를 만들 때 DB를 조회하므로 이 스레드의 연결을 닫음
+        connections.close_all()
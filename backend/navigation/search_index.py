@@ -0,0 +1,110 @@
+# navigation/search_index.py
+# 노드 검색용 메모리 인덱스 (그래프 버전이 바뀔 때만 다시 생성)
+# - 1/2글자 n-gram 역색인으로 부분 문자열 검색 후보를 좁히고 실제 포함 여부로 확인
+# - 한글 초성 검색 (예: 'ㄱㅇㅅ' -> '강의실')
+# - building / floor / node_type 필터, 정확도 순 정렬
+from .models import Node
+from .serializers import NodeSerializer
+
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSUNG_SET = set(CHOSUNG)
+
+
+def normalize(text) -> str:
+    # 대소문자와 공백 차이를 무시
+    return "".join(str(text or "").lower().split())
+
+
+def to_chosung(text: str) -> str:
+    # 완성형 한글 음절은 초성으로 바꾸고 나머지 문자는 그대로 둠
+    chars = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        chars.append(CHOSUNG[code // 588] if 0 <= code < 11172 else ch)
+    return "".join(chars)
+
+
+def is_chosung_query(query: str) -> bool:
+    return any(ch in _CHOSUNG_SET for ch in query)
+
+
+def _grams(text: str):
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class NodeSearchIndex:
+    def __init__(self, docs: list):
+        self.docs = docs  # NodeSerializer와 같은 필드의 노드 dict (id 순)
+        self.names = [normalize(doc["name"]) for doc in docs]
+        self.qr_ids = [normalize(doc["qr_id"]) for doc in docs]
+        self.descriptions = [normalize(doc["description"]) for doc in docs]
+        self.chosungs = [to_chosung(name) for name in self.names]
+
+        self.grams = {}          # n-gram -> 문서 번호 집합 (이름/QR ID/설명)
+        self.chosung_grams = {}  # n-gram -> 문서 번호 집합 (이름 초성)
+        self.filters = {"building": {}, "floor": {}, "node_type": {}}
+        for i, doc in enumerate(docs):
+            for gram in _grams(self.names[i]) | _grams(self.qr_ids[i]) | _grams(self.descriptions[i]):
+                self.grams.setdefault(gram, set()).add(i)
+            for gram in _grams(self.chosungs[i]):
+                self.chosung_grams.setdefault(gram, set()).add(i)
+            for field, values in self.filters.items():
+                values.setdefault(doc[field], set()).add(i)
+
+    @classmethod
+    def build(cls, version: int = None) -> "NodeSearchIndex":
+        # 필드 변환이 없는 단순 모델 필드이므로 DRF 직렬화(노드마다 필드 객체 처리) 대신 values()로 바로 읽음
+        return cls(list(Node.objects.order_by('id').values(*NodeSerializer.Meta.fields)))
+
+    def _candidates(self, query: str, grams: dict):
+        # 질의의 모든 n-gram을 포함하는 문서만 후보로 (작은 집합부터 교집합)
+        keys = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+        postings = sorted((grams.get(key, set()) for key in set(keys)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        return set.intersection(*postings)
+
+    def _rank(self, i: int, query: str, chosung: bool):
+        # 정확히 일치 < 접두어 < 이름 포함 < QR ID 포함 < 설명 포함 순으로 우선
+        name = self.chosungs[i] if chosung else self.names[i]
+        if name == query:
+            score = 0
+        elif name.startswith(query):
+            score = 1
+        elif query in name:
+            score = 2
+        elif not chosung and query in self.qr_ids[i]:
+            score = 3
+        elif not chosung and query in self.descriptions[i]:
+            score = 4
+        else:
+            return None
+        return (score, len(self.names[i]), self.names[i], self.docs[i]["id"])
+
+    def search(self, query: str = None, building: str = None, floor: str = None, node_type: str = None) -> list:
+        matched = None
+        for field, value in (("building", building), ("floor", floor), ("node_type", node_type)):
+            if value:
+                ids = self.filters[field].get(value, set())
+                matched = ids if matched is None else matched & ids
+
+        query = normalize(query)
+        if not query:
+            ids = range(len(self.docs)) if matched is None else sorted(matched)
+            return [self.docs[i] for i in ids]
+
+        chosung = is_chosung_query(query)
+        if chosung:
+            query = to_chosung(query)  # '강ㅇ' 처럼 섞여 있으면 모두 초성으로 맞춤
+        candidates = self._candidates(query, self.chosung_grams if chosung else self.grams)
+        if matched is not None:
+            candidates &= matched
+        ranked = []
+        for i in candidates:
+            key = self._rank(i, query, chosung)
+            if key is not None:
+                ranked.append(key + (i,))
+        ranked.sort()
+        return [self.docs[key[-1]] for key in ranked]
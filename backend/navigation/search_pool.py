@@ -0,0 +1,233 @@
+# navigation/search_pool.py
+# 비동기 뷰(async_views.py)에서 CPU를 많이 쓰는 탐색을 이벤트 루프 밖의 제한된 워커 풀에서 실행합니다.
+#   - NAVIGATION_SEARCH_POOL: 'thread'(기본, 프로세스의 그래프를 공유) 또는 'process'(GIL 회피, 워커마다 스냅샷 mmap)
+#   - NAVIGATION_SEARCH_MAX_CONCURRENCY: 실행 중 + 대기 중인 탐색 수 상한. 넘으면 바로 SearchRejected (503)
+#   - NAVIGATION_SEARCH_TIMEOUT: 요청당 시간 예산(초). 넘으면 SearchTimeout (504)
+# 시간 예산을 넘긴 탐색도 워커에서는 끝까지 실행되므로 끝날 때까지 자리를 차지합니다. (과부하가 쌓이지 않도록)
+#
+# 아래 *_task 함수는 프로세스 풀로 보낼 수 있도록 모듈 최상위 함수이고, 인자와 반환값은 모두 pickle 가능한 값입니다.
+# 동기 뷰(views.py)도 같은 함수를 직접 호출합니다.
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.renderers import JSONRenderer
+
+from .closures import get_overlay, routing_graph
+from .graph_cache import get_graph, get_versioned
+from .metrics import metrics
+from .path_format import DEFAULT_TOLERANCE, compact_path
+from .profiles import DEFAULT_PROFILE, profile_graph
+from .route_cache import cached_find_path
+from .spatial_index import SpatialIndex
+from .tours import plan_tour
+
+logger = logging.getLogger(__name__)
+
+POOL_KINDS = ('thread', 'process')
+
+
+class SearchRejected(Exception):
+    # 동시 실행 한도 초과 (부하 차단)
+    pass
+
+
+class SearchTimeout(Exception):
+    # 요청당 시간 예산 초과
+    pass
+
+
+class PathfindOutcome(NamedTuple):
+    error: str
+    content: bytes
+    path_length: int
+    timings: dict
+    stats: dict
+
+
+def pathfind_task(versions: tuple, start: str, end: str, engine: str = "astar", trace: bool = False,
+                  path_format: str = "full", tolerance: float = DEFAULT_TOLERANCE,
+                  profile: str = DEFAULT_PROFILE, start_location: dict = None,
+                  end_location: dict = None) -> PathfindOutcome:
+    # 그래프 로드 + 탐색(경로 캐시 사용) + JSON 직렬화
+    # versions: GraphVersion.versions() (그래프 버전, 임시 통제 버전)
+    # profile: 라우팅 프로필 이름 (profiles.py). 프로필마다 미리 만든 그래프에서 탐색
+    # start_location/end_location(지도 좌표)이 있으면 가장 가까운 노드로 맞춘 뒤 탐색하고, 맞춘 노드를 응답의 snapped에 넣음
+    version, closures_version = versions
+    timings, stats = {}, {}
+    started = time.perf_counter()
+    snapshot = get_graph(version)
+    overlay = get_overlay(profile_graph(version, profile), closures_version, profile)
+    snapped = {}
+    for name, value in (("start", start_location), ("end", end_location)):
+        if value is not None:
+            node = snap_location(version, value)
+            if node is None:
+                error = f"{value['building']} {value['floor']}에서 가까운 노드를 찾을 수 없습니다."
+                return PathfindOutcome(error, None, 0, timings, stats)
+            snapped[name] = node
+    start = snapped["start"]["id"] if "start" in snapped else start
+    end = snapped["end"]["id"] if "end" in snapped else end
+    timings["load_ms"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    result = cached_find_path(snapshot, start, end, engine=engine, stats=stats, overlay=overlay, profile=profile)
+    timings["search_ms"] = (time.perf_counter() - started) * 1000
+    if result.get("error"):
+        return PathfindOutcome(result["error"], None, 0, timings, stats)
+
+    # 직렬화 시간도 재기 위해 JSON으로 직접 렌더링 (compact 형식 변환 포함)
+    path_length = len(result["path"])
+    started = time.perf_counter()
+    if path_format == "compact":
+        result = compact_path(snapshot.graph, result, tolerance)
+    if snapped:
+        result = {**result, "snapped": snapped}
+    content = JSONRenderer().render(result)
+    timings["serialize_ms"] = (time.perf_counter() - started) * 1000
+
+    if trace:
+        # 캐시된 결과는 그대로 두고 복사본에 trace 추가
+        content = JSONRenderer().render({**result, "trace": {
+            "engine": engine, "profile": profile, "graph_version": version, "path_length": path_length,
+            **timings, **stats,
+        }})
+    return PathfindOutcome(None, content, path_length, timings, stats)
+
+
+def snap_location(version: int, location: dict):
+    # {"building", "floor", "x", "y"} -> 가장 가까운 노드 정보 dict (해당 층에 노드가 없으면 None)
+    index = get_versioned('spatial_index', SpatialIndex.build, version=version)
+    hits = index.nearest(location["building"], location["floor"], location["x"], location["y"])
+    return index.describe(*hits[0]) if hits else None
+
+
+def nearest_task(versions: tuple, start: str, targets=None, node_type=None, building=None, floor=None,
+                 k: int = 5, with_paths: int = 0, profile: str = DEFAULT_PROFILE) -> dict:
+    version, closures_version = versions
+    graph = routing_graph(profile_graph(version, profile), closures_version, profile)
+    candidates = None
+    if targets:
+        candidates = {graph.index[t] for t in targets if t in graph.index}
+        k = min(k, len(candidates))
+    # 문자열 비교 대신 CompiledGraph의 정수 인덱스로 조건을 비교
+    type_id = graph.type_names.index(node_type) if node_type in graph.type_names else -1
+    building_id = graph.building_names.index(building) if building in graph.building_names else -1
+    floor_id = graph.floor_names.index(floor) if floor in graph.floor_names else -1
+
+    def match(i):
+        return ((candidates is None or i in candidates)
+                and (not node_type or graph.type_ids[i] == type_id)
+                and (not building or graph.building_ids[i] == building_id)
+                and (not floor or graph.floor_ids[i] == floor_id))
+
+    # 그래프에 없는 조건 값이면 탐색할 필요 없음
+    unknown = (node_type and type_id < 0) or (building and building_id < 0) or (floor and floor_id < 0)
+    if unknown or not k:
+        return {"results": []}
+    return graph.nearest(start, match, k=k, with_paths=with_paths)
+
+
+def tour_task(versions: tuple, start: str, stops: list, return_to_start: bool = False,
+              profile: str = DEFAULT_PROFILE) -> dict:
+    version, closures_version = versions
+    graph = routing_graph(profile_graph(version, profile), closures_version, profile)
+    return plan_tour(graph, start, stops, return_to_start=return_to_start)
+
+
+def _run_task(func, args, kwargs):
+    # 워커 스레드/프로세스의 DB 연결도 요청 처리 때처럼 오래되거나 끊긴 연결을 정리
+    close_old_connections()
+    return func(*args, **kwargs)
+
+
+def _init_process(settings_module: str) -> None:
+    # spawn으로 만든 워커 프로세스: Django를 초기화하고 현재 그래프를 미리 로드 (스냅샷 파일이 있으면 mmap)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+    try:
+        get_graph()
+    except Exception:
+        logger.exception("search worker could not preload the graph")
+
+
+class SearchPool:
+    def __init__(self, kind: str = 'thread', workers: int = 4, max_concurrency: int = 16, timeout: float = 2.0):
+        if kind not in POOL_KINDS:
+            raise ValueError(f"unknown search pool kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_concurrency = max(max_concurrency, 1)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "SearchPool":
+        return cls(
+            kind=getattr(settings, 'NAVIGATION_SEARCH_POOL', 'thread'),
+            workers=getattr(settings, 'NAVIGATION_SEARCH_WORKERS', 4),
+            max_concurrency=getattr(settings, 'NAVIGATION_SEARCH_MAX_CONCURRENCY', 16),
+            timeout=getattr(settings, 'NAVIGATION_SEARCH_TIMEOUT', 2.0),
+        )
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == 'process':
+                        # fork는 부모의 DB 연결과 락 상태를 물려받으므로 spawn 사용
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                            initializer=_init_process, initargs=(settings.SETTINGS_MODULE,))
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='navigation-search')
+        return self._executor
+
+    async def run(self, func, *args, timeout: float = None, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            metrics.incr("search_rejected_total")
+            raise SearchRejected()
+        try:
+            future = self.executor.submit(_run_task, func, args, kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        # 시간 예산을 넘겨도 실제로 끝날 때(또는 시작 전에 취소될 때) 자리를 반납
+        future.add_done_callback(lambda _: self._slots.release())
+
+        budget = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), budget or None)
+        except asyncio.TimeoutError:
+            metrics.incr("search_timeout_total")
+            raise SearchTimeout(budget) from None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_search_pool() -> SearchPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SearchPool.from_settings()
+    return _pool
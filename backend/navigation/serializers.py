@@ -1,8 +1,52 @@
 # navigation/serializers.py
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Node
+from .models import Closure, Edge, Node
 
 class NodeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Node
-        fields = ['id', 'qr_id','building', 'name', 'floor', 'pixel_x', 'pixel_y', 'node_type', 'description']
\ No newline at end of file
+        fields = ['id', 'qr_id','building', 'name', 'floor', 'pixel_x', 'pixel_y', 'node_type', 'description']
+
+
+class ClosureSerializer(serializers.ModelSerializer):
+    # node(qr_id), edge(엣지 id), edge_nodes([qr_id, qr_id]) 중 하나로 대상을 지정
+    # expires_at 대신 minutes(지금부터 몇 분 동안)로 만료 시각을 줄 수도 있음
+    node = serializers.SlugRelatedField(slug_field='qr_id', queryset=Node.objects.all(), required=False, allow_null=True)
+    edge = serializers.PrimaryKeyRelatedField(queryset=Edge.objects.all(), required=False, allow_null=True)
+    edge_nodes = serializers.ListField(child=serializers.CharField(), min_length=2, max_length=2, required=False,
+                                       write_only=True)
+    minutes = serializers.IntegerField(min_value=1, required=False, write_only=True)
+
+    class Meta:
+        model = Closure
+        fields = ['id', 'node', 'edge', 'edge_nodes', 'penalty', 'reason', 'expires_at', 'minutes', 'created_at']
+        read_only_fields = ['created_at']
+        extra_kwargs = {'penalty': {'min_value': 0}}
+
+    def validate(self, attrs):
+        edge_nodes = attrs.pop('edge_nodes', None)
+        if edge_nodes:
+            a, b = edge_nodes
+            edge = Edge.objects.filter(
+                Q(start_node__qr_id=a, end_node__qr_id=b) | Q(start_node__qr_id=b, end_node__qr_id=a)).first()
+            if edge is None:
+                raise serializers.ValidationError({"edge_nodes": "두 노드를 잇는 엣지가 없습니다."})
+            attrs['edge'] = edge
+        if bool(attrs.get('node')) == bool(attrs.get('edge')):
+            raise serializers.ValidationError("node, edge, edge_nodes 중 하나만 지정해야 합니다.")
+        minutes = attrs.pop('minutes', None)
+        if minutes is not None:
+            attrs['expires_at'] = timezone.now() + timedelta(minutes=minutes)
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['closed'] = instance.closed
+        if instance.edge_id:
+            data['edge_nodes'] = [instance.edge.start_node.qr_id, instance.edge.end_node.qr_id]
+        return data
+
@@ -0,0 +1,22 @@
+# navigation/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Closure, Edge, GraphVersion, Node
+
+
+# 노드/엣지가 저장되거나 삭제되면 (관리자 페이지 수정 포함) 그래프 버전을 올립니다.
+# 트랜잭션이 롤백되면 버전도 올라가지 않도록 커밋 이후에 (트랜잭션당 한 번) 실행합니다.
+@receiver(post_save, sender=Node)
+@receiver(post_save, sender=Edge)
+@receiver(post_delete, sender=Node)
+@receiver(post_delete, sender=Edge)
+def graph_changed(sender, using=None, **kwargs):
+    GraphVersion.bump_on_commit(using=using)
+
+
+# 임시 통제는 그래프를 다시 만들지 않고 통제 버전만 올립니다. (closures.py의 오버레이만 다시 만듦)
+@receiver(post_save, sender=Closure)
+@receiver(post_delete, sender=Closure)
+def closures_changed(sender, using=None, **kwargs):
+    GraphVersion.bump_closures_on_commit(using=using)
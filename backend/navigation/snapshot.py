@@ -0,0 +1,118 @@
+# navigation/snapshot.py
+# 컴파일된 그래프를 바이너리 파일로 저장하고, 워커가 읽기 전용 mmap으로 여는 기능 (manage.py compile_graph)
+# 여러 gunicorn 워커가 같은 파일을 mmap하면 OS 페이지 캐시를 공유하므로 메모리도 한 벌만 쓰고 DB 로딩 없이 바로 시작합니다.
+#
+# 파일 구조 (네이티브 바이트 순서, 모든 구간은 8바이트 정렬)
+#   헤더: magic(8) 형식버전(u32) 예약(u32) 그래프버전(u64) 노드수 N(u64) 방향엣지수 M(u64) 문자열표 길이(u64)
+#         그래프 지문(sha256, 32바이트. GraphVersion.fingerprint())
+#   offsets int64[N+1], targets int64[M], weights float64[M], xs float64[N], ys float64[N],
+#   floor_ids int64[N], building_ids int64[N], type_ids int64[N]
+#   문자열표 (UTF-8 JSON): ids, floor_names, building_names, type_names
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from .pathfinding import CompiledGraph
+
+MAGIC = b"NAVGRPH" + (b"L" if sys.byteorder == "little" else b"B")
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sIIQQQQ32s")
+
+INT_SECTIONS = ("floor_ids", "building_ids", "type_ids")
+
+
+def fingerprint_digest(fingerprint: str) -> bytes:
+    return hashlib.sha256(fingerprint.encode()).digest()
+
+
+def write_snapshot(graph: CompiledGraph, version: int, path, fingerprint: str) -> int:
+    # fingerprint: 그래프를 읽은 DB의 GraphVersion.fingerprint() (워커가 같은 DB의 같은 버전인지 확인)
+    n, m = len(graph), len(graph.targets)
+    strings = json.dumps({
+        "ids": graph.ids,
+        "floor_names": graph.floor_names,
+        "building_names": graph.building_names,
+        "type_names": graph.type_names,
+    }, ensure_ascii=False).encode()
+    sections = [
+        array("q", graph.offsets), array("q", graph.targets), array("d", graph.weights),
+        array("d", graph.xs), array("d", graph.ys),
+        *(array("q", getattr(graph, name)) for name in INT_SECTIONS),
+    ]
+
+    # 임시 파일에 쓴 뒤 교체: POSIX에서는 이미 mmap으로 열어 둔 워커가 이전 파일을 계속 안전하게 사용
+    # Windows는 다른 프로세스가 mmap으로 열어 둔 파일을 교체할 수 없어서 PermissionError가 남 (아래에서 안내)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".graph-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, version, n, m, len(strings),
+                                 fingerprint_digest(fingerprint)))
+            for section in sections:
+                fp.write(section.tobytes())
+            fp.write(strings)
+        try:
+            os.replace(tmp_path, path)
+        except PermissionError as exc:
+            raise OSError(f"{path}을(를) 교체할 수 없습니다. 스냅샷을 사용 중인 워커를 멈춘 뒤 다시 실행하세요. ({exc})") from exc
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return os.path.getsize(path)
+
+
+def read_snapshot_header(path):
+    # 헤더만 읽어서 (그래프 버전, 지문 해시)를 확인 (파일이 없거나 형식이 다르면 None)
+    try:
+        with open(path, "rb") as fp:
+            header = fp.read(HEADER.size)
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, fmt, _, version, _, _, _, digest = HEADER.unpack(header)
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        return None
+    return version, digest
+
+
+def load_snapshot_file(path, expected_version: int = None, expected_fingerprint: str = None):
+    # 파일의 그래프 버전이나 지문이 기대값과 다르면(오래된 스냅샷, 다른 DB에서 만든 스냅샷) None을 돌려주고
+    # DB에서 만들도록 함
+    header = read_snapshot_header(path)
+    if header is None:
+        return None
+    version, digest = header
+    if expected_version is not None and version != expected_version:
+        return None
+    if expected_fingerprint is not None and digest != fingerprint_digest(expected_fingerprint):
+        return None
+
+    with open(path, "rb") as fp:
+        buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    _, _, _, version, n, m, strings_size, _ = HEADER.unpack_from(buffer)
+    view = memoryview(buffer)
+    position = HEADER.size
+
+    def take(count, fmt):
+        nonlocal position
+        section = view[position:position + count * 8].cast(fmt)
+        position += count * 8
+        return section
+
+    offsets, targets, weights = take(n + 1, "q"), take(m, "q"), take(m, "d")
+    xs, ys = take(n, "d"), take(n, "d")
+    floor_ids, building_ids, type_ids = (take(n, "q") for _ in INT_SECTIONS)
+    strings = json.loads(bytes(view[position:position + strings_size]).decode())
+
+    graph = CompiledGraph(
+        strings["ids"], xs, ys, floor_ids, strings["floor_names"], building_ids, strings["building_names"],
+        type_ids, strings["type_names"], offsets, targets, weights,
+    )
+    graph.buffer = buffer  # 그래프가 살아 있는 동안 mmap이 닫히지 않도록 참조 유지
+    return graph
@@ -0,0 +1,119 @@
+# navigation/spatial_index.py
+# (건물, 층)별 균일 격자 공간 인덱스
+# 지도 이미지를 탭한 위치(pixel_x, pixel_y)를 가장 가까운 그래프 노드로 맞추거나(snap), 화면 영역 안의 노드를 찾을 때 사용합니다.
+# 경로 탐색에 쓸 수 있는 노드(CompiledGraph에 들어간 qr_id가 있는 노드)만 인덱싱하며, 그래프 버전마다 한 번 만듭니다.
+import math
+
+from .graph_cache import get_graph
+
+# 격자 한 칸의 크기 (픽셀). 노드 간격(보통 수십 픽셀)과 비슷하게
+CELL_SIZE = 64
+
+
+class SpatialIndex:
+    def __init__(self, graph, cell_size: int = CELL_SIZE):
+        self.graph = graph
+        self.cell_size = cell_size
+        # (building_id, floor_id) -> {(cx, cy): [노드 번호, ...]}
+        self.grids = {}
+        # (building_id, floor_id) -> (min_cx, min_cy, max_cx, max_cy): 링 탐색을 멈출 범위
+        self.extents = {}
+        for i in range(len(graph)):
+            key = (graph.building_ids[i], graph.floor_ids[i])
+            cell = self.cell_of(graph.xs[i], graph.ys[i])
+            self.grids.setdefault(key, {}).setdefault(cell, []).append(i)
+        for key, grid in self.grids.items():
+            cxs = [cx for cx, _ in grid]
+            cys = [cy for _, cy in grid]
+            self.extents[key] = (min(cxs), min(cys), max(cxs), max(cys))
+
+    @classmethod
+    def build(cls, version: int = None) -> "SpatialIndex":
+        return cls(get_graph(version).graph)
+
+    def cell_of(self, x: float, y: float):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _grid_key(self, building, floor):
+        graph = self.graph
+        if building not in graph.building_names or floor not in graph.floor_names:
+            return None
+        key = (graph.building_names.index(building), graph.floor_names.index(floor))
+        return key if key in self.grids else None
+
+    def _type_matcher(self, node_type):
+        if not node_type:
+            return lambda i: True
+        graph = self.graph
+        type_id = graph.type_names.index(node_type) if node_type in graph.type_names else -1
+        return lambda i: graph.type_ids[i] == type_id
+
+    def nearest(self, building, floor, x: float, y: float, k: int = 1, node_type: str = None,
+                max_distance: float = math.inf) -> list:
+        # (노드 번호, 거리) 목록 (가까운 순)
+        # 중심 칸에서 한 겹씩 넓혀 가며 찾고, r번째 겹까지 본 뒤에는 남은 노드가 모두 r * cell_size보다 멀기 때문에
+        # k번째 후보가 그보다 가까우면 멈춥니다.
+        key = self._grid_key(building, floor)
+        if key is None or k < 1:
+            return []
+        grid, (min_cx, min_cy, max_cx, max_cy) = self.grids[key], self.extents[key]
+        xs, ys = self.graph.xs, self.graph.ys
+        match = self._type_matcher(node_type)
+        cx, cy = self.cell_of(x, y)
+        # 격자 범위 밖을 탭한 경우 빈 겹은 건너뜀
+        first_ring = max(0, min_cx - cx, cx - max_cx, min_cy - cy, cy - max_cy)
+        max_ring = max(cx - min_cx, max_cx - cx, cy - min_cy, max_cy - cy)
+        found = []
+        for ring in range(first_ring, max_ring + 1):
+            for cell in self._ring(cx, cy, ring):
+                for i in grid.get(cell, ()):
+                    if match(i):
+                        distance = math.hypot(xs[i] - x, ys[i] - y)
+                        if distance <= max_distance:
+                            found.append((distance, i))
+            found.sort()
+            del found[k:]
+            bound = ring * self.cell_size
+            if bound >= max_distance or (len(found) == k and found[-1][0] <= bound):
+                break
+        return [(i, distance) for distance, i in found]
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
+
+    def within(self, building, floor, x0: float, y0: float, x1: float, y1: float, node_type: str = None) -> list:
+        # 사각형 영역 안의 노드 번호 목록
+        key = self._grid_key(building, floor)
+        if key is None:
+            return []
+        x0, x1 = sorted((x0, x1))
+        y0, y1 = sorted((y0, y1))
+        grid = self.grids[key]
+        xs, ys = self.graph.xs, self.graph.ys
+        match = self._type_matcher(node_type)
+        (cx0, cy0), (cx1, cy1) = self.cell_of(x0, y0), self.cell_of(x1, y1)
+        min_cx, min_cy, max_cx, max_cy = self.extents[key]
+        found = []
+        for cx in range(max(cx0, min_cx), min(cx1, max_cx) + 1):
+            for cy in range(max(cy0, min_cy), min(cy1, max_cy) + 1):
+                for i in grid.get((cx, cy), ()):
+                    if x0 <= xs[i] <= x1 and y0 <= ys[i] <= y1 and match(i):
+                        found.append(i)
+        found.sort()
+        return found
+
+    def describe(self, i: int, distance: float = None) -> dict:
+        graph = self.graph
+        item = {"id": graph.ids[i], **graph.location(i), "node_type": graph.node_type(i)}
+        if distance is not None:
+            item["distance"] = distance
+        return item
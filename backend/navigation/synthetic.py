@@ -0,0 +1,60 @@
+# navigation/synthetic.py
+# 벤치마크용 가상 캠퍼스 생성기
+# 건물 N개 x 층 M개, 각 층은 복도 격자이고 엘리베이터/계단으로 층이 연결되며 1층끼리는 건물 간 통로로 연결됩니다.
+# graph_io와 같은 ("node", dict) / ("edge", dict) 레코드를 만들기 때문에 import_graph로 그대로 넣을 수 있습니다.
+import random
+
+GRID_SPACING = 20  # 격자 노드 사이 픽셀 간격
+
+
+def node_id(building: int, floor: int, x: int, y: int) -> str:
+    return f"SYN-B{building}-{floor}F-{x}-{y}"
+
+
+def node_type_at(x: int, y: int, width: int, height: int) -> str:
+    if (x, y) == (0, 0):
+        return 'ELEVATOR'
+    if (x, y) == (width - 1, height - 1):
+        return 'STAIRS'
+    if y == 0 and x % 5 == 2:
+        return 'QR'
+    if (x + y) % 7 == 3:
+        return 'POI'
+    return 'JUNCTION'
+
+
+def generate_campus(buildings: int = 3, floors: int = 5, width: int = 10, height: int = 10,
+                    drop_ratio: float = 0.3, seed: int = 0):
+    # drop_ratio: 세로 복도 엣지를 무작위로 빼서 막다른 길이 있는 건물처럼 만듦 (x == 0 열은 유지해서 연결성 보장)
+    rng = random.Random(seed)
+    for b in range(buildings):
+        for f in range(1, floors + 1):
+            for x in range(width):
+                for y in range(height):
+                    node_type = node_type_at(x, y, width, height)
+                    yield 'node', {
+                        'qr_id': node_id(b, f, x, y),
+                        'building': f"SYN-{b}",
+                        'name': f"SYN-{b} {f}F {node_type} ({x},{y})",
+                        'floor': f"{f}F",
+                        'pixel_x': x * GRID_SPACING,
+                        'pixel_y': y * GRID_SPACING,
+                        'node_type': node_type,
+                    }
+
+    for b in range(buildings):
+        for f in range(1, floors + 1):
+            for x in range(width):
+                for y in range(height):
+                    here = node_id(b, f, x, y)
+                    if x + 1 < width:
+                        yield 'edge', {'start': here, 'end': node_id(b, f, x + 1, y)}
+                    if y + 1 < height and (x == 0 or rng.random() >= drop_ratio):
+                        yield 'edge', {'start': here, 'end': node_id(b, f, x, y + 1)}
+            if f > 1:
+                # 엘리베이터와 계단으로 아래층과 연결 (가중치는 import 시 층 패널티로 자동 계산)
+                yield 'edge', {'start': node_id(b, f, 0, 0), 'end': node_id(b, f - 1, 0, 0)}
+                yield 'edge', {'start': node_id(b, f, width - 1, height - 1), 'end': node_id(b, f - 1, width - 1, height - 1)}
+        if b > 0:
+            # 1층 건물 간 통로
+            yield 'edge', {'start': node_id(b - 1, 1, width - 1, 0), 'end': node_id(b, 1, 0, height - 1)}
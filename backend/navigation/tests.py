@@ -1,3 +1,924 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import itertools
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .closures import ClosureOverlay, clear_overlay
+from .floor_bundle import FloorBundle
+from .graph_cache import clear_graph_cache, get_graph, get_versioned
+from .graph_io import FORMATS, GraphImporter, GraphImportError
+from .metrics import Histogram, metrics
+from .models import Closure, Edge, GraphVersion, Node
+from .path_format import simplify
+from .pathfinding import ENGINES
+from .profiles import PROFILES, profile_graph
+from . import route_cache
+from .route_cache import ROUTE_CACHE_ALIAS, start_warmup, warm_route_cache
+from .search_index import NodeSearchIndex
+from .search_pool import SearchPool, SearchRejected, SearchTimeout
+from .serializers import NodeSerializer
+from .snapshot import load_snapshot_file, write_snapshot
+from .spatial_index import SpatialIndex
+from .synthetic import generate_campus, node_id
+from .tours import MAX_TOUR_STOPS, held_karp, nearest_neighbor_2opt, tour_cost
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'navigation-tests'},
+    ROUTE_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'navigation-tests-routes'},
+}
+
+
+def campus_with_staff_elevator(**kwargs):
+    # 합성 캠퍼스에서 0번 건물의 엘리베이터를 직원 전용으로 바꿈 (방문객은 계단으로 돌아가서 프로필마다 거리가 달라짐)
+    for kind, data in generate_campus(**kwargs):
+        if kind == 'edge' and data['start'].startswith('SYN-B0-') and data['start'].endswith('-0-0') \
+                and data['end'].endswith('-0-0'):
+            data = {**data, 'staff_only': True}
+        yield kind, data
+
+
+# 캐시는 테스트마다 비움 (테스트 DB는 지문이 다르므로 개발용 그래프 스냅샷 파일은 쓰이지 않음)
+@override_settings(NAVIGATION_ROUTE_WARMUP=False, CACHES=TEST_CACHES)
+class NavigationTestCase(TestCase):
+    def setUp(self):
+        self.reset_caches()
+        self.import_campus()
+
+    def reset_caches(self):
+        # 그래프/오버레이는 버전으로 캐시되는데 테스트마다 DB가 되돌아가 버전이 겹치므로 직접 비움
+        clear_graph_cache()
+        clear_overlay()
+        caches[ROUTE_CACHE_ALIAS].clear()
+        self.addCleanup(clear_graph_cache)
+        self.addCleanup(clear_overlay)
+
+    def import_campus(self):
+        # 그래프 버전은 커밋 이후에 올라가므로 on_commit 콜백을 바로 실행
+        with self.captureOnCommitCallbacks(execute=True):
+            GraphImporter().import_records(campus_with_staff_elevator(buildings=2, floors=3, width=6, height=6))
+
+    def post(self, url, data):
+        return self.client.post(f'/api/navigation/{url}', data, content_type='application/json')
+
+    def pathfind(self, start, end, **data):
+        return self.post('pathfind/', {'start_node_id': start, 'end_node_id': end, **data})
+
+
+class EngineTests(NavigationTestCase):
+    def test_engines_agree_for_every_profile(self):
+        version = GraphVersion.current()
+        pairs = [
+            (node_id(0, 1, 0, 5), node_id(0, 3, 5, 0)),
+            (node_id(0, 2, 3, 3), node_id(1, 3, 4, 1)),
+            (node_id(1, 1, 5, 5), node_id(0, 1, 0, 0)),
+            (node_id(1, 3, 2, 0), node_id(1, 1, 2, 5)),
+        ]
+        for profile in PROFILES:
+            graph = profile_graph(version, profile)
+            for start, end in pairs:
+                with self.subTest(profile=profile, start=start, end=end):
+                    dist, _ = graph.dijkstra(graph.index[start])
+                    expected = dist.get(graph.index[end])
+                    for engine in ENGINES:
+                        result = graph.find_path(start, end, engine=engine)
+                        if expected is None or expected == float('inf'):
+                            self.assertIsNone(result['distance'], engine)
+                        else:
+                            self.assertAlmostEqual(result['distance'], expected, places=6, msg=engine)
+                            self.assertEqual(result['path'][0]['id'], start)
+                            self.assertEqual(result['path'][-1]['id'], end)
+
+
+class TraceTests(NavigationTestCase):
+    start, end = node_id(0, 1, 0, 5), node_id(0, 3, 5, 0)
+
+    def test_trace_reports_engine_and_search_counters(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                trace = self.pathfind(self.start, self.end, engine=engine, trace=True).json()['trace']
+                self.assertEqual(trace['profile'], 'default')
+                self.assertIn('expanded', trace)
+                self.assertIn('search_ms', trace)
+
+    def test_trace_flag_parsing(self):
+        for value, traced in ((True, True), ('true', True), ('TRUE', True), (False, False), ('false', False),
+                              (None, False)):
+            with self.subTest(value=value):
+                response = self.pathfind(self.start, self.end, trace=value)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual('trace' in response.json(), traced)
+        for value in ('yes', 1, 0, [True]):
+            with self.subTest(value=value):
+                self.assertEqual(self.pathfind(self.start, self.end, trace=value).status_code, 400)
+
+
+class MetricsTests(NavigationTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram(buckets=(1, 5))
+        for value in (0.5, 3, 5, 10000):
+            histogram.observe(value)
+        self.assertEqual(histogram.as_dict(), {"count": 4, "sum": 10008.5, "buckets": {"1": 1, "5": 3, "+Inf": 4}})
+
+    def test_pathfind_requests_are_counted(self):
+        start, end = node_id(0, 1, 0, 5), node_id(0, 3, 5, 0)
+        self.pathfind(start, end)
+        self.pathfind(start, end)
+        self.pathfind(start, '없는 노드')
+
+        data = self.client.get('/api/navigation/metrics/').json()
+        counters = data['counters']
+        self.assertEqual(counters['pathfind_requests_total'], 3)
+        self.assertEqual(counters['pathfind_success_total'], 2)
+        self.assertEqual(counters['pathfind_failure_total'], 1)
+        self.assertEqual(counters['pathfind_cache_hit_total'], 1)
+        self.assertGreater(counters['pathfind_nodes_expanded_total'], 0)
+        self.assertEqual(data['histograms']['pathfind_search_ms']['count'], 3)
+        self.assertIn('route_cache', data)
+
+        text = self.client.get('/api/navigation/metrics/prometheus/').content.decode()
+        self.assertIn('# TYPE navigation_pathfind_requests_total counter\nnavigation_pathfind_requests_total 3\n', text)
+        self.assertIn('navigation_pathfind_search_ms_bucket{le="+Inf"} 3\n', text)
+        self.assertIn('navigation_pathfind_search_ms_count 3\n', text)
+
+
+class NearestTests(NavigationTestCase):
+    start = node_id(0, 2, 3, 3)
+
+    def nearest(self, **data):
+        return self.post('pathfind/nearest/', {'start_node_id': self.start, **data})
+
+    def test_returns_k_closest_matches_in_distance_order(self):
+        response = self.nearest(node_type='POI', k=3, paths=1)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+
+        graph = profile_graph(GraphVersion.current())
+        dist, _ = graph.dijkstra(graph.index[self.start])
+        pois = sorted(dist[i] for i in dist if graph.node_type(i) == 'POI')
+        self.assertEqual([r['node_type'] for r in results], ['POI'] * 3)
+        self.assertEqual([round(r['distance'], 6) for r in results], [round(d, 6) for d in pois[:3]])
+        # paths=1 이면 첫 번째 결과에만 경로 포함
+        self.assertEqual(results[0]['path'][0]['id'], self.start)
+        self.assertEqual(results[0]['path'][-1]['id'], results[0]['id'])
+        self.assertNotIn('path', results[1])
+
+    def test_targets_and_filters_limit_candidates(self):
+        targets = [node_id(0, 1, 0, 0), node_id(0, 3, 5, 5)]
+        results = self.nearest(targets=targets, k=5).json()['results']
+        self.assertEqual(sorted(r['id'] for r in results), sorted(targets))
+
+        results = self.nearest(node_type='QR', floor='1F', building='SYN-0').json()['results']
+        self.assertTrue(results)
+        self.assertTrue(all(r['floor'] == '1F' and r['building'] == 'SYN-0' for r in results))
+        self.assertEqual(self.nearest(node_type='QR', building='없는 건물').json()['results'], [])
+
+    def test_invalid_parameters_return_400(self):
+        for data in ({'node_type': 5}, {'building': ['SYN-0']}, {'floor': {'x': 1}}, {'node_type': 'POI', 'paths': -1},
+                     {'node_type': 'POI', 'k': 0}, {'node_type': 'POI', 'k': 10000}, {'targets': 'SYN-B0-1F-0-0'},
+                     {'targets': [1, 2]}, {}):
+            with self.subTest(data=data):
+                self.assertEqual(self.nearest(**data).status_code, 400)
+
+    def test_non_object_body_returns_400(self):
+        for url in ('pathfind/', 'pathfind/nearest/', 'pathfind/tour/', 'async/pathfind/nearest/'):
+            for body in ([1], '"text"', '5'):
+                with self.subTest(url=url, body=body):
+                    response = self.post(url, body)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn('error', response.json())
+
+
+def euclidean_matrix(count: int, seed: int):
+    rng = random.Random(seed)
+    points = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(count)]
+    return [[math.dist(a, b) for b in points] for a in points]
+
+
+class TourOrderTests(TestCase):
+    def brute_force(self, matrix, return_to_start):
+        return min(tour_cost(matrix, list(order), return_to_start)
+                   for order in itertools.permutations(range(1, len(matrix))))
+
+    def test_held_karp_is_optimal(self):
+        for seed, return_to_start in itertools.product(range(5), (False, True)):
+            with self.subTest(seed=seed, return_to_start=return_to_start):
+                matrix = euclidean_matrix(7, seed)
+                order = held_karp(matrix, return_to_start)
+                self.assertEqual(sorted(order), list(range(1, 7)))
+                self.assertAlmostEqual(tour_cost(matrix, order, return_to_start),
+                                       self.brute_force(matrix, return_to_start))
+
+    def test_two_opt_returns_local_optimum(self):
+        for seed, return_to_start in itertools.product(range(3), (False, True)):
+            with self.subTest(seed=seed, return_to_start=return_to_start):
+                matrix = euclidean_matrix(15, seed)
+                order = nearest_neighbor_2opt(matrix, return_to_start)
+                self.assertEqual(sorted(order), list(range(1, 15)))
+                cost = tour_cost(matrix, order, return_to_start)
+                # 구간 하나를 뒤집어서 더 짧아지는 경우가 남아 있지 않음
+                for i, j in itertools.combinations(range(len(order)), 2):
+                    candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                    self.assertGreaterEqual(tour_cost(matrix, candidate, return_to_start), cost - 1e-9)
+
+    def test_two_opt_finds_optimum_on_a_line(self):
+        # 일직선 위의 지점은 끝에서부터 차례로 방문하는 것이 최적
+        points = [0, 7, 2, 9, 4, 1, 8]
+        matrix = [[abs(a - b) for b in points] for a in points]
+        order = nearest_neighbor_2opt(matrix, return_to_start=False)
+        self.assertEqual(tour_cost(matrix, order, False), 9)
+
+
+class TourTests(NavigationTestCase):
+    start = node_id(0, 1, 0, 5)
+    stops = [node_id(0, 1, 5, 5), node_id(0, 2, 3, 0), node_id(0, 1, 2, 2), node_id(0, 1, 5, 5)]
+
+    def tour(self, **data):
+        return self.post('pathfind/tour/', {'start_node_id': self.start, 'stops': self.stops, **data})
+
+    def test_legs_cover_the_tour(self):
+        for return_to_start in (False, True, 'false', 'true'):
+            with self.subTest(return_to_start=return_to_start):
+                response = self.tour(return_to_start=return_to_start)
+                self.assertEqual(response.status_code, 200)
+                result = response.json()
+                self.assertEqual(sorted(result['order']), sorted(set(self.stops)))  # 중복 경유지는 한 번만
+                legs = result['legs']
+                self.assertEqual(legs[0]['from'], self.start)
+                self.assertEqual([leg['to'] for leg in legs][:3], result['order'])
+                self.assertAlmostEqual(result['distance'], sum(leg['distance'] for leg in legs))
+                returns = return_to_start in (True, 'true')
+                self.assertEqual(result['path'][-1]['id'], self.start if returns else result['order'][-1])
+
+    def test_invalid_parameters_return_400(self):
+        for data in ({'return_to_start': 'no'}, {'return_to_start': 1}, {'stops': 'SYN-B0-1F-5-5'}, {'stops': [1]},
+                     {'stops': [self.stops[0]] * (MAX_TOUR_STOPS + 1)}, {'stops': []}):
+            with self.subTest(data=data):
+                self.assertEqual(self.tour(**data).status_code, 400)
+
+    def test_unknown_stop_returns_404(self):
+        self.assertEqual(self.tour(stops=['없는 노드']).status_code, 404)
+
+
+class ClosureCacheTests(NavigationTestCase):
+    start, end = node_id(0, 1, 0, 5), node_id(0, 1, 5, 5)
+
+    def trace(self):
+        response = self.pathfind(self.start, self.end, trace=True)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def close_node(self, qr_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            Closure.objects.create(node=Node.objects.get(qr_id=qr_id), reason="테스트")
+
+    def test_unrelated_closure_keeps_cached_route(self):
+        first = self.trace()
+        self.assertEqual(first['trace']['cache'], 'miss')
+        self.close_node(node_id(1, 3, 3, 3))  # 다른 건물의 노드
+
+        second = self.trace()
+        self.assertEqual(second['trace']['cache'], 'hit')
+        self.assertNotIn('closures', second['trace'])
+        self.assertEqual(second['path'], first['path'])
+
+    def test_closure_on_route_forces_recompute(self):
+        first = self.trace()
+        closed = first['path'][len(first['path']) // 2]['id']
+        self.close_node(closed)
+
+        second = self.trace()
+        self.assertEqual(second['trace']['cache'], 'miss')
+        self.assertIn('closures', second['trace'])
+        self.assertNotIn(closed, [step['id'] for step in second['path']])
+        self.assertGreaterEqual(second['distance'], first['distance'])
+        # 같은 통제 상태로 다시 요청하면 통제별 키로 캐시됨
+        self.assertEqual(self.trace()['trace']['cache'], 'hit')
+
+
+class ClosureOverlayTests(NavigationTestCase):
+    def test_edge_closure_and_node_penalty(self):
+        graph = get_graph(GraphVersion.current()).graph
+        a, b, c = node_id(0, 1, 0, 0), node_id(0, 1, 1, 0), node_id(0, 1, 2, 0)
+        original = list(graph.weights)
+        overlay = ClosureOverlay(graph, [(None, a, b, None), (c, None, None, 7.0)])
+        u, v, w = graph.index[a], graph.index[b], graph.index[c]
+
+        def weight(g, x, y):
+            return [g.weights[pos] for pos in range(g.offsets[x], g.offsets[x + 1]) if g.targets[pos] == y][0]
+
+        # 엣지 통제는 양방향, 노드 벌점은 들어갈 때만
+        self.assertEqual(weight(overlay.graph, u, v), math.inf)
+        self.assertEqual(weight(overlay.graph, v, u), math.inf)
+        self.assertEqual(weight(overlay.graph, v, w), weight(graph, v, w) + 7.0)
+        self.assertEqual(weight(overlay.graph, w, v), weight(graph, w, v))
+        self.assertEqual(list(graph.weights), original)  # 원래 그래프는 그대로
+
+
+class ConditionalGetTests(NavigationTestCase):
+    def test_matching_etag_returns_304_with_one_query(self):
+        url = f'/api/navigation/nodes/qr/{node_id(0, 1, 2, 0)}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_graph_change_invalidates_etag(self):
+        url = f'/api/navigation/nodes/qr/{node_id(0, 1, 2, 0)}/'
+        etag = self.client.get(url)['ETag']
+        GraphVersion.bump()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ClosureValidatorTests(NavigationTestCase):
+    url = f'/api/navigation/nodes/qr/{node_id(0, 1, 2, 0)}/?bundle=1'
+
+    def at(self, moment):
+        return mock.patch('django.utils.timezone.now', return_value=moment)
+
+    def nearby(self, response):
+        return [poi['id'] for poi in response.json()['nearby_pois']]
+
+    def test_closure_change_and_expiry_update_validators(self):
+        started = timezone.now()
+        first = self.client.get(self.url)
+        closed = self.nearby(first)[0]
+
+        with self.at(started + timedelta(seconds=10)):
+            with self.captureOnCommitCallbacks(execute=True):
+                Closure.objects.create(node=Node.objects.get(qr_id=closed), expires_at=started + timedelta(hours=1))
+            # Last-Modified도 통제 변경을 반영 (If-Modified-Since만 보내는 클라이언트)
+            response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn(closed, self.nearby(response))
+            closed_etag = response['ETag']
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=closed_etag).status_code, 304)
+
+        with self.at(started + timedelta(hours=2)):
+            # 만료되면 같은 ETag로도 304가 아니라 통제가 풀린 번들을 받음
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=closed_etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(closed, self.nearby(response))
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertIsNone(GraphVersion.objects.get(pk=1).closures_valid_until)
+
+
+class GraphIoTests(NavigationTestCase):
+    def export(self, directory, fmt, name):
+        path = os.path.join(directory, f'{name}.{fmt}')
+        options = {'format': fmt}
+        if fmt == 'csv':
+            options['edges'] = os.path.join(directory, f'{name}-edges.csv')
+        call_command('export_graph', path, stdout=StringIO(), stderr=StringIO(), **options)
+        return path, options
+
+    def read(self, path, options):
+        paths = [path] + ([options['edges']] if 'edges' in options else [])
+        contents = []
+        for name in paths:
+            with open(name, encoding='utf-8') as fp:
+                contents.append(fp.read())
+        return contents
+
+    def test_import_export_round_trip(self):
+        for fmt in FORMATS:
+            with self.subTest(format=fmt), tempfile.TemporaryDirectory() as directory:
+                path, options = self.export(directory, fmt, 'first')
+                call_command('import_graph', path, replace=True, stdout=StringIO(), **options)
+                again, again_options = self.export(directory, fmt, 'second')
+                self.assertEqual(self.read(again, again_options), self.read(path, options))
+
+    def test_rejects_negative_and_non_finite_values(self):
+        def node(qr_id, x=0, y=0):
+            return 'node', {'qr_id': qr_id, 'name': qr_id, 'floor': '1F', 'pixel_x': x, 'pixel_y': y}
+
+        bad_records = {
+            'negative pixel': [node('A', -5)],
+            'inf pixel': [node('A', 'inf')],
+            'huge pixel': [node('A', '1e300')],
+            'nan pixel': [node('A', 0, 'nan')],
+            'negative weight': [node('A'), node('B'), ('edge', {'start': 'A', 'end': 'B', 'weight': -50})],
+            'nan weight': [node('A'), node('B'), ('edge', {'start': 'A', 'end': 'B', 'weight': 'nan'})],
+            'inf weight': [node('A'), node('B'), ('edge', {'start': 'A', 'end': 'B', 'weight': 'inf'})],
+        }
+        nodes = Node.objects.count()
+        for name, records in bad_records.items():
+            with self.subTest(name), self.assertRaisesMessage(GraphImportError, '1번째'):
+                GraphImporter().import_records(records)
+        self.assertEqual(Node.objects.count(), nodes)  # 실패한 가져오기는 아무것도 바꾸지 않음
+
+
+class SnapshotTests(NavigationTestCase):
+    def test_write_and_load_round_trip(self):
+        snapshot = get_graph(GraphVersion.current())
+        graph = snapshot.graph
+        _, fingerprint = GraphVersion.fingerprint()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.snapshot')
+            write_snapshot(graph, snapshot.version, path, fingerprint)
+            self.assertIsNone(load_snapshot_file(path, expected_version=snapshot.version + 1))
+            self.assertIsNone(load_snapshot_file(path, snapshot.version, expected_fingerprint='other-database'))
+            loaded = load_snapshot_file(path, expected_version=snapshot.version, expected_fingerprint=fingerprint)
+            self.assertIsNotNone(loaded)
+
+            self.assertEqual(loaded.ids, graph.ids)
+            for name in ('offsets', 'targets', 'weights', 'xs', 'ys', 'floor_ids', 'building_ids', 'type_ids'):
+                self.assertEqual(list(getattr(loaded, name)), list(getattr(graph, name)), name)
+            for name in ('floor_names', 'building_names', 'type_names'):
+                self.assertEqual(getattr(loaded, name), getattr(graph, name), name)
+
+            start, end = node_id(0, 1, 0, 5), node_id(1, 3, 4, 1)
+            self.assertEqual(loaded.find_path(start, end)['distance'], graph.find_path(start, end)['distance'])
+            del loaded  # mmap을 닫은 뒤 임시 디렉터리 삭제
+
+    def test_snapshot_from_another_database_is_ignored(self):
+        version, fingerprint = GraphVersion.fingerprint()
+        graph = get_graph(version).graph
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.snapshot')
+            with override_settings(NAVIGATION_GRAPH_SNAPSHOT=path):
+                # 버전 번호는 같지만 다른 DB에서 만든 스냅샷
+                write_snapshot(graph, version, path, 'other-database:1:2026-01-01T00:00:00+00:00')
+                clear_graph_cache()
+                with self.assertLogs('navigation.graph_cache', 'INFO') as logs:
+                    self.assertEqual(get_graph(version).source, 'db')
+                self.assertIn('from another database', logs.output[0])
+
+                call_command('compile_graph', stdout=StringIO())
+                clear_graph_cache()
+                self.assertEqual(get_graph(version).source, 'file')
+                clear_graph_cache()  # mmap을 닫은 뒤 임시 디렉터리 삭제
+
+
+class ProfileAccessTests(NavigationTestCase):
+    start, end = node_id(0, 1, 0, 5), node_id(0, 1, 5, 0)
+
+    def test_staff_profile_forbidden_for_anonymous(self):
+        response = self.pathfind(self.start, self.end, profile='staff')
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('error', response.json())
+
+    def test_staff_profile_allowed_for_staff(self):
+        user = get_user_model().objects.create_user('staff', password='pw', is_staff=True)
+        self.client.force_login(user)
+        self.assertEqual(self.pathfind(self.start, self.end, profile='staff').status_code, 200)
+
+    def test_visitor_profiles_allowed_for_anonymous(self):
+        for profile in ('default', 'step_free', 'shortest_time'):
+            with self.subTest(profile=profile):
+                self.assertEqual(self.pathfind(self.start, self.end, profile=profile).status_code, 200)
+
+
+class QrBundleTests(NavigationTestCase):
+    qr_id = node_id(0, 2, 0, 0)  # 0번 건물 2층 엘리베이터 (직원 전용)
+
+    def bundle(self, qr_id=None):
+        return self.client.get(f'/api/navigation/nodes/qr/{qr_id or self.qr_id}/', {'bundle': 1})
+
+    def expected_pois(self, profile='default'):
+        graph = profile_graph(GraphVersion.current(), profile)
+        poi = graph.type_names.index('POI')
+        return [(r['id'], round(r['distance'], 6))
+                for r in graph.nearest(self.qr_id, lambda i: graph.type_ids[i] == poi, k=5)['results']]
+
+    def test_bundle_contains_node_floor_and_nearby_pois(self):
+        response = self.bundle()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['node'], NodeSerializer(Node.objects.get(qr_id=self.qr_id)).data)
+        self.assertEqual(data['floor'], {'building': 'SYN-0', 'floor': '2F', 'floors': ['1F', '2F', '3F'],
+                                         'image': 'images/SYN-0_2F.png'})
+        pois = data['nearby_pois']
+        self.assertEqual(len(pois), 5)
+        self.assertTrue(all(p['node_type'] == 'POI' for p in pois))
+        self.assertEqual([p['distance'] for p in pois], sorted(p['distance'] for p in pois))
+        # 방문객 경로 기준 (다른 층 POI까지는 직원 전용 엘리베이터 대신 계단으로 돌아간 거리)
+        self.assertEqual([(p['id'], round(p['distance'], 6)) for p in pois], self.expected_pois())
+        self.assertNotEqual(self.expected_pois(), self.expected_pois('staff'))
+
+    def test_closure_updates_nearby_pois(self):
+        closed = self.bundle().json()['nearby_pois'][0]['id']
+        with self.captureOnCommitCallbacks(execute=True):
+            Closure.objects.create(node=Node.objects.get(qr_id=closed), reason="테스트")
+        self.assertNotIn(closed, [p['id'] for p in self.bundle().json()['nearby_pois']])
+
+    def test_plain_lookup_and_unknown_qr(self):
+        response = self.client.get(f'/api/navigation/nodes/qr/{self.qr_id}/')
+        self.assertEqual(response.json(), NodeSerializer(Node.objects.get(qr_id=self.qr_id)).data)
+        self.assertEqual(self.bundle('없는-QR').status_code, 404)
+
+
+class SearchPoolTests(TestCase):
+    def test_rejects_over_limit_and_times_out(self):
+        pool = SearchPool(workers=1, max_concurrency=1, timeout=0.05)
+        self.addCleanup(pool.shutdown)
+        release = threading.Event()
+        done = []
+
+        def blocking():
+            release.wait(5)
+            done.append(True)
+            return 'done'
+
+        with self.assertRaises(SearchTimeout):
+            asyncio.run(pool.run(blocking))
+        # 시간 예산을 넘긴 탐색이 끝날 때까지 자리를 차지하므로 다음 요청은 바로 거절
+        with self.assertRaises(SearchRejected):
+            asyncio.run(pool.run(len, 'abc'))
+        release.set()
+        for _ in range(100):
+            if pool._slots.acquire(timeout=0.05):
+                pool._slots.release()
+                break
+        self.assertEqual(done, [True])
+        self.assertEqual(asyncio.run(pool.run(len, 'abc')), 3)
+
+
+class AsyncViewTests(NavigationTestCase):
+    start, end = node_id(0, 1, 0, 5), node_id(0, 2, 5, 0)
+
+    def assertSameResponse(self, url, data):
+        # 동기 뷰를 먼저 호출해 그래프를 미리 만들어 둠 (워커 스레드는 테스트 트랜잭션의 데이터를 볼 수 없음)
+        expected = self.post(url, data)
+        response = self.post(f'async/{url}', data)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        return response
+
+    def test_async_views_match_sync_views(self):
+        self.assertEqual(self.assertSameResponse('pathfind/', {'start_node_id': self.start, 'end_node_id': self.end})
+                         .status_code, 200)
+        self.assertSameResponse('pathfind/', {'start_node_id': self.start, 'end_node_id': '없는 노드'})
+        self.assertSameResponse('pathfind/nearest/', {'start_node_id': self.start, 'node_type': 'POI', 'k': 3})
+        self.assertSameResponse('pathfind/tour/', {'start_node_id': self.start, 'stops': [self.end, node_id(0, 1, 2, 2)]})
+        self.assertEqual(self.post('async/pathfind/', {'start_node_id': self.start}).status_code, 400)
+
+    def test_async_qr_lookup_matches_sync_view(self):
+        for params in ({}, {'bundle': 1}):
+            with self.subTest(params=params):
+                expected = self.client.get(f'/api/navigation/nodes/qr/{self.start}/', params)
+                response = self.client.get(f'/api/navigation/async/nodes/qr/{self.start}/', params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, expected.content)
+        self.assertEqual(self.client.get('/api/navigation/async/nodes/qr/없는-QR/').status_code, 404)
+
+    def test_rejected_and_timed_out_searches(self):
+        data = {'start_node_id': self.start, 'end_node_id': self.end}
+        pool = mock.Mock(run=mock.AsyncMock(side_effect=SearchRejected()))
+        with mock.patch('navigation.async_views.get_search_pool', return_value=pool):
+            response = self.post('async/pathfind/', data)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertIn('error', response.json())
+
+        pool.run.side_effect = SearchTimeout(2.0)
+        with mock.patch('navigation.async_views.get_search_pool', return_value=pool):
+            response = self.post('async/pathfind/nearest/', {'start_node_id': self.start, 'node_type': 'POI'})
+        self.assertEqual(response.status_code, 504)
+        self.assertIn('error', response.json())
+
+
+class CompactPathTests(NavigationTestCase):
+    start, end = node_id(0, 1, 0, 5), node_id(0, 3, 5, 0)
+
+    def test_simplify_drops_points_within_tolerance(self):
+        self.assertEqual(simplify([0, 1, 2, 3], [0, 0, 0, 0], 0), [0, 3])
+        self.assertEqual(simplify([0, 1, 2, 2], [0, 0, 0, 2], 0), [0, 2, 3])
+        self.assertEqual(simplify([0, 5, 10], [0, 0.5, 0], 1.0), [0, 2])
+        self.assertEqual(simplify([0, 5, 10], [0, 2, 0], 1.0), [0, 1, 2])
+        self.assertEqual(simplify([3], [4]), [0])
+
+    def test_segments_follow_the_full_path(self):
+        full = self.pathfind(self.start, self.end).json()
+        response = self.pathfind(self.start, self.end, format='compact', tolerance=0)
+        self.assertEqual(response.status_code, 200)
+        compact = response.json()
+        self.assertEqual((compact['format'], compact['start'], compact['end']), ('compact', self.start, self.end))
+        self.assertEqual(compact['points'], len(full['path']))
+        self.assertAlmostEqual(compact['distance'], full['distance'])
+
+        segments, transitions = compact['segments'], compact['transitions']
+        self.assertEqual((segments[0]['floor'], segments[-1]['floor']), ('1F', '3F'))
+        self.assertEqual(len(transitions), len(segments) - 1)
+        # 방문객은 계단으로 1F -> 3F (2F는 구간 없이 floors로만 표시)
+        self.assertEqual(sum(t.get('floors', 0) for t in transitions), 2)
+        self.assertTrue(all(t['type'] == 'STAIRS' for t in transitions))
+        for segment in segments:
+            points = [(p['x'], p['y']) for p in full['path'] if p['floor'] == segment['floor']]
+            coords = list(zip(segment['coords'][::2], segment['coords'][1::2]))
+            self.assertEqual((coords[0], coords[-1]), (points[0], points[-1]))
+            self.assertTrue(set(coords) <= set(points))
+            self.assertLess(len(coords), len(points))  # 격자 위의 일직선 구간은 줄어듦
+
+    def test_tolerance_and_invalid_parameters(self):
+        def coords(tolerance):
+            segments = self.pathfind(self.start, self.end, format='compact', tolerance=tolerance).json()['segments']
+            return sum(len(segment['coords']) for segment in segments)
+        self.assertGreaterEqual(coords(0), coords(1000))
+        self.assertEqual(coords(1000), 4 * 2)  # 층마다 처음/끝 점만
+        for data in ({'format': 'xml'}, {'format': 'compact', 'tolerance': -1}, {'format': 'compact', 'tolerance': 'abc'}):
+            with self.subTest(data=data):
+                self.assertEqual(self.pathfind(self.start, self.end, **data).status_code, 400)
+
+
+class SpatialIndexTests(NavigationTestCase):
+    def brute_force(self, graph, building, floor, match=lambda i: True):
+        return [i for i in range(len(graph)) if graph.location(i)['building'] == building
+                and graph.location(i)['floor'] == floor and match(i)]
+
+    def test_nearest_and_within_match_brute_force(self):
+        graph = get_graph(GraphVersion.current()).graph
+        rng = random.Random(0)
+        for cell_size in (16, 64):
+            index = SpatialIndex(graph, cell_size=cell_size)
+            for _ in range(30):
+                # 격자 범위(0~100px) 밖을 탭한 경우도 포함
+                x, y = rng.uniform(-80, 180), rng.uniform(-80, 180)
+                k, max_distance = rng.randint(1, 6), rng.choice([math.inf, 30.0])
+                node_type = rng.choice([None, 'POI'])
+                candidates = self.brute_force(graph, 'SYN-1', '2F', lambda i: not node_type or graph.node_type(i) == node_type)
+                expected = sorted(d for d in (math.hypot(graph.xs[i] - x, graph.ys[i] - y) for i in candidates)
+                                  if d <= max_distance)[:k]
+                hits = index.nearest('SYN-1', '2F', x, y, k=k, node_type=node_type, max_distance=max_distance)
+                self.assertEqual([round(d, 9) for _, d in hits], [round(d, 9) for d in expected])
+
+                x1, y1 = x + rng.uniform(-60, 60), y + rng.uniform(-60, 60)
+                expected = [i for i in candidates if min(x, x1) <= graph.xs[i] <= max(x, x1)
+                            and min(y, y1) <= graph.ys[i] <= max(y, y1)]
+                self.assertEqual(index.within('SYN-1', '2F', x, y, x1, y1, node_type=node_type), sorted(expected))
+        self.assertEqual(index.nearest('없는 건물', '1F', 0, 0), [])
+        self.assertEqual(index.within('SYN-0', '9F', 0, 0, 100, 100), [])
+
+    def test_nearest_and_within_views(self):
+        response = self.client.get('/api/navigation/nodes/nearest/',
+                                   {'building': 'SYN-0', 'floor': '1F', 'x': 41, 'y': 19, 'k': 2})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['id'] for r in results], [node_id(0, 1, 2, 1), node_id(0, 1, 2, 0)])
+        self.assertAlmostEqual(results[0]['distance'], math.hypot(1, 1))
+
+        response = self.client.get('/api/navigation/nodes/within/',
+                                   {'building': 'SYN-0', 'floor': '1F', 'x0': 40, 'y0': 0, 'x1': 0, 'y1': 20, 'node_type': 'QR'})
+        self.assertEqual([r['id'] for r in response.json()['results']], [node_id(0, 1, 2, 0)])
+
+        for url, params in (('nearest', {'building': 'SYN-0', 'floor': '1F', 'x': 'nan', 'y': 0}),
+                            ('nearest', {'building': 'SYN-0', 'floor': '1F', 'x': 0, 'y': 0, 'k': 0}),
+                            ('nearest', {'building': 'SYN-0', 'floor': '1F', 'x': 0, 'y': 0, 'max_distance': -1}),
+                            ('nearest', {'floor': '1F', 'x': 0, 'y': 0}),
+                            ('within', {'building': 'SYN-0', 'floor': '1F', 'x0': 0, 'y0': 0, 'x1': 'inf', 'y1': 1}),
+                            ('within', {'building': 'SYN-0', 'floor': '1F', 'x0': 0, 'y0': 0})):
+            with self.subTest(url=url, params=params):
+                self.assertEqual(self.client.get(f'/api/navigation/nodes/{url}/', params).status_code, 400)
+
+    def test_pathfind_snaps_locations_to_nearest_nodes(self):
+        start = {'building': 'SYN-0', 'floor': '1F', 'x': 3, 'y': 98}
+        end = {'building': 'SYN-0', 'floor': '1F', 'x': 97, 'y': 61}
+        response = self.post('pathfind/', {'start_location': start, 'end_location': end})
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual((result['snapped']['start']['id'], result['snapped']['end']['id']),
+                         (node_id(0, 1, 0, 5), node_id(0, 1, 5, 3)))
+        expected = self.pathfind(node_id(0, 1, 0, 5), node_id(0, 1, 5, 3)).json()
+        self.assertEqual(result['path'], expected['path'])
+        self.assertNotIn('snapped', expected)
+
+        # 노드 ID가 있으면 좌표보다 우선
+        response = self.post('pathfind/', {'start_node_id': node_id(0, 1, 0, 0), 'start_location': start,
+                                           'end_location': end})
+        self.assertEqual(list(response.json()['snapped']), ['end'])
+        self.assertEqual(self.post('pathfind/', {'start_location': {**start, 'floor': '9F'}, 'end_location': end})
+                         .status_code, 404)
+        for location in ({**start, 'x': 'nan'}, {**start, 'y': None}, {'x': 1, 'y': 1}, 'SYN-0'):
+            with self.subTest(location=location):
+                self.assertEqual(self.post('pathfind/', {'start_location': location, 'end_location': end}).status_code, 400)
+
+
+class FloorBundleTests(NavigationTestCase):
+    url = '/api/navigation/floors/SYN-0/1F/bundle/'
+
+    def test_negotiate_prefers_smallest_accepted_encoding(self):
+        bundle = FloorBundle(b'{"nodes":[]}')
+        bundle.encoded['br'] = b'br-bytes'  # brotli가 설치되지 않은 환경에서도 우선순위 확인
+        self.assertEqual(bundle.negotiate('gzip, deflate, br'), (b'br-bytes', 'br'))
+        self.assertEqual(bundle.negotiate('br;q=0, gzip;q=0.5'), (bundle.encoded['gzip'], 'gzip'))
+        self.assertEqual(bundle.negotiate('GZIP'), (bundle.encoded['gzip'], 'gzip'))
+        self.assertEqual(bundle.negotiate('*'), (b'br-bytes', 'br'))
+        self.assertEqual(bundle.negotiate('gzip;q=0, br;q=abc'), (bundle.content, None))
+        self.assertEqual(bundle.negotiate(''), (bundle.content, None))
+        self.assertEqual(gzip.decompress(bundle.encoded['gzip']), bundle.content)
+
+    def test_identity_bundle_contents(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertFalse(response['ETag'].startswith('W/'))
+        data = json.loads(response.content)
+        self.assertEqual((data['building'], data['floor'], data['floors'], data['image']),
+                         ('SYN-0', '1F', ['1F', '2F', '3F'], 'images/SYN-0_1F.png'))
+        self.assertEqual(len(data['nodes']), 36)
+        qr_ids = [node[data['node_fields'].index('qr_id')] for node in data['nodes']]
+        edges = {(qr_ids[a], qr_ids[b]) for a, b, _ in data['edges']}
+        self.assertIn((node_id(0, 1, 0, 0), node_id(0, 1, 1, 0)), edges)
+        self.assertEqual(self.client.get('/api/navigation/floors/SYN-0/9F/bundle/').status_code, 404)
+
+    def test_staff_only_edges_are_excluded(self):
+        # 합성 캠퍼스의 직원 전용 엣지는 층 사이 엘리베이터뿐이므로 같은 층 안에 하나 추가
+        with self.captureOnCommitCallbacks(execute=True):
+            GraphImporter().import_records([('edge', {'start': node_id(0, 1, 0, 0), 'end': node_id(0, 1, 5, 5),
+                                                      'weight': 1.0, 'staff_only': True})])
+        self.assertTrue(Edge.objects.filter(start_node__qr_id=node_id(0, 1, 0, 0), staff_only=True).exists())
+        data = json.loads(self.client.get(self.url).content)
+        qr_ids = [node[data['node_fields'].index('qr_id')] for node in data['nodes']]
+        edges = {(qr_ids[a], qr_ids[b]) for a, b, _ in data['edges']}
+        self.assertNotIn((node_id(0, 1, 0, 0), node_id(0, 1, 5, 5)), edges)
+
+    def test_gzip_response_and_weak_etag(self):
+        identity = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), identity.content)
+        # 압축 형식마다 바이트가 다르므로 약한 ETag. 약한 비교라 어느 ETag로도 304
+        self.assertEqual(response['ETag'], 'W/' + identity['ETag'])
+        for etag in (response['ETag'], identity['ETag']):
+            with self.subTest(etag=etag):
+                cached = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(cached.status_code, 304)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', response)
+
+
+class WarmupTests(NavigationTestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ('_warmed_version', '_warming_version'):
+            patcher = mock.patch.object(route_cache, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.snapshot = get_graph(GraphVersion.current())
+        # 워밍업 스레드는 테스트 트랜잭션의 데이터를 볼 수 없으므로 프로필 그래프를 미리 만들어 둠
+        self.graph = profile_graph(self.snapshot.version)
+
+    def run_warmup(self):
+        threads, thread_class = [], threading.Thread
+
+        def record(*args, **kwargs):
+            thread = thread_class(*args, **kwargs)
+            threads.append(thread)
+            return thread
+
+        with mock.patch.object(route_cache.threading, 'Thread', side_effect=record):
+            start_warmup(self.snapshot)
+            start_warmup(self.snapshot)  # 진행 중인 버전은 다시 시작하지 않음
+        for thread in threads:
+            thread.join(10)
+        return threads
+
+    def test_warm_route_cache_serves_qr_to_poi_routes(self):
+        graph = self.graph
+        qrs = [graph.ids[i] for i in range(len(graph)) if graph.node_type(i) == 'QR']
+        pois = [graph.ids[i] for i in range(len(graph)) if graph.node_type(i) == 'POI']
+        self.assertEqual(warm_route_cache(self.snapshot, engines=('astar', 'alt')), len(qrs) * len(pois) * 2)
+        self.assertEqual(route_cache._warmed_version, self.snapshot.version)
+
+        for engine in ('astar', 'alt'):
+            response = self.pathfind(qrs[0], pois[-1], engine=engine, trace=True).json()
+            self.assertEqual(response['trace']['cache'], 'hit')
+            expected = graph.find_path(qrs[0], pois[-1])
+            self.assertAlmostEqual(response['distance'], expected['distance'])
+            self.assertEqual(response['path'], expected['path'])
+        # 워밍업 대상이 아닌 경로는 그대로 계산
+        self.assertEqual(self.pathfind(pois[0], qrs[0], trace=True).json()['trace']['cache'], 'miss')
+
+    def test_background_warmup_marks_version_only_after_success(self):
+        with mock.patch.object(route_cache, 'warm_route_cache', side_effect=RuntimeError("boom")), \
+                self.assertLogs('navigation.route_cache', 'ERROR'):
+            self.assertEqual(len(self.run_warmup()), 1)
+        self.assertIsNone(route_cache._warmed_version)
+        self.assertIsNone(route_cache._warming_version)  # 실패하면 다음 요청에서 다시 시도
+
+        self.assertEqual(len(self.run_warmup()), 1)
+        self.assertEqual(route_cache._warmed_version, self.snapshot.version)
+        self.assertEqual(self.run_warmup(), [])  # 워밍업이 끝난 버전은 다시 하지 않음
+
+    @override_settings(NAVIGATION_ROUTE_WARMUP=True)
+    def test_first_request_starts_warmup(self):
+        with mock.patch.object(route_cache, 'start_warmup') as start:
+            self.pathfind(node_id(0, 1, 0, 5), node_id(0, 1, 5, 5))
+        start.assert_called_once()
+        self.assertEqual(start.call_args.args[0].version, self.snapshot.version)
+
+    def test_warm_routes_command(self):
+        out, err = StringIO(), StringIO()
+        call_command('warm_routes', engines=['astar'], stdout=out, stderr=err)
+        self.assertIn(f"v{self.snapshot.version}", out.getvalue())
+        self.assertIn('LocMemCache', err.getvalue())
+        self.assertEqual(route_cache._warmed_version, self.snapshot.version)
+
+
+class NodeSearchTests(NavigationTestCase):
+    PLACES = [
+        ('MAIN-1', '본관', '1F', '강의실 101', 'POI', None),
+        ('MAIN-2', '본관', '1F', '강당', 'POI', None),
+        ('MAIN-3', '본관', '1F', '화장실', 'POI', '정수기 옆'),
+        ('MAIN-4', '본관', '2F', '강의실 201', 'POI', None),
+        ('MAIN-5', '본관', '2F', '엘리베이터', 'ELEVATOR', None),
+        ('ANNEX-1', '별관', '1F', '강의실 B', 'POI', None),
+    ]
+
+    def import_campus(self):
+        records = [('node', {'qr_id': qr_id, 'building': building, 'floor': floor, 'name': name, 'node_type': node_type,
+                             'description': description, 'pixel_x': 10 * i, 'pixel_y': 0})
+                   for i, (qr_id, building, floor, name, node_type, description) in enumerate(self.PLACES)]
+        with self.captureOnCommitCallbacks(execute=True):
+            GraphImporter().import_records(records)
+
+    def search(self, **params):
+        response = self.client.get('/api/navigation/nodes/', params)
+        self.assertEqual(response.status_code, 200)
+        return [node['name'] for node in response.json()], int(response['X-Total-Count'])
+
+    def test_substring_and_ranking(self):
+        # 정확히 일치 < 접두어 < 포함, 같은 순위는 짧은 이름 먼저
+        self.assertEqual(self.search(query='강당')[0], ['강당'])
+        self.assertEqual(self.search(query='강')[0], ['강당', '강의실 B', '강의실 101', '강의실 201'])
+        self.assertEqual(self.search(query='의실 1')[0], ['강의실 101'])  # 공백 무시
+        self.assertEqual(self.search(query='main-3')[0], ['화장실'])     # QR ID, 대소문자 무시
+        self.assertEqual(self.search(query='정수기')[0], ['화장실'])      # 설명
+        self.assertEqual(self.search(query='없는 장소'), ([], 0))
+
+    def test_chosung_query(self):
+        self.assertEqual(self.search(query='ㄱㅇㅅ')[0], ['강의실 B', '강의실 101', '강의실 201'])
+        self.assertEqual(self.search(query='ㅎㅈㅅ')[0], ['화장실'])
+        self.assertEqual(self.search(query='강ㅇ')[0], ['강의실 B', '강의실 101', '강의실 201'])  # 섞인 질의
+
+    def test_filters(self):
+        self.assertEqual(self.search(query='강의실', building='본관', floor='2F')[0], ['강의실 201'])
+        self.assertEqual(self.search(building='별관')[0], ['강의실 B'])
+        self.assertEqual(self.search(node_type='ELEVATOR')[0], ['엘리베이터'])
+        self.assertEqual(self.search(building='없는 건물'), ([], 0))
+
+    def test_limit_offset_and_total_count(self):
+        names, total = self.search(limit=2, offset=1)
+        self.assertEqual(names, ['강당', '화장실'])  # 질의가 없으면 id 순
+        self.assertEqual(total, len(self.PLACES))
+        self.assertEqual(self.search(query='강', limit=1), (['강당'], 4))
+        self.assertEqual(self.search(offset=100), ([], len(self.PLACES)))
+        for params in ({'limit': -1}, {'limit': 'a'}, {'offset': 'b'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/navigation/nodes/', params).status_code, 400)
+
+
+class DerivedCacheTests(NavigationTestCase):
+    def test_slow_builder_does_not_block_other_derived_data(self):
+        version = GraphVersion.current()
+        started, release = threading.Event(), threading.Event()
+
+        def slow_builder(version):
+            started.set()
+            release.wait(5)
+            return 'slow'
+
+        slow = threading.Thread(target=get_versioned, args=('test_slow', slow_builder, version))
+        slow.start()
+        self.addCleanup(slow.join)
+        self.addCleanup(release.set)
+        self.assertTrue(started.wait(5))
+
+        results = []
+        other = threading.Thread(target=lambda: results.append(get_versioned('test_fast', lambda v: 'fast', version)))
+        other.start()
+        other.join(2)
+        self.assertEqual(results, ['fast'])  # 느린 빌더가 끝나기 전에 다른 이름은 만들어짐
+
+    def test_qr_table_payload_matches_serializer(self):
+        node = Node.objects.get(qr_id=node_id(0, 1, 2, 0))
+        payload = self.client.get(f'/api/navigation/nodes/qr/{node.qr_id}/').json()
+        self.assertEqual(payload, NodeSerializer(node).data)
+
+    def test_search_index_documents_match_serializer(self):
+        index = NodeSearchIndex.build(GraphVersion.current())
+        self.assertEqual(index.docs, [dict(data) for data in NodeSerializer(Node.objects.order_by('id'), many=True).data])
@@ -0,0 +1,122 @@
+# navigation/tours.py
+# 여러 목적지를 한 번에 도는 투어 경로
+# 출발지와 각 경유지에서 다익스트라를 한 번씩만 돌려 거리 행렬을 만들고 (k개 지점이면 k번, A* k^2번 대신)
+# 방문 순서를 최적화한 뒤 구간 경로를 이어 붙입니다.
+import math
+
+from .pathfinding import CompiledGraph, unwind
+
+# 경유지가 이 개수 이하면 Held-Karp(동적 계획법)로 정확한 최적 순서를 구하고, 넘으면 휴리스틱 사용
+EXACT_TOUR_LIMIT = 10
+# 한 요청에서 받을 수 있는 최대 경유지 수 (경유지마다 다익스트라 한 번 + 2-opt는 경유지 수의 세제곱)
+MAX_TOUR_STOPS = 30
+
+
+def distance_matrix(graph: CompiledGraph, points: list):
+    # points(노드 번호)의 쌍별 최단 거리와, 경로 복원용 지점별 prev 딕셔너리
+    matrix, prevs = [], []
+    wanted = set(points)
+    for p in points:
+        dist, prev = graph.dijkstra(p, wanted - {p})
+        matrix.append([dist.get(q, math.inf) for q in points])
+        prevs.append(prev)
+    return matrix, prevs
+
+
+def held_karp(matrix, return_to_start: bool) -> list:
+    # 0번 지점에서 출발해 1..n-1을 모두 방문하는 최적 순서 (O(2^n * n^2))
+    n = len(matrix)
+    full = (1 << (n - 1)) - 1
+    # best[(mask, j)] = 0에서 출발해 mask 집합을 방문하고 j에서 끝나는 최소 비용
+    best = {(1 << (j - 1), j): (matrix[0][j], 0) for j in range(1, n)}
+    for mask in range(1, full + 1):
+        for j in range(1, n):
+            bit = 1 << (j - 1)
+            if not mask & bit or (mask, j) not in best:
+                continue
+            cost = best[(mask, j)][0]
+            for nxt in range(1, n):
+                nbit = 1 << (nxt - 1)
+                if mask & nbit:
+                    continue
+                key = (mask | nbit, nxt)
+                candidate = cost + matrix[j][nxt]
+                if key not in best or candidate < best[key][0]:
+                    best[key] = (candidate, j)
+
+    last = min(range(1, n), key=lambda j: best[(full, j)][0] + (matrix[j][0] if return_to_start else 0))
+    order, mask = [], full
+    while last:
+        order.append(last)
+        _, before = best[(mask, last)]
+        mask &= ~(1 << (last - 1))
+        last = before
+    order.reverse()
+    return order
+
+
+def tour_cost(matrix, order, return_to_start: bool) -> float:
+    route = [0] + order + ([0] if return_to_start else [])
+    return sum(matrix[a][b] for a, b in zip(route, route[1:]))
+
+
+def nearest_neighbor_2opt(matrix, return_to_start: bool) -> list:
+    # 가장 가까운 다음 지점을 고르는 초기해를 만든 뒤 2-opt로 구간을 뒤집어가며 개선
+    n = len(matrix)
+    order, current, left = [], 0, set(range(1, n))
+    while left:
+        current = min(left, key=matrix[current].__getitem__)
+        order.append(current)
+        left.remove(current)
+
+    improved = True
+    best_cost = tour_cost(matrix, order, return_to_start)
+    while improved:
+        improved = False
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                cost = tour_cost(matrix, candidate, return_to_start)
+                if cost < best_cost - 1e-9:
+                    order, best_cost, improved = candidate, cost, True
+    return order
+
+
+def plan_tour(graph: CompiledGraph, start: str, stops: list, return_to_start: bool = False) -> dict:
+    s = graph.index.get(start)
+    if s is None:
+        return {"path": [], "distance": None, "error": f"Start node '{start}' not in graph."}
+    missing = [stop for stop in stops if stop not in graph.index]
+    if missing:
+        return {"path": [], "distance": None, "error": f"Stop nodes not in graph: {', '.join(missing)}"}
+
+    # 중복 경유지와 출발지 자신은 제외 (입력 순서 유지)
+    points = [s]
+    for stop in stops:
+        i = graph.index[stop]
+        if i not in points:
+            points.append(i)
+    if len(points) == 1:
+        return {"order": [], "legs": [], **graph.path_result([s], 0.0)}
+
+    matrix, prevs = distance_matrix(graph, points)
+    unreachable = [graph.ids[q] for q, d in zip(points, matrix[0]) if d == math.inf]
+    if unreachable:
+        return {"path": [], "distance": None, "error": f"경로를 탐색할 수 없습니다: {', '.join(unreachable)}"}
+
+    if len(points) - 1 <= EXACT_TOUR_LIMIT:
+        order = held_karp(matrix, return_to_start)
+    else:
+        order = nearest_neighbor_2opt(matrix, return_to_start)
+
+    # 구간별 경로를 이어 붙이기
+    route = [0] + order + ([0] if return_to_start else [])
+    path, legs = [s], []
+    for a, b in zip(route, route[1:]):
+        path.extend(unwind(prevs[a], points[b])[1:])
+        legs.append({"from": graph.ids[points[a]], "to": graph.ids[points[b]], "distance": matrix[a][b]})
+    return {
+        "order": [graph.ids[points[i]] for i in order],
+        "legs": legs,
+        **graph.path_result(path, tour_cost(matrix, order, return_to_start)),
+    }
@@ -1,6 +1,10 @@
 # navigation/urls.py
 from django.urls import path
-from .views import NodeByQrIdView, NodeSearchView, PathfindView
+from .async_views import AsyncNearestView, AsyncNodeByQrIdView, AsyncPathfindView, AsyncTourView
+from .views import (
+    ClosureDetailView, ClosureListView, FloorBundleView, MetricsView, NearestView, NodeByQrIdView, NodeNearestView, NodeSearchView,
+    NodeWithinView, PathfindView, RouteCacheStatsView, TourView,
+)
 
 urlpatterns = [
     # 목적지 검색 또는 전체 노드 목록 (예: /api/navigation/nodes/?query=101호)
@@ -9,6 +13,36 @@ urlpatterns = [
     # QR코드로 현재 위치 정보 조회 (예: /api/navigation/nodes/qr/QR_ENTRANCE_1F/)
     path('nodes/qr/<str:qr_id>/', NodeByQrIdView.as_view(), name='node-by-qr-id'),
     
+    # 지도 좌표로 가까운 노드 / 영역 안의 노드 찾기 (예: /api/navigation/nodes/nearest/?building=본관&floor=1F&x=120&y=340)
+    path('nodes/nearest/', NodeNearestView.as_view(), name='node-nearest'),
+    path('nodes/within/', NodeWithinView.as_view(), name='node-within'),
+
+    # 층 화면용 번들: 노드 + 층 안의 엣지 (예: /api/navigation/floors/본관/1F/bundle/)
+    path('floors/<str:building>/<str:floor>/bundle/', FloorBundleView.as_view(), name='floor-bundle'),
+
     # 최단 경로 탐색 요청 (POST 방식) (예: /api/navigation/pathfind/)
     path('pathfind/', PathfindView.as_view(), name='pathfind'),
+
+    # 가장 가까운 목적지 k개 찾기 (POST) (예: {"start_node_id": "QR_ENTRANCE_1F", "node_type": "ELEVATOR", "k": 3})
+    path('pathfind/nearest/', NearestView.as_view(), name='pathfind-nearest'),
+
+    # 여러 경유지를 도는 투어 경로 (POST) (예: {"start_node_id": "QR_ENTRANCE_1F", "stops": ["A", "B", "C"]})
+    path('pathfind/tour/', TourView.as_view(), name='pathfind-tour'),
+
+    # 경로 캐시 적중/미스 통계 (예: /api/navigation/pathfind/cache/)
+    path('pathfind/cache/', RouteCacheStatsView.as_view(), name='pathfind-cache-stats'),
+
+    # 임시 통제 목록/추가/해제 (예: POST {"node": "EV_1F", "reason": "점검", "minutes": 120})
+    path('closures/', ClosureListView.as_view(), name='closures'),
+    path('closures/<int:pk>/', ClosureDetailView.as_view(), name='closure-detail'),
+
+    # 경로 탐색 계측 값 (카운터 + 지연 시간 히스토그램) (예: /api/navigation/metrics/)
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('metrics/prometheus/', MetricsView.as_view(prometheus=True), name='metrics-prometheus'),
+
+    # ASGI 서버용 비동기 버전 (탐색은 제한된 워커 풀에서 실행, 과부하 시 503 / 시간 초과 시 504)
+    path('async/nodes/qr/<str:qr_id>/', AsyncNodeByQrIdView.as_view(), name='async-node-by-qr-id'),
+    path('async/pathfind/', AsyncPathfindView.as_view(), name='async-pathfind'),
+    path('async/pathfind/nearest/', AsyncNearestView.as_view(), name='async-pathfind-nearest'),
+    path('async/pathfind/tour/', AsyncTourView.as_view(), name='async-pathfind-tour'),
 ]
\ No newline at end of file
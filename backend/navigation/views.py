@@ -1,57 +1,419 @@
 # navigation/views.py
+import json
+import logging
+import math
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers, quote_etag
+from django.utils.decorators import method_decorator
+from django.views import View
+from rest_framework.renderers import JSONRenderer
+from rest_framework.permissions import SAFE_METHODS, BasePermission
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Node, Edge
-from .serializers import NodeSerializer
-#from .pathfinding import find_shortest_path
+from .conditional import graph_conditional, graph_etag, request_closures_version, request_graph_version
+from .floor_bundle import FloorBundleTable
+from .graph_cache import get_versioned
+from .metrics import metrics, record_pathfind
+from .models import Closure, GraphVersion
+from .path_format import DEFAULT_TOLERANCE, PATH_FORMATS
+from .pathfinding import ENGINES
+from .profiles import DEFAULT_PROFILE, PROFILES
+from .qr_lookup import QrLookupTable
+from .route_cache import cache_stats
+from .search_index import NodeSearchIndex
+from .search_pool import nearest_task, pathfind_task, tour_task
+from .serializers import ClosureSerializer
+from .spatial_index import SpatialIndex
+from .tours import MAX_TOUR_STOPS
+
+logger = logging.getLogger(__name__)
 
 # QR ID로 특정 노드 정보 가져오기
-class NodeByQrIdView(APIView):
+# 세션의 첫 요청이라 지연 시간에 민감하므로 DRF/ORM을 거치지 않고 미리 직렬화한 JSON을 바로 반환합니다.
+# ?bundle=1 이면 노드 + 층 정보 + 가까운 POI를 한 번에 반환
+@method_decorator(graph_conditional, name='get')
+class NodeByQrIdView(View):
+    NOT_FOUND = json.dumps({"error": "해당 QR ID의 노드를 찾을 수 없습니다."}, ensure_ascii=False).encode()
+
     def get(self, request, qr_id):
-        try:
-            node = Node.objects.get(qr_id=qr_id)
-            serializer = NodeSerializer(node)
-            return Response(serializer.data)
-        except Node.DoesNotExist:
-            return Response({"error": "해당 QR ID의 노드를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+        payload = lookup_qr(request_graph_version(request), qr_id, bundle=request.GET.get('bundle') in ('1', 'true'),
+                            closures_version=request_closures_version(request))
+        if payload is None:
+            return HttpResponse(self.NOT_FOUND, content_type="application/json", status=status.HTTP_404_NOT_FOUND)
+        return HttpResponse(payload, content_type="application/json")
+
+
+def lookup_qr(version: int, qr_id: str, bundle: bool = False, closures_version: int = 0):
+    table = get_versioned('qr_lookup', QrLookupTable.build, version=version)
+    return table.bundle(qr_id, closures_version) if bundle else table.get(qr_id)
+
+
+# 층 번들: 한 층의 노드 + 층 안의 엣지를 한 번에 (floor.js가 층 화면을 요청 한 번으로 그릴 수 있게)
+# 그래프 버전마다 미리 압축해 둔 gzip/brotli 바이트를 Accept-Encoding에 맞춰 그대로 반환
+# 예: /api/navigation/floors/본관/1F/bundle/
+@method_decorator(graph_conditional, name='get')
+class FloorBundleView(View):
+    NOT_FOUND = json.dumps({"error": "해당 건물/층을 찾을 수 없습니다."}, ensure_ascii=False).encode()
+
+    def get(self, request, building, floor):
+        table = get_versioned('floor_bundles', FloorBundleTable.build, version=request_graph_version(request))
+        bundle = table.get(building, floor)
+        if bundle is None:
+            return HttpResponse(self.NOT_FOUND, content_type="application/json", status=status.HTTP_404_NOT_FOUND)
+        content, encoding = bundle.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        response = HttpResponse(content, content_type="application/json")
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if encoding:
+            response['Content-Encoding'] = encoding
+            # 압축 형식마다 바이트가 다르므로 약한 ETag (If-None-Match는 약한 비교라 304는 그대로 동작)
+            response['ETag'] = 'W/' + quote_etag(graph_etag(request))
+        return response
+
 
-    
 # 목적지 검색 및 전체 노드 목록
+# 메모리 검색 인덱스 사용 (부분 문자열/초성 검색, building/floor/node_type 필터, limit/offset)
+# 전체 결과 개수는 X-Total-Count 헤더로 전달
+@method_decorator(graph_conditional, name='get')
 class NodeSearchView(APIView):
     def get(self, request):
-        query = request.query_params.get('query', None)
-        if query:
-            nodes = Node.objects.filter(name__icontains=query) # 이름에 query를 포함하는 노드 검색
-        else:
-            nodes = Node.objects.all()
-        
-        serializer = NodeSerializer(nodes, many=True)
-        return Response(serializer.data)
+        params = request.query_params
+        try:
+            offset = max(int(params.get('offset', 0)), 0)
+            limit = int(params['limit']) if params.get('limit') else None
+        except ValueError:
+            return Response({"error": "limit과 offset은 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit is not None and limit < 0:
+            return Response({"error": "limit은 0 이상이어야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        index = get_versioned('search_index', NodeSearchIndex.build, version=request_graph_version(request))
+        nodes = index.search(
+            params.get('query'),
+            building=params.get('building'),
+            floor=params.get('floor'),
+            node_type=params.get('node_type'),
+        )
+        page = nodes[offset:offset + limit] if limit is not None else nodes[offset:]
+        return Response(page, headers={"X-Total-Count": str(len(nodes))})
+
+
+# 지도 좌표 -> 가까운 노드 k개 (지도를 탭한 위치를 그래프 노드로 맞추기)
+# 예: /api/navigation/nodes/nearest/?building=본관&floor=1F&x=120&y=340&k=3&node_type=POI&max_distance=200
+@method_decorator(graph_conditional, name='get')
+class NodeNearestView(APIView):
+    def get(self, request):
+        params = request.query_params
+        try:
+            x, y = float(params['x']), float(params['y'])
+            k = int(params.get('k', 1))
+            max_distance = float(params.get('max_distance', 'inf'))
+        except (KeyError, ValueError):
+            return Response({"error": "x, y, max_distance는 숫자, k는 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        # float()는 "nan", "inf"도 받으므로 따로 거름 (max_distance는 inf 허용)
+        if not (math.isfinite(x) and math.isfinite(y)) or not max_distance >= 0:
+            return Response({"error": "x, y는 유한한 숫자, max_distance는 0 이상이어야 합니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not params.get('building') or not params.get('floor'):
+            return Response({"error": "building과 floor를 모두 제공해야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if k < 1:
+            return Response({"error": "k는 1 이상이어야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        index = get_versioned('spatial_index', SpatialIndex.build, version=request_graph_version(request))
+        hits = index.nearest(params['building'], params['floor'], x, y, k=k, node_type=params.get('node_type'),
+                             max_distance=max_distance)
+        return Response({"results": [index.describe(i, distance) for i, distance in hits]})
+
+
+# 지도 영역(사각형) 안의 노드 (화면에 보이는 마커만 불러오기)
+# 예: /api/navigation/nodes/within/?building=본관&floor=1F&x0=0&y0=0&x1=800&y1=600&node_type=POI
+@method_decorator(graph_conditional, name='get')
+class NodeWithinView(APIView):
+    def get(self, request):
+        params = request.query_params
+        try:
+            x0, y0, x1, y1 = (float(params[name]) for name in ('x0', 'y0', 'x1', 'y1'))
+        except (KeyError, ValueError):
+            return Response({"error": "x0, y0, x1, y1은 숫자여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(math.isfinite(value) for value in (x0, y0, x1, y1)):
+            return Response({"error": "x0, y0, x1, y1은 유한한 숫자여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if not params.get('building') or not params.get('floor'):
+            return Response({"error": "building과 floor를 모두 제공해야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        index = get_versioned('spatial_index', SpatialIndex.build, version=request_graph_version(request))
+        nodes = index.within(params['building'], params['floor'], x0, y0, x1, y1, node_type=params.get('node_type'))
+        return Response({"results": [index.describe(i) for i in nodes]})
+
+
+class InvalidRequest(ValueError):
+    # 요청 파라미터 오류 (400). 동기/비동기 뷰가 같은 검증 함수를 사용
+    pass
+
+
+def location_param(value, name: str) -> dict:
+    # {"building", "floor", "x", "y"} 지도 좌표 (pathfind의 start_location/end_location)
+    if not isinstance(value, dict) or not value.get('building') or not value.get('floor') \
+            or not isinstance(value['building'], str) or not isinstance(value['floor'], str):
+        raise InvalidRequest(f"{name}은 building, floor, x, y를 가진 객체여야 합니다.")
+    try:
+        x, y = float(value['x']), float(value['y'])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidRequest(f"{name}의 x, y는 숫자여야 합니다.")
+    if not (math.isfinite(x) and math.isfinite(y)):
+        raise InvalidRequest(f"{name}의 x, y는 유한한 숫자여야 합니다.")
+    return {"building": value['building'], "floor": value['floor'], "x": x, "y": y}
+
+
+def json_object(data) -> dict:
+    # 요청 본문이 JSON 객체가 아니면 (예: [1], "a") 400
+    if not isinstance(data, dict):
+        raise InvalidRequest("요청 본문은 JSON 객체여야 합니다.")
+    return data
+
+
+def bool_param(data: dict, name: str, default: bool = False) -> bool:
+    # JSON true/false 또는 문자열 "true"/"false"만 허용 (bool("false")는 True이므로 직접 해석)
+    value = data.get(name)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+        return value.strip().lower() == 'true'
+    raise InvalidRequest(f"{name}은 true 또는 false여야 합니다.")
+
+
+def pathfind_params(data) -> dict:
+    # 출발지/도착지는 노드 ID 대신 지도 좌표(start_location/end_location)로 줄 수도 있음 (가장 가까운 노드로 맞춤)
+    data = json_object(data)
+    start_node_id = data.get('start_node_id')
+    end_node_id = data.get('end_node_id')
+    for name, value in (('start_node_id', start_node_id), ('end_node_id', end_node_id)):
+        if value is not None and not isinstance(value, str):
+            raise InvalidRequest(f"{name}는 문자열이어야 합니다.")
+    start_location = end_location = None
+    if not start_node_id and data.get('start_location') is not None:
+        start_location = location_param(data['start_location'], 'start_location')
+    if not end_node_id and data.get('end_location') is not None:
+        end_location = location_param(data['end_location'], 'end_location')
+    # 탐색 엔진 선택 (astar: 기본 A*, hierarchical: 층별 포털 거리표를 이용한 계층 탐색, alt: 랜드마크 A*)
+    engine = data.get('engine', 'astar')
+    if not (start_node_id or start_location) or not (end_node_id or end_location):
+        raise InvalidRequest("출발지와 도착지 노드 ID를 모두 제공해야 합니다.")
+    if engine not in ENGINES:
+        raise InvalidRequest(f"지원하지 않는 탐색 엔진입니다: {engine}")
+    # format=compact 이면 층별 구간 + 단순화한 좌표 배열로 응답 (path_format.py)
+    path_format = data.get('format', 'full')
+    if path_format not in PATH_FORMATS:
+        raise InvalidRequest(f"지원하지 않는 응답 형식입니다: {path_format}")
+    try:
+        tolerance = float(data.get('tolerance', DEFAULT_TOLERANCE))
+    except (TypeError, ValueError):
+        raise InvalidRequest("tolerance는 숫자여야 합니다.")
+    if not tolerance >= 0:
+        raise InvalidRequest("tolerance는 0 이상이어야 합니다.")
+    # trace=true 이면 단계별 소요 시간과 확장 노드 수를 응답에 포함
+    return {"start": start_node_id, "end": end_node_id, "start_location": start_location, "end_location": end_location,
+            "engine": engine, "trace": bool_param(data, 'trace'), "path_format": path_format, "tolerance": tolerance,
+            "profile": profile_param(data)}
+
+
+def profile_param(data) -> str:
+    # 라우팅 프로필 (default, step_free, staff, shortest_time). profiles.py 참고
+    profile = data.get('profile') or DEFAULT_PROFILE
+    if not isinstance(profile, str) or profile not in PROFILES:
+        raise InvalidRequest(f"지원하지 않는 라우팅 프로필입니다: {profile}")
+    return profile
+
+
+# 직원 전용 통로가 드러나는 프로필(staff)은 관리자 계정만 사용할 수 있음
+PROFILE_FORBIDDEN = "이 라우팅 프로필은 관리자 계정만 사용할 수 있습니다."
+
+
+def profile_forbidden(params: dict, user) -> bool:
+    return PROFILES[params["profile"]].requires_staff and not (user and user.is_staff)
+
 
 # 최단 경로 탐색
 class PathfindView(APIView):
     def post(self, request):
-        start_node_id = request.data.get('start_node_id')
-        end_node_id = request.data.get('end_node_id')
+        try:
+            params = pathfind_params(request.data)
+        except InvalidRequest as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if profile_forbidden(params, request.user):
+            return Response({"error": PROFILE_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
+
+        # 워커 프로세스에 캐시된 그래프를 사용 (노드/엣지가 바뀐 경우에만 DB에서 다시 읽음)
+        outcome = pathfind_task(GraphVersion.versions(), **params)
+        return pathfind_response(outcome, params)
+
 
-        if not start_node_id or not end_node_id:
-            return Response({"error": "출발지와 도착지 노드 ID를 모두 제공해야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+def pathfind_response(outcome, params: dict, timings: dict = None):
+    # PathfindOutcome -> 응답 (계측/로그 포함). 비동기 뷰도 같이 사용
+    timings = {**outcome.timings, **(timings or {})}
+    stats = outcome.stats
+    # 'error'가 있으면 경로 탐색 실패 응답
+    if outcome.error:
+        record_pathfind(timings, stats, 0, ok=False)
+        return error_response(outcome.error, status.HTTP_404_NOT_FOUND)
 
-        # DB에서 모든 노드와 엣지 정보를 가져옴 (QuerySet)
-        all_nodes = Node.objects.all()
-        all_edges = Edge.objects.select_related('start_node', 'end_node').all()
+    record_pathfind(timings, stats, outcome.path_length, ok=True)
+    logger.debug(
+        "pathfind %s -> %s engine=%s profile=%s load=%.2fms search=%.2fms serialize=%.2fms expanded=%s pushes=%s "
+        "path=%d cache=%s",
+        params["start"] or params["start_location"], params["end"] or params["end_location"], params["engine"],
+        params["profile"], timings["load_ms"], timings["search_ms"], timings["serialize_ms"],
+        stats.get("expanded"), stats.get("pushes"), outcome.path_length, stats.get("cache"),
+    )
+    return HttpResponse(outcome.content, content_type="application/json", status=status.HTTP_200_OK)
 
-        # find_shortest_path 함수에 4개의 인자를 올바르게 전달합니다.
-        result = find_shortest_path(start_node_id, end_node_id, all_nodes, all_edges)
-        
-        # 결과에 'error' 키가 있으면, 경로 탐색 실패 응답
+
+def error_response(message, status_code, **headers):
+    content = JSONRenderer().render({"error": message})
+    return HttpResponse(content, content_type="application/json", status=status_code, headers=headers)
+
+
+# 계측 값 조회 (워커 프로세스별 값). prometheus=True 로 등록하면 Prometheus 텍스트 형식
+class MetricsView(APIView):
+    prometheus = False
+
+    def get(self, request):
+        if self.prometheus:
+            return HttpResponse(metrics.prometheus(), content_type="text/plain; version=0.0.4")
+        return Response({**metrics.snapshot(), "route_cache": cache_stats()})
+
+
+# 경로 캐시 적중/미스 카운터 (캐시 크기 조정용, 워커 프로세스별 값)
+class RouteCacheStatsView(APIView):
+    def get(self, request):
+        return Response(cache_stats())
+
+
+# 가장 가까운 목적지 찾기 (예: 현재 위치에서 가장 가까운 엘리베이터/화장실/출구)
+# targets(qr_id 목록) 또는 node_type/building/floor 조건 중 하나로 후보를 지정합니다.
+class NearestView(APIView):
+    def post(self, request):
+        try:
+            params = nearest_params(request.data)
+        except InvalidRequest as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if profile_forbidden(params, request.user):
+            return Response({"error": PROFILE_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
+
+        result = nearest_task(GraphVersion.versions(), **params)
         if result.get("error"):
             return Response({"error": result["error"]}, status=status.HTTP_404_NOT_FOUND)
-        
-        # 경로 탐색 성공 시, 결과 그대로 반환
         return Response(result, status=status.HTTP_200_OK)
-            serializer = NodeSerializer(path_nodes, many=True)
-            return Response(serializer.data)
-        else:
-            return Response({"error": "경로를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+
+# 한 번에 찾을 수 있는 목적지 수 (k) 상한
+MAX_NEAREST_RESULTS = 50
+
+
+def nearest_params(data) -> dict:
+    data = json_object(data)
+    start_node_id = data.get('start_node_id')
+    targets = data.get('targets')
+    node_type = data.get('node_type')
+    building = data.get('building')
+    floor = data.get('floor')
+    try:
+        k = int(data.get('k', 5))
+        with_paths = int(data.get('paths', 0))
+    except (TypeError, ValueError):
+        raise InvalidRequest("k와 paths는 정수여야 합니다.")
+
+    if not start_node_id:
+        raise InvalidRequest("출발지 노드 ID를 제공해야 합니다.")
+    if not isinstance(start_node_id, str):
+        raise InvalidRequest("start_node_id는 문자열이어야 합니다.")
+    if not targets and not (node_type or building or floor):
+        raise InvalidRequest("targets 또는 node_type/building/floor 조건을 제공해야 합니다.")
+    if targets is not None and not (isinstance(targets, list) and all(isinstance(t, str) for t in targets)):
+        raise InvalidRequest("targets는 노드 ID(문자열) 목록이어야 합니다.")
+    for name, value in (('node_type', node_type), ('building', building), ('floor', floor)):
+        if value is not None and not isinstance(value, str):
+            raise InvalidRequest(f"{name}은 문자열이어야 합니다.")
+    if not 1 <= k <= MAX_NEAREST_RESULTS:
+        raise InvalidRequest(f"k는 1 이상 {MAX_NEAREST_RESULTS} 이하여야 합니다.")
+    if with_paths < 0:
+        raise InvalidRequest("paths는 0 이상이어야 합니다.")
+    return {"start": start_node_id, "targets": targets, "node_type": node_type, "building": building,
+            "floor": floor, "k": k, "with_paths": with_paths, "profile": profile_param(data)}
+
+
+# 여러 목적지 순회 경로 (캠퍼스 투어, 시설 점검 등)
+# 방문 순서를 최적화해서 order(방문 순서), legs(구간별 거리), path(전체 경로)를 반환합니다.
+class TourView(APIView):
+    def post(self, request):
+        try:
+            params = tour_params(request.data)
+        except InvalidRequest as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if profile_forbidden(params, request.user):
+            return Response({"error": PROFILE_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
+
+        result = tour_task(GraphVersion.versions(), **params)
+        if result.get("error"):
+            return Response({"error": result["error"]}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+def tour_params(data) -> dict:
+    data = json_object(data)
+    start_node_id = data.get('start_node_id')
+    stops = data.get('stops')
+    if not start_node_id or not stops:
+        raise InvalidRequest("출발지와 경유지 노드 ID 목록을 모두 제공해야 합니다.")
+    if not isinstance(start_node_id, str):
+        raise InvalidRequest("start_node_id는 문자열이어야 합니다.")
+    if not isinstance(stops, list) or not all(isinstance(stop, str) for stop in stops):
+        raise InvalidRequest("stops는 노드 ID(문자열) 목록이어야 합니다.")
+    if len(stops) > MAX_TOUR_STOPS:
+        raise InvalidRequest(f"경유지는 최대 {MAX_TOUR_STOPS}개까지 지정할 수 있습니다.")
+    return {"start": start_node_id, "stops": stops, "return_to_start": bool_param(data, 'return_to_start'),
+            "profile": profile_param(data)}
+
+
+class IsStaffOrReadOnly(BasePermission):
+    # 조회는 누구나, 변경은 관리자(staff) 계정만
+    def has_permission(self, request, view):
+        return request.method in SAFE_METHODS or bool(request.user and request.user.is_staff)
+
+
+# 임시 통제 (엘리베이터 점검, 복도 폐쇄 등). 그래프를 다시 만들지 않고 바로 경로 탐색에 반영됩니다.
+# GET: 적용 중인 통제 목록 (?all=1 이면 만료된 것 포함) / POST: 통제 추가 / DELETE: 적용 중인 통제 모두 해제 (?node=qr_id 로 한정)
+class ClosureListView(APIView):
+    permission_classes = [IsStaffOrReadOnly]
+
+    def get(self, request):
+        closures = Closure.objects.select_related('node', 'edge__start_node', 'edge__end_node').order_by('-created_at')
+        if request.query_params.get('all') not in ('1', 'true'):
+            closures = closures.active()
+        return Response(ClosureSerializer(closures, many=True).data)
+
+    def post(self, request):
+        serializer = ClosureSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        closures = Closure.objects.active()
+        if request.query_params.get('node'):
+            closures = closures.filter(node__qr_id=request.query_params['node'])
+        deleted, _ = closures.delete()
+        return Response({"deleted": deleted})
+
+
+class ClosureDetailView(APIView):
+    permission_classes = [IsStaffOrReadOnly]
+
+    def delete(self, request, pk):
+        deleted, _ = Closure.objects.filter(pk=pk).delete()
+        if not deleted:
+            return Response({"error": "해당 통제를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
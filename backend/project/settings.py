@@ -55,6 +55,8 @@ MIDDLEWARE = [
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
+# 노드 검색 결과 전체 개수 (limit/offset 사용 시)
+CORS_EXPOSE_HEADERS = ['X-Total-Count']
 
 ROOT_URLCONF = 'project.urls'
 
@@ -87,6 +89,59 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # 경로 탐색 결과 캐시 (navigation/route_cache.py). 여러 워커가 공유하려면 Redis/Memcached로 교체
+    'routes': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'navigation-routes',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+
+# Navigation
+
+# True 이면 각 워커가 새 그래프 버전을 처음 볼 때 QR -> POI 경로를 백그라운드에서 미리 계산
+NAVIGATION_ROUTE_WARMUP = False
+
+# manage.py compile_graph 가 만드는 그래프 스냅샷 파일. 같은 DB의 현재 그래프 버전이면 워커가 mmap으로 바로 사용
+NAVIGATION_GRAPH_SNAPSHOT = BASE_DIR / 'graph.snapshot'
+
+# 노드 조회 API(nodes/, nodes/qr/<qr_id>/)의 Cache-Control max-age (초). 리버스 프록시 캐시용
+NAVIGATION_CACHE_MAX_AGE = 60
+
+# 비동기 탐색 뷰(/api/navigation/async/...)의 워커 풀
+# 'thread': 프로세스의 그래프를 공유, 'process': 워커 프로세스마다 그래프 스냅샷을 mmap (GIL 영향 없음)
+NAVIGATION_SEARCH_POOL = 'thread'
+NAVIGATION_SEARCH_WORKERS = 4
+# 실행 중 + 대기 중인 탐색 수 상한. 넘으면 바로 503 (QR 조회 등 가벼운 요청이 밀리지 않도록)
+NAVIGATION_SEARCH_MAX_CONCURRENCY = 16
+# 요청당 탐색 시간 예산 (초). 넘으면 504
+NAVIGATION_SEARCH_TIMEOUT = 2.0
+
+
+# Logging
+# navigation 로거를 DEBUG로 바꾸면 경로 탐색마다 단계별 소요 시간이 기록됩니다.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'navigation': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 